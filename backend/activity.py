@@ -0,0 +1,126 @@
+"""
+In-process pub/sub for the live activity stream (GET /api/stream/activity).
+crud publishes donations, closed issues and new projects after each commit;
+every event is encoded as one SSE frame once and handed to each connected
+client's bounded buffer, so connected dashboards cost no database queries.
+"""
+
+from collections import deque
+from typing import AsyncIterator, Deque, Optional, Set, Tuple
+import asyncio
+import os
+
+import orjson
+
+# Configuration
+STREAM_CLIENT_BUFFER = int(os.getenv("STREAM_CLIENT_BUFFER", 100))
+STREAM_HEARTBEAT_SECONDS = float(os.getenv("STREAM_HEARTBEAT_SECONDS", 15))
+STREAM_MAX_CLIENTS = int(os.getenv("STREAM_MAX_CLIENTS", 5000))
+STREAM_REPLAY_SIZE = int(os.getenv("STREAM_REPLAY_SIZE", 256))
+
+HEARTBEAT_FRAME = b": heartbeat\n\n"
+
+
+class StreamFull(Exception):
+    """Raised when the broker already serves STREAM_MAX_CLIENTS clients"""
+
+
+class ActivityBroker:
+    """
+    Fan-out of encoded SSE frames to per-client queues:
+    - publish() never blocks or awaits; a client whose buffer is full is
+      evicted (its stream ends and EventSource reconnects with Last-Event-ID)
+      instead of slowing down the writer or the other clients
+    - the last replay_size frames are kept, so a reconnecting client gets
+      what it missed while it was away
+    - a comment frame is sent after heartbeat seconds of silence to keep
+      proxies from closing idle connections
+    """
+
+    def __init__(self, buffer_size: int, heartbeat: float, max_clients: int, replay_size: int):
+        self.buffer_size = buffer_size
+        self.heartbeat = heartbeat
+        self.max_clients = max_clients
+        self.published = 0
+        self.evicted = 0
+        self._clients: Set[asyncio.Queue] = set()
+        self._replay: Deque[Tuple[int, bytes]] = deque(maxlen=replay_size)
+        self._last_id = 0
+
+    def publish(self, event: str, data: dict):
+        self._last_id += 1
+        frame = (
+            f"id: {self._last_id}\nevent: {event}\ndata: ".encode()
+            + orjson.dumps(data) + b"\n\n"
+        )
+        self._replay.append((self._last_id, frame))
+        self.published += 1
+        for queue in list(self._clients):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                self._evict(queue)
+
+    def _evict(self, queue: asyncio.Queue):
+        self.evicted += 1
+        self._end(queue)
+
+    def _end(self, queue: asyncio.Queue):
+        self._clients.discard(queue)
+        # Drop the backlog and wake the client with the end-of-stream marker
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    def _missed(self, last_event_id: Optional[str]) -> list:
+        try:
+            since = int(last_event_id)
+        except (TypeError, ValueError):
+            return []
+        return [frame for event_id, frame in self._replay if event_id > since]
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        """
+        Register a client and return its frame iterator. Registration happens
+        now, so events published before the response starts are not lost; a
+        client that never starts reading is evicted once its buffer fills.
+        """
+        if len(self._clients) >= self.max_clients:
+            raise StreamFull()
+        queue = asyncio.Queue(maxsize=self.buffer_size)
+        for frame in self._missed(last_event_id)[-self.buffer_size:]:
+            queue.put_nowait(frame)
+        self._clients.add(queue)
+        return self._frames(queue)
+
+    async def _frames(self, queue: asyncio.Queue) -> AsyncIterator[bytes]:
+        try:
+            # Tell EventSource how long to wait before reconnecting
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    frame = HEARTBEAT_FRAME
+                if frame is None:
+                    return
+                yield frame
+        finally:
+            self._clients.discard(queue)
+
+    def close(self):
+        """End every open stream (on shutdown)"""
+        for queue in list(self._clients):
+            self._end(queue)
+
+    def stats(self) -> dict:
+        return {
+            "clients": len(self._clients),
+            "published": self.published,
+            "evicted": self.evicted
+        }
+
+
+activity_broker = ActivityBroker(
+    STREAM_CLIENT_BUFFER, STREAM_HEARTBEAT_SECONDS, STREAM_MAX_CLIENTS, STREAM_REPLAY_SIZE
+)
@@ -1,6 +1,8 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
 from jose import JWTError, jwt
+import asyncio
 import bcrypt
 import os
 
@@ -30,6 +32,71 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         print(f"Error verifying password: {e}")
         return False
 
+
+# Off-loop hashing pool: bcrypt is CPU-bound (~250 ms at 12 rounds), so the
+# async routes hand it to worker processes instead of running it inline
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", min(4, os.cpu_count() or 1)))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", 64))
+
+
+class HashingPoolBusy(Exception):
+    """Raised when the password hashing queue is full"""
+
+
+class PasswordHashingPool:
+    """
+    Bounded process pool for bcrypt work:
+    - jobs are served first come, first served by the executor
+    - once queue_limit jobs are in flight, new ones fail fast with HashingPoolBusy
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def _run(self, fn, *args):
+        # Only touched from the event loop thread, so no lock is needed
+        if self._in_flight >= self.queue_limit:
+            raise HashingPoolBusy("Password hashing queue is full")
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordHashingPool(HASH_WORKERS, HASH_QUEUE_LIMIT)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the hashing pool"""
+    return await password_pool.hash(password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool"""
+    return await password_pool.verify(plain_password, hashed_password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
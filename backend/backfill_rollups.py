@@ -0,0 +1,25 @@
+"""
+Rebuild the donation rollup table (day/week/month buckets) from raw donations
+Run: python backfill_rollups.py [project_id]
+"""
+import asyncio
+import sys
+from database import AsyncSessionLocal, async_engine
+import crud
+
+
+async def backfill(project_id=None):
+    async with AsyncSessionLocal() as db:
+        written = await crud.rebuild_donation_rollups(db, project_id)
+    await async_engine.dispose()
+    return written
+
+
+if __name__ == "__main__":
+    project_id = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    try:
+        written = asyncio.run(backfill(project_id))
+        print(f"✓ Wrote {written} donation rollup bucket(s)")
+    except Exception as e:
+        print(f"❌ Error backfilling rollups: {e}")
+        sys.exit(1)
@@ -0,0 +1,84 @@
+"""
+Contention benchmark for sharded project counters: many concurrent donors
+hammer one project, once with a single counter row and once per shard count.
+Run: TEST_DATABASE_URL=postgresql://... python benchmark_counter_shards.py [workers] [donations_per_worker]
+Without TEST_DATABASE_URL it uses a throwaway SQLite file, which serializes
+every writer on one file lock, so only PostgreSQL shows the sharding gain.
+"""
+
+import os
+import sys
+import tempfile
+
+os.environ["DATABASE_URL"] = (os.getenv("TEST_DATABASE_URL")
+                              or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "bench.db"))
+os.environ["ENVIRONMENT"] = "test"
+os.environ.setdefault("JWT_SECRET", "bench-secret")
+
+import asyncio
+import time
+from database import AsyncSessionLocal, Base, async_engine
+import crud
+from cache import counter_hints, shard_totals
+from models import UserDB, ProjectDB
+
+SHARD_COUNTS = [0, 4, 16, 64]
+
+
+async def seed(workers: int):
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSessionLocal() as db:
+        users = [UserDB(email=f"bench{i}@example.com", name=f"Bench {i}", password_hash="x")
+                 for i in range(workers)]
+        db.add_all(users)
+        await db.flush()
+        project = ProjectDB(name="Viral project", owner_id=users[0].id, goal_amount=1e9)
+        db.add(project)
+        await db.commit()
+        return [u.id for u in users], project.id
+
+
+async def worker(user_id: int, project_id: int, donations: int):
+    for _ in range(donations):
+        async with AsyncSessionLocal() as db:
+            if await crud.process_donation(db, user_id, project_id, 1.0) is None:
+                raise RuntimeError("donation failed")
+
+
+async def run(shards: int, workers: int, donations: int) -> float:
+    user_ids, project_id = await seed(workers)
+    async with AsyncSessionLocal() as db:
+        await crud.set_project_counter_shards(db, project_id, shards)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker(user_id, project_id, donations) for user_id in user_ids])
+    elapsed = time.perf_counter() - started
+
+    shard_totals.clear()
+    async with AsyncSessionLocal() as db:
+        project = await crud.get_project_with_totals(db, project_id)
+    expected = workers * donations
+    assert project.current_amount == expected, f"total {project.current_amount} != {expected}"
+    counter_hints.clear()
+    return expected / elapsed
+
+
+async def main(workers: int, donations: int):
+    print(f"{workers} concurrent donors x {donations} donations to one project "
+          f"({async_engine.dialect.name})")
+    baseline = None
+    for shards in SHARD_COUNTS:
+        rate = await run(shards, workers, donations)
+        baseline = baseline or rate
+        mode = f"{shards} shards" if shards else "single row"
+        print(f"  {mode:>12}: {rate:8.1f} donations/s  ({rate / baseline:.2f}x)")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    donations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    asyncio.run(main(workers, donations))
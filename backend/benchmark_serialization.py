@@ -0,0 +1,77 @@
+"""
+Serialization microbenchmark for a /api/projects page: the old path
+(from_orm per item, then response_model validation and JSONResponse), the
+same route returning ORM rows to response_model with ORJSONResponse, and the
+single-pass TypeAdapter path used by list endpoints.
+Run: python benchmark_serialization.py [items] [rounds]
+"""
+
+import os
+import sys
+
+os.environ.setdefault("JWT_SECRET", "bench-secret")
+
+import asyncio
+import time
+from datetime import datetime
+from typing import List
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from models import ProjectDB, ProjectResponse, ProjectStatus
+from serialization import json_list
+
+
+def make_projects(count: int) -> List[ProjectDB]:
+    now = datetime.utcnow()
+    return [
+        ProjectDB(
+            id=i, name=f"Project {i}", description="Hot meals for the neighbourhood " * 4,
+            icon="📦", color="#5e6ad2", goal_amount=10000.0, current_amount=1234.5 + i,
+            report_url=None, status=ProjectStatus.ACTIVE, is_verified=bool(i % 2),
+            latitude=52.52 + i / 1000, longitude=13.40 + i / 1000, owner_id=1,
+            created_at=now, updated_at=now
+        )
+        for i in range(count)
+    ]
+
+
+async def old_path(field, projects) -> bytes:
+    content = [ProjectResponse.from_orm(p) for p in projects]
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+
+async def response_model_path(field, projects) -> bytes:
+    return ORJSONResponse(await serialize_response(field=field, response_content=projects)).body
+
+
+async def single_pass_path(field, projects) -> bytes:
+    return json_list(ProjectResponse, projects).body
+
+
+async def main(items: int, rounds: int):
+    field = create_response_field(name="Response_get_projects", type_=List[ProjectResponse])
+    projects = make_projects(items)
+    paths = [
+        ("from_orm + response_model + JSONResponse", old_path),
+        ("ORM rows + response_model + ORJSONResponse", response_model_path),
+        ("TypeAdapter single pass", single_pass_path),
+    ]
+    bodies = set()
+    baseline = None
+    print(f"{items} projects x {rounds} rounds")
+    for label, path in paths:
+        bodies.add(await path(field, projects))  # warm up
+        started = time.perf_counter()
+        for _ in range(rounds):
+            await path(field, projects)
+        per_call = (time.perf_counter() - started) / rounds * 1000
+        baseline = baseline or per_call
+        print(f"  {label:44s} {per_call:7.3f} ms/response  x{baseline / per_call:4.1f}")
+    print(f"  identical bodies: {len(bodies) == 1}")
+
+
+if __name__ == "__main__":
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    asyncio.run(main(items, rounds))
@@ -0,0 +1,218 @@
+"""
+In-process caches for hot read paths. Like the other per-process indexes
+(leaderboard, search index, activity broker), they are only touched from the
+event loop thread, so none of them takes a lock.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Hashable, Optional, Tuple
+import math
+import os
+import secrets
+import time
+
+
+# Configuration
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000))
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", 60))
+SHARD_TOTALS_TTL = float(os.getenv("SHARD_TOTALS_TTL", 2))
+COUNTER_HINT_TTL = float(os.getenv("COUNTER_HINT_TTL", 30))
+USER_STATS_TTL = float(os.getenv("USER_STATS_TTL", 10))
+
+
+class LRUTTLCache:
+    """
+    Bounded LRU cache whose entries also expire after a TTL.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value or None on miss/expiry"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entry if full"""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        """Drop a single entry if present"""
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """Immutable copy of a user row, safe to share across sessions"""
+    id: int
+    email: str
+    name: str
+    password_hash: str
+    avatar: Optional[str]
+    xp: int
+    rating_level: str
+    is_admin: bool
+    created_at: datetime
+
+    @classmethod
+    def from_orm(cls, user) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            password_hash=user.password_hash,
+            avatar=user.avatar,
+            xp=user.xp,
+            rating_level=user.rating_level,
+            is_admin=user.is_admin,
+            created_at=user.created_at
+        )
+
+
+class PrincipalCache:
+    """
+    Maps a bearer token to the snapshot of its user.
+    Writes bump a per-user generation, which invalidates every token of that
+    user in O(1) without scanning the cache.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = LRUTTLCache(maxsize, ttl)
+        self._generations: Dict[int, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[UserSnapshot]:
+        entry = self._cache.get(token)
+        if entry is not None:
+            generation, snapshot = entry
+            if generation == self.generation(snapshot.id):
+                self.hits += 1
+                return snapshot
+            self._cache.pop(token)
+        self.misses += 1
+        return None
+
+    def generation(self, user_id: int) -> int:
+        """Current generation of a user; read it before loading the row"""
+        return self._generations.get(user_id, 0)
+
+    def set(self, token: str, snapshot: UserSnapshot, generation: int,
+            expires_at: Optional[float] = None):
+        """
+        Cache a snapshot loaded at the given generation (so a write that lands
+        while the row was being read is not masked); expires_at is the
+        token's own expiry as unix time
+        """
+        ttl = None
+        if expires_at is not None:
+            ttl = expires_at - time.time()
+            if ttl <= 0:
+                return
+        self._cache.set(token, (generation, snapshot), ttl=ttl)
+
+    def invalidate_user(self, user_id: int):
+        """Forget every cached token of a user"""
+        self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def clear(self):
+        self._cache.clear()
+        self._generations.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._cache.stats(), "hits": self.hits, "misses": self.misses}
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL)
+
+# Summed shard deltas per sharded project: {project_id: (amount, donations, donors)}
+shard_totals = LRUTTLCache(10000, SHARD_TOTALS_TTL)
+
+# Counter mode per project: {project_id: (counter_shards, latitude, longitude)}.
+# Only a hint: a stale entry costs contention or one extra statement, never a wrong total
+counter_hints = LRUTTLCache(10000, COUNTER_HINT_TTL)
+
+# Activity counters per user for the stats endpoints: {user_id: dict}.
+# Dropped on donation and issue writes; the TTL bounds anything a write misses
+user_stats = LRUTTLCache(10000, USER_STATS_TTL)
+
+
+class ChangeVersions:
+    """
+    Write counters keyed by collection ("issues") or entity (("project", 7)).
+    Versions live in this process only; the epoch changes on every start, so
+    validators handed out before a restart never match again.
+    """
+
+    def __init__(self):
+        self.epoch = secrets.token_hex(4)
+        self.started_at = time.time()
+        self._versions: Dict[Hashable, Tuple[int, float]] = {}
+
+    def reset(self):
+        """Start over as if the process had restarted (retires every validator)"""
+        self.epoch = secrets.token_hex(4)
+        self.started_at = time.time()
+        self._versions.clear()
+
+    def bump(self, *keys: Hashable):
+        now = time.time()
+        for key in keys:
+            version, _ = self._versions.get(key, (0, now))
+            self._versions[key] = (version + 1, now)
+
+    def get(self, key: Hashable) -> Tuple[int, float]:
+        """(version, time of the last change) of a key"""
+        return self._versions.get(key, (0, self.started_at))
+
+    def validators(self, *keys: Hashable, settle: float = 0.0) -> Optional[Tuple[str, Optional[float]]]:
+        """
+        Strong ETag and Last-Modified time for a response built from keys.
+        None while a key changed less than settle seconds ago (reads may still
+        serve cached pre-change values). Last-Modified is withheld while the
+        last change falls in the current second, since HTTP dates cannot tell
+        two changes within one second apart.
+        """
+        entries = [self.get(key) for key in keys]
+        changed_at = max(changed for _, changed in entries)
+        now = time.time()
+        if now - changed_at < settle:
+            return None
+        etag = '"%s-%s"' % (self.epoch, ".".join(str(version) for version, _ in entries))
+        last_modified = math.floor(changed_at) if changed_at < math.floor(now) else None
+        return etag, last_modified
+
+
+change_versions = ChangeVersions()
@@ -1,82 +1,258 @@
 """CRUD operations for database models"""
 
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import (
+    and_, bindparam, case, cast, column, delete, distinct, func, insert, literal, literal_column,
+    or_, select, true, union_all, update, values, Float, Integer, String
+)
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
 from models import (
-    UserDB, ProjectDB, IssueDB, DonationDB, CommentDB, SubscriptionDB,
-    ProjectStatus, IssueCategory
+    UserDB, ProjectDB, ProjectClusterDB, ProjectCounterShardDB, ProjectDonorDB, IssueDB, DonationDB, CommentDB, SubscriptionDB,
+    NotificationDB, DonationRollupDB, DonationRollupDonorDB, ProjectStatus, IssueCategory, DonationImportRow
+)
+from database import dialect_insert
+from search import DESCRIPTION_WEIGHT, SEARCH_CONFIG, TITLE_WEIGHT, search_index
+from rollups import GRANULARITIES, bucket_bounds, bucket_start
+from auth import hash_password_async
+from pagination import paginate
+from cache import counter_hints, shard_totals, user_stats
+from invalidation import cache_invalidator
+from leaderboard import leaderboard
+from activity import activity_broker
+from geo import (
+    bounding_box, grid_cell, grid_cell_ranges, haversine_km,
+    cluster_amounts, cluster_cells, cluster_cell_ranges, cluster_level_for_zoom,
+    finest_cluster_cell, ClusterAmountBuffer
 )
-from auth import hash_password, verify_password
-from typing import Optional, List
+from typing import AsyncIterator, Dict, Optional, List, Set, Tuple, Union
+from datetime import datetime
+import heapq
+import random
+
+# XP awarded to the assignee when an issue of the given priority is closed
+XP_REWARDS = {
+    "low": 10,
+    "medium": 25,
+    "high": 50
+}
+DEFAULT_XP_REWARD = 25
+
+MAX_COUNTER_SHARDS = 64
+
+MAX_BATCH_CLOSE = 500
+MAX_BULK_SUBSCRIPTIONS = 500
+MAX_MARK_READ = 1000
+
+IMPORT_CHUNK_SIZE = 5000
+MAX_IMPORT_ERRORS = 1000
+EXPORT_BATCH_SIZE = 1000
 
 
 # ============ USER CRUD ============
 
-def create_user(db: Session, email: str, name: str, password: str) -> UserDB:
+async def create_user(db: AsyncSession, email: str, name: str, password: str) -> UserDB:
     """Create a new user"""
     db_user = UserDB(
         email=email,
         name=name,
-        password_hash=hash_password(password),
+        password_hash=await hash_password_async(password),
         xp=0,
         rating_level="Bronze",
         is_admin=False
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    leaderboard.update(db_user.id, db_user.xp)
     return db_user
 
 
-def get_user_by_id(db: Session, user_id: int) -> Optional[UserDB]:
+async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[UserDB]:
     """Get user by ID"""
-    return db.query(UserDB).filter(UserDB.id == user_id).first()
+    return await db.get(UserDB, user_id)
 
 
-def get_user_by_email(db: Session, email: str) -> Optional[UserDB]:
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[UserDB]:
     """Get user by email"""
-    return db.query(UserDB).filter(UserDB.email == email).first()
+    result = await db.execute(select(UserDB).filter(UserDB.email == email))
+    return result.scalars().first()
+
+
+async def get_user_stats(db: AsyncSession, user_id: int) -> Optional[dict]:
+    """
+    Profile and activity counters of a user in one aggregate query (each
+    derived table yields exactly one row), cached per user for USER_STATS_TTL
+    """
+    stats = user_stats.get(user_id)
+    if stats is not None:
+        return stats
+
+    donations = (
+        select(
+            func.count(DonationDB.id).label("total_donations"),
+            func.coalesce(func.sum(DonationDB.amount), 0.0).label("total_donated")
+        )
+        .where(DonationDB.user_id == user_id)
+        .subquery()
+    )
+    issues = (
+        select(
+            func.count().filter(IssueDB.reporter_id == user_id).label("total_issues_created"),
+            func.count().filter(IssueDB.assignee_id == user_id).label("total_issues_assigned"),
+            func.count().filter(
+                and_(IssueDB.assignee_id == user_id, IssueDB.status == "closed")
+            ).label("total_closed_issues")
+        )
+        .where(or_(IssueDB.reporter_id == user_id, IssueDB.assignee_id == user_id))
+        .subquery()
+    )
+    result = await db.execute(
+        select(
+            UserDB.id.label("user_id"), UserDB.name, UserDB.xp, UserDB.rating_level,
+            UserDB.is_admin, donations, issues
+        )
+        .select_from(UserDB)
+        .join(donations, true())
+        .join(issues, true())
+        .where(UserDB.id == user_id)
+    )
+    row = result.mappings().first()
+    if row is None:
+        return None
+    stats = dict(row)
+    user_stats.set(user_id, stats)
+    return stats
+
 
+def _invalidate_user_stats(*user_ids: Optional[int]):
+    if any(user_id is not None for user_id in user_ids):
+        cache_invalidator.invalidate("user_stats", *user_ids)
 
-def update_user(db: Session, user_id: int, name: Optional[str] = None,
-                avatar: Optional[str] = None, password: Optional[str] = None) -> UserDB:
+
+def _projects_changed(*project_ids: int):
+    """Bump the conditional GET versions of the project details (on every node)"""
+    cache_invalidator.invalidate("project", *project_ids)
+
+
+def _issues_changed():
+    cache_invalidator.invalidate("issue")
+
+
+async def update_user(db: AsyncSession, user_id: int, name: Optional[str] = None,
+                      avatar: Optional[str] = None, password: Optional[str] = None) -> UserDB:
     """Update user information"""
-    db_user = get_user_by_id(db, user_id)
+    db_user = await get_user_by_id(db, user_id)
     if db_user:
         if name:
             db_user.name = name
         if avatar:
             db_user.avatar = avatar
         if password:
-            db_user.password_hash = hash_password(password)
-        db.commit()
-        db.refresh(db_user)
+            db_user.password_hash = await hash_password_async(password)
+        await db.commit()
+        await db.refresh(db_user)
+        cache_invalidator.invalidate("user", user_id)
     return db_user
 
 
-def add_xp_to_user(db: Session, user_id: int, xp_amount: int) -> UserDB:
+def _rating_level(xp):
+    """SQL expression for the rating level earned by an XP total"""
+    return case((xp >= 1000, "Gold"), (xp >= 500, "Silver"), else_="Bronze")
+
+
+async def _award_xp(db: AsyncSession, awards: Dict[int, int]) -> Dict[int, int]:
+    """
+    Add XP to several users in one UPDATE ... RETURNING, recomputing their
+    rating level in the same statement; returns each user's new XP. Does not
+    commit - the caller syncs the caches after its own commit.
+    """
+    if not awards:
+        return {}
+    reward = case(awards, value=UserDB.id, else_=0)
+    result = await db.execute(
+        update(UserDB)
+        .where(UserDB.id.in_(sorted(awards)))
+        .values(xp=UserDB.xp + reward, rating_level=_rating_level(UserDB.xp + reward))
+        .returning(UserDB.id, UserDB.xp)
+        .execution_options(synchronize_session=False)
+    )
+    return dict(result.all())
+
+
+def _sync_xp(new_xp: Dict[int, int]):
+    for user_id, xp in new_xp.items():
+        leaderboard.update(user_id, xp)
+    if new_xp:
+        cache_invalidator.invalidate("user", *new_xp)
+
+
+async def add_xp_to_user(db: AsyncSession, user_id: int, xp_amount: int) -> Optional[UserDB]:
     """Add XP to user for gamification"""
-    db_user = get_user_by_id(db, user_id)
-    if db_user:
-        db_user.xp += xp_amount
-        # Update rating level based on XP
-        if db_user.xp >= 1000:
-            db_user.rating_level = "Gold"
-        elif db_user.xp >= 500:
-            db_user.rating_level = "Silver"
-        else:
-            db_user.rating_level = "Bronze"
-        db.commit()
-        db.refresh(db_user)
-    return db_user
+    new_xp = await _award_xp(db, {user_id: xp_amount})
+    if not new_xp:
+        return None
+    await db.commit()
+    _sync_xp(new_xp)
+    return await db.get(UserDB, user_id, populate_existing=True)
+
+
+# ============ LEADERBOARD ============
+
+async def rebuild_leaderboard(db: AsyncSession) -> int:
+    """Load every user's XP into the in-process leaderboard (walks the xp index)"""
+    result = await db.stream(
+        select(UserDB.id, UserDB.xp)
+        .order_by(UserDB.xp.desc())
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    leaderboard.rebuild([tuple(row) async for row in result])
+    return len(leaderboard)
+
+
+async def refresh_leaderboard(db: AsyncSession, user_ids: List[int]):
+    """Re-read the XP of users another node has changed into the in-process leaderboard"""
+    result = await db.execute(select(UserDB.id, UserDB.xp).filter(UserDB.id.in_(user_ids)))
+    for user_id, xp in result:
+        leaderboard.update(user_id, xp)
+
+
+async def get_leaderboard(db: AsyncSession, limit: int = 10, offset: int = 0) -> List[dict]:
+    """Get the top volunteers by XP with their ranks"""
+    entries = leaderboard.top(limit, offset)
+    result = await db.execute(
+        select(UserDB.id, UserDB.name, UserDB.avatar, UserDB.rating_level)
+        .filter(UserDB.id.in_([user_id for _, user_id, _ in entries]))
+    )
+    users = {row.id: row for row in result}
+    return [
+        {"rank": rank, "id": user_id, "name": users[user_id].name,
+         "avatar": users[user_id].avatar, "xp": xp, "rating_level": users[user_id].rating_level}
+        for rank, user_id, xp in entries
+        if user_id in users
+    ]
+
+
+async def get_user_rank(db: AsyncSession, user_id: int) -> Optional[dict]:
+    """Get a user's leaderboard position (from memory; users unknown to this process are loaded)"""
+    rank = leaderboard.rank(user_id)
+    if rank is None:
+        user = await get_user_by_id(db, user_id)
+        if not user:
+            return None
+        leaderboard.update(user.id, user.xp)
+        rank = leaderboard.rank(user_id)
+    return {"user_id": user_id, "xp": leaderboard.xp(user_id), "rank": rank,
+            "total_users": len(leaderboard)}
 
 
 # ============ PROJECT CRUD ============
 
-def create_project(db: Session, owner_id: int, name: str, description: str,
-                   icon: str, color: str, goal_amount: float,
-                   latitude: Optional[float] = None,
-                   longitude: Optional[float] = None) -> ProjectDB:
+async def create_project(db: AsyncSession, owner_id: int, name: str, description: str,
+                         icon: str, color: str, goal_amount: float,
+                         latitude: Optional[float] = None,
+                         longitude: Optional[float] = None) -> ProjectDB:
     """Create a new charity project"""
     db_project = ProjectDB(
         owner_id=owner_id,
@@ -89,37 +265,280 @@ def create_project(db: Session, owner_id: int, name: str, description: str,
         status=ProjectStatus.ACTIVE,
         is_verified=False,
         latitude=latitude,
-        longitude=longitude
+        longitude=longitude,
+        geo_cell=grid_cell(latitude, longitude)
     )
     db.add(db_project)
-    db.commit()
-    db.refresh(db_project)
+    if latitude is not None and longitude is not None:
+        await _shift_clusters(db, [(latitude, longitude, 1, goal_amount, 0.0)])
+    await db.commit()
+    await db.refresh(db_project)
+    _index_project(db_project)
+    _projects_changed(db_project.id)
+    activity_broker.publish("project_created", {
+        "project_id": db_project.id, "project_name": db_project.name,
+        "owner_id": owner_id, "goal_amount": goal_amount,
+        "is_verified": False, "created_at": db_project.created_at
+    })
     return db_project
 
 
-def get_project_by_id(db: Session, project_id: int) -> Optional[ProjectDB]:
+async def get_project_by_id(db: AsyncSession, project_id: int) -> Optional[ProjectDB]:
     """Get project by ID"""
-    return db.query(ProjectDB).filter(ProjectDB.id == project_id).first()
+    return await db.get(ProjectDB, project_id)
 
 
-def get_all_projects(db: Session, skip: int = 0, limit: int = 100) -> List[ProjectDB]:
+async def get_project_with_totals(db: AsyncSession, project_id: int) -> Optional[ProjectDB]:
+    """Get project with sharded counters added to its totals"""
+    result = await db.execute(
+        select(ProjectDB)
+        .filter(ProjectDB.id == project_id)
+        .execution_options(populate_existing=True)
+    )
+    project = result.scalars().first()
+    if project:
+        await _apply_shard_totals(db, [project])
+    return project
+
+
+async def get_project_detail(db: AsyncSession, project_id: int) -> Optional[ProjectDB]:
+    """Get project with owner loaded"""
+    result = await db.execute(
+        select(ProjectDB)
+        .options(joinedload(ProjectDB.owner))
+        .filter(ProjectDB.id == project_id)
+        .execution_options(populate_existing=True)
+    )
+    project = result.scalars().first()
+    if project:
+        await _apply_shard_totals(db, [project])
+    return project
+
+
+async def get_all_projects(db: AsyncSession, skip: int = 0, limit: int = 100,
+                           cursor: Optional[str] = None) -> List[ProjectDB]:
     """Get all projects with pagination"""
-    return db.query(ProjectDB).offset(skip).limit(limit).all()
+    result = await db.execute(
+        paginate(select(ProjectDB), [ProjectDB.id], cursor, skip, limit)
+        .execution_options(populate_existing=True)
+    )
+    projects = result.scalars().all()
+    await _apply_shard_totals(db, projects)
+    return projects
 
 
-def get_verified_projects(db: Session, skip: int = 0, limit: int = 100) -> List[ProjectDB]:
+async def get_verified_projects(db: AsyncSession, skip: int = 0, limit: int = 100,
+                                cursor: Optional[str] = None) -> List[ProjectDB]:
     """Get verified projects only"""
-    return db.query(ProjectDB).filter(ProjectDB.is_verified == True).offset(skip).limit(limit).all()
+    result = await db.execute(
+        paginate(
+            select(ProjectDB).filter(ProjectDB.is_verified == True),
+            [ProjectDB.id], cursor, skip, limit
+        ).execution_options(populate_existing=True)
+    )
+    projects = result.scalars().all()
+    await _apply_shard_totals(db, projects)
+    return projects
+
+
+async def get_projects_nearby(db: AsyncSession, latitude: float, longitude: float,
+                              radius_km: float, limit: int = 50) -> List[Tuple[ProjectDB, float]]:
+    """
+    Get projects within radius_km of a point, nearest first:
+    1. Prefilter in SQL by indexed grid cell ranges and the bounding box
+    2. Refine with exact haversine distance and keep the closest `limit`
+    """
+    min_lat, max_lat, lon_ranges = bounding_box(latitude, longitude, radius_km)
+    cell_ranges = grid_cell_ranges(min_lat, max_lat, lon_ranges)
+    result = await db.execute(
+        select(ProjectDB).filter(
+            or_(*[ProjectDB.geo_cell.between(first, last) for first, last in cell_ranges]),
+            ProjectDB.latitude.between(min_lat, max_lat),
+            or_(*[ProjectDB.longitude.between(west, east) for west, east in lon_ranges])
+        ).execution_options(populate_existing=True)
+    )
+
+    candidates = []
+    for project in result.scalars():
+        distance = haversine_km(latitude, longitude, project.latitude, project.longitude)
+        if distance <= radius_km:
+            candidates.append((project, distance))
+    nearest = heapq.nsmallest(limit, candidates, key=lambda item: item[1])
+    await _apply_shard_totals(db, [project for project, _ in nearest])
+    return nearest
+
+
+async def rebuild_geo_cells(db: AsyncSession) -> int:
+    """Recompute the grid cell of every project (after changing GRID_CELL_DEG or a bulk import)"""
+    result = await db.execute(select(ProjectDB.id, ProjectDB.latitude, ProjectDB.longitude))
+    rows = [
+        {"id": project_id, "geo_cell": grid_cell(lat, lon)}
+        for project_id, lat, lon in result
+    ]
+    if rows:
+        await db.execute(update(ProjectDB), rows)
+    await db.commit()
+    return len(rows)
+
+
+# ============ MAP CLUSTERS ============
+
+async def _shift_clusters(db: AsyncSession, shifts: List[tuple]):
+    """
+    Add (or with negative values, remove) projects to the cluster cells of
+    every level; shifts are (latitude, longitude, count, goal_amount, amount)
+    """
+    table = ProjectClusterDB.__table__
+    names = ("project_count", "lat_sum", "lon_sum", "goal_amount", "current_amount")
+    deltas: Dict[Tuple[int, int], List[float]] = {}
+    for latitude, longitude, count, goal_amount, amount in shifts:
+        row, col = finest_cluster_cell(latitude, longitude)
+        for key in cluster_cells(row, col):
+            delta = deltas.setdefault(key, [0, 0.0, 0.0, 0.0, 0.0])
+            for i, value in enumerate((count, latitude * count, longitude * count,
+                                       goal_amount, amount)):
+                delta[i] += value
+    stmt = dialect_insert(db, table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.level, table.c.cell],
+        set_={name: table.c[name] + stmt.excluded[name] for name in names}
+    )
+    # Sorted so concurrent moves and flushes lock cluster rows in the same order
+    await db.execute(stmt, [
+        {"level": level, "cell": cell, **dict(zip(names, delta))}
+        for (level, cell), delta in sorted(deltas.items())
+    ])
+
+
+async def flush_cluster_amounts(db: AsyncSession) -> int:
+    """
+    Apply buffered donation amounts to cluster rows; returns the number of
+    projects flushed. Each amount goes to the cells of where its project is
+    now: the project rows are locked first, so a concurrent move either sees
+    the amount in cluster_amount and shifts it too, or has already committed.
+    """
+    pending = cluster_amounts.drain()
+    if not pending:
+        return 0
+    projects = ProjectDB.__table__
+    table = ProjectClusterDB.__table__
+    try:
+        # Sorted so concurrent workers lock rows in the same order
+        await db.execute(
+            update(projects)
+            .where(projects.c.id == bindparam("b_id"))
+            .values(cluster_amount=projects.c.cluster_amount + bindparam("b_amount"),
+                    updated_at=projects.c.updated_at),
+            [{"b_id": project_id, "b_amount": amount}
+             for project_id, amount in sorted(pending.items())]
+        )
+        result = await db.execute(
+            select(ProjectDB.id, ProjectDB.latitude, ProjectDB.longitude)
+            .filter(ProjectDB.id.in_(pending), ProjectDB.latitude.isnot(None),
+                    ProjectDB.longitude.isnot(None))
+        )
+        locations = {row.id: (row.latitude, row.longitude) for row in result}
+        params = [
+            {"b_level": level, "b_cell": cell, "b_amount": amount}
+            for (level, cell), amount in sorted(ClusterAmountBuffer.rollup(pending, locations).items())
+        ]
+        if params:
+            await db.execute(
+                update(table)
+                .where(table.c.level == bindparam("b_level"), table.c.cell == bindparam("b_cell"))
+                .values(current_amount=table.c.current_amount + bindparam("b_amount")),
+                params
+            )
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        cluster_amounts.restore(pending)
+        raise
+    return len(pending)
 
 
-def update_project(db: Session, project_id: int, name: Optional[str] = None,
-                   description: Optional[str] = None, icon: Optional[str] = None,
-                   color: Optional[str] = None, goal_amount: Optional[float] = None,
-                   report_url: Optional[str] = None, latitude: Optional[float] = None,
-                   longitude: Optional[float] = None) -> Optional[ProjectDB]:
+async def get_project_clusters(db: AsyncSession, min_lat: float, max_lat: float,
+                               lon_ranges: List[Tuple[float, float]], zoom: int) -> List[dict]:
+    """Get precomputed clusters of a zoom level inside a bounding box"""
+    level = cluster_level_for_zoom(zoom)
+    cell_ranges = cluster_cell_ranges(level, min_lat, max_lat, lon_ranges)
+    result = await db.execute(
+        select(ProjectClusterDB).filter(
+            ProjectClusterDB.level == level,
+            or_(*[ProjectClusterDB.cell.between(first, last) for first, last in cell_ranges]),
+            ProjectClusterDB.project_count > 0
+        )
+    )
+    return [
+        {
+            "level": cluster.level,
+            "cell": cluster.cell,
+            "count": cluster.project_count,
+            "latitude": cluster.lat_sum / cluster.project_count,
+            "longitude": cluster.lon_sum / cluster.project_count,
+            "goal_amount": cluster.goal_amount,
+            "current_amount": cluster.current_amount
+        }
+        for cluster in result.scalars()
+    ]
+
+
+async def rebuild_project_clusters(db: AsyncSession) -> int:
+    """
+    Recompute every cluster row from the projects table. Donation amounts
+    still buffered in other workers are flushed on top, so run it when quiet.
+    """
+    cluster_amounts.drain()  # already included in current_amount
+    shard_amounts = select(func.coalesce(func.sum(ProjectCounterShardDB.current_amount), 0.0)).where(
+        ProjectCounterShardDB.project_id == ProjectDB.id
+    ).scalar_subquery()
+    await db.execute(
+        update(ProjectDB)
+        .values(cluster_amount=ProjectDB.current_amount + shard_amounts,
+                updated_at=ProjectDB.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+    aggregates = {}
+    result = await db.execute(
+        select(ProjectDB.latitude, ProjectDB.longitude, ProjectDB.goal_amount,
+               ProjectDB.cluster_amount)
+        .filter(ProjectDB.latitude.isnot(None), ProjectDB.longitude.isnot(None))
+    )
+    for lat, lon, goal, current in result:
+        row, col = finest_cluster_cell(lat, lon)
+        for key in cluster_cells(row, col):
+            agg = aggregates.setdefault(key, [0, 0.0, 0.0, 0.0, 0.0])
+            agg[0] += 1
+            agg[1] += lat
+            agg[2] += lon
+            agg[3] += goal
+            agg[4] += current
+
+    await db.execute(delete(ProjectClusterDB))
+    rows = [
+        {"level": level, "cell": cell, "project_count": agg[0], "lat_sum": agg[1],
+         "lon_sum": agg[2], "goal_amount": agg[3], "current_amount": agg[4]}
+        for (level, cell), agg in aggregates.items()
+    ]
+    if rows:
+        await db.execute(ProjectClusterDB.__table__.insert(), rows)
+    await db.commit()
+    return len(rows)
+
+
+async def update_project(db: AsyncSession, project_id: int, name: Optional[str] = None,
+                         description: Optional[str] = None, icon: Optional[str] = None,
+                         color: Optional[str] = None, goal_amount: Optional[float] = None,
+                         report_url: Optional[str] = None, latitude: Optional[float] = None,
+                         longitude: Optional[float] = None) -> Optional[ProjectDB]:
     """Update project information"""
-    db_project = get_project_by_id(db, project_id)
+    db_project = await get_project_by_id(db, project_id)
     if db_project:
+        if latitude is not None or longitude is not None:
+            # No flush may commit between reading the clustered amount and moving it between cells
+            await db.refresh(db_project, ["cluster_amount"], with_for_update=True)
+        await _apply_shard_totals(db, [db_project])
+        old_location = (db_project.latitude, db_project.longitude, db_project.goal_amount)
         if name:
             db_project.name = name
         if description:
@@ -136,93 +555,661 @@ def update_project(db: Session, project_id: int, name: Optional[str] = None,
             db_project.latitude = latitude
         if longitude is not None:
             db_project.longitude = longitude
-        db.commit()
-        db.refresh(db_project)
+        db_project.geo_cell = grid_cell(db_project.latitude, db_project.longitude)
+        new_location = (db_project.latitude, db_project.longitude, db_project.goal_amount)
+        if new_location != old_location:
+            # Move the project's contribution between cluster cells; amounts
+            # still buffered follow it to the new cells when flushed
+            old_lat, old_lon, old_goal = old_location
+            shifts = []
+            if old_lat is not None and old_lon is not None:
+                shifts.append((old_lat, old_lon, -1, -old_goal, -db_project.cluster_amount))
+            if db_project.latitude is not None and db_project.longitude is not None:
+                shifts.append((db_project.latitude, db_project.longitude, 1,
+                               db_project.goal_amount, db_project.cluster_amount))
+            await _shift_clusters(db, shifts)
+        await db.commit()
+        cache_invalidator.invalidate("project_counters", project_id)
+        _projects_changed(project_id)
+        await db.refresh(db_project)
+        await _apply_shard_totals(db, [db_project])
+        _index_project(db_project)
     return db_project
 
 
-def verify_project(db: Session, project_id: int, admin_id: int) -> Optional[ProjectDB]:
+async def verify_project(db: AsyncSession, project_id: int, admin_id: int) -> Optional[ProjectDB]:
     """Verify project (admin only)"""
-    admin = get_user_by_id(db, admin_id)
+    admin = await get_user_by_id(db, admin_id)
     if not admin or not admin.is_admin:
         return None
-    
-    db_project = get_project_by_id(db, project_id)
+
+    db_project = await get_project_by_id(db, project_id)
     if db_project:
         db_project.is_verified = True
-        db.commit()
-        db.refresh(db_project)
+        await db.commit()
+        await db.refresh(db_project)
+        _projects_changed(project_id)
     return db_project
 
 
-def unverify_project(db: Session, project_id: int, admin_id: int) -> Optional[ProjectDB]:
+async def unverify_project(db: AsyncSession, project_id: int, admin_id: int) -> Optional[ProjectDB]:
     """Unverify project (admin only)"""
-    admin = get_user_by_id(db, admin_id)
+    admin = await get_user_by_id(db, admin_id)
     if not admin or not admin.is_admin:
         return None
-    
-    db_project = get_project_by_id(db, project_id)
+
+    db_project = await get_project_by_id(db, project_id)
     if db_project:
         db_project.is_verified = False
-        db.commit()
-        db.refresh(db_project)
+        await db.commit()
+        await db.refresh(db_project)
+        _projects_changed(project_id)
     return db_project
 
 
-def update_project_status(db: Session, project_id: int, status: ProjectStatus) -> Optional[ProjectDB]:
+# ============ SHARDED COUNTERS ============
+
+async def _apply_shard_totals(db: AsyncSession, projects: List[ProjectDB]):
+    """
+    Add the (briefly cached) shard sums of sharded projects to their loaded
+    totals. Values are set as committed state, so they are never written back.
+    Call only on freshly loaded rows, or totals would be added twice.
+    """
+    sharded = [p for p in projects if p.counter_shards]
+    if not sharded:
+        return
+    missing = [p.id for p in sharded if shard_totals.get(p.id) is None]
+    if missing:
+        result = await db.execute(
+            select(
+                ProjectCounterShardDB.project_id,
+                func.sum(ProjectCounterShardDB.current_amount),
+                func.sum(ProjectCounterShardDB.donations_count),
+                func.sum(ProjectCounterShardDB.donors_count)
+            )
+            .filter(ProjectCounterShardDB.project_id.in_(missing))
+            .group_by(ProjectCounterShardDB.project_id)
+        )
+        found = {row[0]: (row[1] or 0.0, row[2] or 0, row[3] or 0) for row in result}
+        for project_id in missing:
+            shard_totals.set(project_id, found.get(project_id, (0.0, 0, 0)))
+
+    for project in sharded:
+        amount, donations, donors = shard_totals.get(project.id) or (0.0, 0, 0)
+        set_committed_value(project, "current_amount", project.current_amount + amount)
+        set_committed_value(project, "donations_count", project.donations_count + donations)
+        set_committed_value(project, "donors_count", project.donors_count + donors)
+
+
+async def _counter_hint(db: AsyncSession, project_id: int) -> Optional[int]:
+    """counter_shards of a project, cached as a routing hint (None if it does not exist)"""
+    hint = counter_hints.get(project_id)
+    if hint is None:
+        hint = await db.scalar(
+            select(ProjectDB.counter_shards).filter(ProjectDB.id == project_id)
+        )
+        if hint is None:
+            return None
+        counter_hints.set(project_id, hint)
+    return hint
+
+
+async def set_project_counter_shards(db: AsyncSession, project_id: int,
+                                     shards: int) -> Optional[ProjectDB]:
+    """
+    Switch a project between a single counter row (shards=0) and N shard rows.
+    Existing shard deltas are folded into the project row first; their rows
+    are locked while folding, so no concurrent donation is lost.
+    """
+    project = await get_project_by_id(db, project_id)
+    if not project:
+        return None
+
+    locked = await db.execute(
+        select(ProjectCounterShardDB)
+        .filter(ProjectCounterShardDB.project_id == project_id)
+        .with_for_update()
+    )
+    rows = locked.scalars().all()
+    await db.execute(
+        update(ProjectDB)
+        .where(ProjectDB.id == project_id)
+        .values(
+            current_amount=ProjectDB.current_amount + sum(r.current_amount for r in rows),
+            donations_count=ProjectDB.donations_count + sum(r.donations_count for r in rows),
+            donors_count=ProjectDB.donors_count + sum(r.donors_count for r in rows),
+            counter_shards=shards
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        delete(ProjectCounterShardDB)
+        .where(ProjectCounterShardDB.project_id == project_id)
+        .execution_options(synchronize_session=False)
+    )
+    if shards:
+        await db.execute(
+            insert(ProjectCounterShardDB),
+            [{"project_id": project_id, "shard": shard, "current_amount": 0.0,
+              "donations_count": 0, "donors_count": 0} for shard in range(shards)]
+        )
+    await db.commit()
+
+    cache_invalidator.invalidate("project_counters", project_id)
+    _projects_changed(project_id)
+    return await get_project_with_totals(db, project_id)
+
+
+async def reconcile_project_counters(db: AsyncSession, project_id: Optional[int] = None) -> int:
+    """
+    Rebuild the denormalized project counters from the child tables in one
+    UPDATE (all projects, or a single one), after recording any donor the
+    donor table is missing. Returns the number of projects touched.
+    """
+    donor_pairs = select(DonationDB.project_id, DonationDB.user_id).distinct().where(
+        true() if project_id is None else DonationDB.project_id == project_id
+    )  # SQLite needs a WHERE to parse INSERT ... SELECT ... ON CONFLICT
+    donor_table = ProjectDonorDB.__table__
+    await db.execute(
+        dialect_insert(db, donor_table)
+        .from_select(["project_id", "user_id"], donor_pairs)
+        .on_conflict_do_nothing(index_elements=[donor_table.c.project_id, donor_table.c.user_id])
+    )
+
+    issues = select(func.count(IssueDB.id)).where(
+        IssueDB.project_id == ProjectDB.id
+    ).scalar_subquery()
+    donations = select(func.count(DonationDB.id)).where(
+        DonationDB.project_id == ProjectDB.id
+    ).scalar_subquery()
+    donors = select(func.count(distinct(DonationDB.user_id))).where(
+        DonationDB.project_id == ProjectDB.id
+    ).scalar_subquery()
+
+    stmt = update(ProjectDB).values(
+        issues_count=issues,
+        donations_count=donations,
+        donors_count=donors
+    )
+    if project_id is not None:
+        stmt = stmt.where(ProjectDB.id == project_id)
+    result = await db.execute(
+        stmt.returning(ProjectDB.id).execution_options(synchronize_session=False)
+    )
+    project_ids = result.scalars().all()
+
+    # The counts above are complete, so shards keep only their amounts
+    shard_stmt = update(ProjectCounterShardDB).values(donations_count=0, donors_count=0)
+    if project_id is not None:
+        shard_stmt = shard_stmt.where(ProjectCounterShardDB.project_id == project_id)
+    await db.execute(shard_stmt.execution_options(synchronize_session=False))
+    await db.commit()
+    cache_invalidator.invalidate("project_counters", project_id)
+    # Every touched project, so cached detail validators are retired too
+    _projects_changed(*project_ids)
+    return len(project_ids)
+
+
+async def update_project_status(db: AsyncSession, project_id: int,
+                                status: ProjectStatus) -> Optional[ProjectDB]:
     """Update project status"""
-    db_project = get_project_by_id(db, project_id)
+    db_project = await get_project_by_id(db, project_id)
     if db_project:
         db_project.status = status
-        db.commit()
-        db.refresh(db_project)
+        await db.commit()
+        await db.refresh(db_project)
+        _projects_changed(project_id)
     return db_project
 
 
 # ============ DONATION CRUD & TRANSACTIONS ============
 
-def process_donation(db: Session, user_id: int, project_id: int,
-                     amount: float, is_anonymous: bool = False) -> Optional[DonationDB]:
+def _publish_donations(donations: List[DonationDB]):
+    """Live activity stream; anonymous donors stay anonymous there too"""
+    for donation in donations:
+        activity_broker.publish("donation", {
+            "id": donation.id, "project_id": donation.project_id,
+            "donor_id": None if donation.is_anonymous else donation.user_id,
+            "amount": donation.amount, "created_at": donation.created_at
+        })
+
+
+async def _claim_new_donors(db: AsyncSession,
+                            pairs: Set[Tuple[int, int]]) -> Set[Tuple[int, int]]:
+    """
+    Record (project_id, user_id) donor pairs; returns those that were not
+    donors yet. The insert waits on a concurrent uncommitted claim of the same
+    pair, so of two simultaneous first donations exactly one counts as new.
+    """
+    if not pairs:
+        return set()
+    table = ProjectDonorDB.__table__
+    result = await db.execute(
+        dialect_insert(db, table)
+        .on_conflict_do_nothing(index_elements=[table.c.project_id, table.c.user_id])
+        .returning(table.c.project_id, table.c.user_id),
+        # Sorted so concurrent transactions lock donor keys in the same order
+        [{"project_id": p, "user_id": u} for p, u in sorted(pairs)]
+    )
+    return {(row.project_id, row.user_id) for row in result}
+
+
+async def process_donation(db: AsyncSession, user_id: int, project_id: int,
+                           amount: float, is_anonymous: bool = False) -> Optional[DonationDB]:
     """
     Process donation in a single transaction:
-    1. Create donation record
-    2. Update project current_amount
+    1. Atomically add the amount to the project (or, for sharded projects, to
+       a random counter shard) and bump its donation/donor counters
+    2. Create donation record
+    The increment happens in the database, so concurrent donations never
+    overwrite each other; the counter row lock serializes them per row.
     """
     try:
-        # Create donation record
-        db_donation = DonationDB(
-            user_id=user_id,
-            project_id=project_id,
-            amount=amount,
-            is_anonymous=is_anonymous
-        )
-        db.add(db_donation)
-        
-        # Update project current amount
-        db_project = get_project_by_id(db, project_id)
-        if db_project:
-            db_project.current_amount += amount
-        
-        db.commit()
-        db.refresh(db_donation)
+        shards = await _counter_hint(db, project_id)
+        if shards is None:
+            return None
+
+        # First donation of this user to the project counts as a new donor
+        new_donor = len(await _claim_new_donors(db, {(project_id, user_id)}))
+
+        counted = False
+        if shards:
+            result = await db.execute(
+                update(ProjectCounterShardDB)
+                .where(ProjectCounterShardDB.project_id == project_id,
+                       ProjectCounterShardDB.shard == random.randrange(shards))
+                .values(
+                    current_amount=ProjectCounterShardDB.current_amount + amount,
+                    donations_count=ProjectCounterShardDB.donations_count + 1,
+                    donors_count=ProjectCounterShardDB.donors_count + new_donor
+                )
+                .execution_options(synchronize_session=False)
+            )
+            # No row: sharding was switched off or resized since the hint was cached
+            counted = result.rowcount == 1
+
+        if not counted:
+            result = await db.execute(
+                update(ProjectDB)
+                .where(ProjectDB.id == project_id)
+                .values(
+                    current_amount=ProjectDB.current_amount + amount,
+                    donations_count=ProjectDB.donations_count + 1,
+                    donors_count=ProjectDB.donors_count + new_donor
+                )
+                .returning(ProjectDB.id)
+                .execution_options(synchronize_session=False)
+            )
+            if result.first() is None:
+                await db.rollback()
+                counter_hints.pop(project_id)
+                return None
+
+        db_donation = await db.scalar(
+            insert(DonationDB)
+            .values(user_id=user_id, project_id=project_id, amount=amount,
+                    is_anonymous=is_anonymous)
+            .returning(DonationDB)
+        )
+        await _add_to_rollups(db, [(project_id, user_id, amount, 1, db_donation.created_at)])
+        await db.commit()
+        _invalidate_user_stats(user_id)
+        _projects_changed(project_id)
+        _publish_donations([db_donation])
+        cluster_amounts.add(project_id, amount)
         return db_donation
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error processing donation: {e}")
         return None
 
 
-def get_donations_by_project(db: Session, project_id: int, skip: int = 0,
-                             limit: int = 100) -> List[DonationDB]:
+async def process_donation_batch(db: AsyncSession,
+                                 donations: List[dict]) -> List[Optional[DonationDB]]:
+    """
+    Process many donations in one transaction (group commit):
+    1. One aggregated increment per project (sharded projects get it on the
+       project row too; a batch already turns N hot-row updates into one)
+    2. One multi-row insert of the donation records
+    donations are dicts of user_id, project_id, amount, is_anonymous; results
+    are in the same order, None for donations to projects that do not exist.
+    """
+    project_ids = {d["project_id"] for d in donations}
+    existing = set(await db.scalars(select(ProjectDB.id).filter(ProjectDB.id.in_(project_ids))))
+    accepted = [d for d in donations if d["project_id"] in existing]
+    if not accepted:
+        return [None] * len(donations)
+
+    # Claimed before the project rows are locked, in the same order as process_donation
+    pairs = {(d["project_id"], d["user_id"]) for d in accepted}
+    new_donors = await _claim_new_donors(db, pairs)
+
+    totals = {}
+    for project_id, user_id in pairs:
+        totals.setdefault(project_id, [0.0, 0, 0])
+        if (project_id, user_id) in new_donors:
+            totals[project_id][2] += 1
+    for d in accepted:
+        totals[d["project_id"]][0] += d["amount"]
+        totals[d["project_id"]][1] += 1
+
+    # Sorted so concurrent batches lock project rows in the same order
+    projects = ProjectDB.__table__
+    await db.execute(
+        update(projects)
+        .where(projects.c.id == bindparam("b_id"))
+        .values(
+            current_amount=projects.c.current_amount + bindparam("b_amount"),
+            donations_count=projects.c.donations_count + bindparam("b_donations"),
+            donors_count=projects.c.donors_count + bindparam("b_donors")
+        ),
+        [
+            {"b_id": project_id, "b_amount": amount, "b_donations": count, "b_donors": donors}
+            for project_id, (amount, count, donors) in sorted(totals.items())
+        ]
+    )
+    rows = await db.scalars(
+        insert(DonationDB).returning(DonationDB, sort_by_parameter_order=True),
+        [
+            {"user_id": d["user_id"], "project_id": d["project_id"], "amount": d["amount"],
+             "is_anonymous": d["is_anonymous"]}
+            for d in accepted
+        ]
+    )
+    created = rows.all()
+    await _add_to_rollups(db, [(d.project_id, d.user_id, d.amount, 1, d.created_at) for d in created])
+    await db.commit()
+    _invalidate_user_stats(*{d.user_id for d in created})
+    _projects_changed(*totals)
+    _publish_donations(created)
+    created = iter(created)
+
+    for project_id, (amount, _, _) in totals.items():
+        cluster_amounts.add(project_id, amount)
+    return [next(created) if d["project_id"] in existing else None for d in donations]
+
+
+async def _copy_donations(db: AsyncSession, rows: List[tuple]):
+    """Bulk-load (user_id, project_id, amount, is_anonymous) rows, with COPY on PostgreSQL"""
+    if db.get_bind().dialect.name == "postgresql":
+        connection = await db.connection()
+        raw = await connection.get_raw_connection()
+        async with raw.driver_connection.cursor() as cursor:
+            async with cursor.copy(
+                "COPY donations (user_id, project_id, amount, is_anonymous) FROM STDIN"
+            ) as copy:
+                for row in rows:
+                    await copy.write_row(row)
+    else:
+        await db.execute(
+            DonationDB.__table__.insert(),
+            [{"user_id": u, "project_id": p, "amount": a, "is_anonymous": anon}
+             for u, p, a, anon in rows]
+        )
+
+
+async def _apply_import_deltas(db: AsyncSession, deltas: Dict[int, list]):
+    """Add {project_id: [amount, donations, new donors]} to the projects in one statement"""
+    rows = [(project_id, *delta) for project_id, delta in sorted(deltas.items())]
+    projects = ProjectDB.__table__
+    if db.get_bind().dialect.name == "postgresql":
+        delta_rows = values(
+            column("id", Integer), column("amount", Float),
+            column("donations", Integer), column("donors", Integer),
+            name="deltas"
+        ).data(rows)
+        stmt = update(projects).where(projects.c.id == delta_rows.c.id).values(
+            current_amount=projects.c.current_amount + delta_rows.c.amount,
+            donations_count=projects.c.donations_count + delta_rows.c.donations,
+            donors_count=projects.c.donors_count + delta_rows.c.donors
+        )
+        await db.execute(stmt)
+    else:
+        # SQLite cannot name the columns of a VALUES list: one executemany instead
+        await db.execute(
+            update(projects)
+            .where(projects.c.id == bindparam("b_id"))
+            .values(
+                current_amount=projects.c.current_amount + bindparam("b_amount"),
+                donations_count=projects.c.donations_count + bindparam("b_donations"),
+                donors_count=projects.c.donors_count + bindparam("b_donors")
+            ),
+            [{"b_id": i, "b_amount": a, "b_donations": n, "b_donors": d} for i, a, n, d in rows]
+        )
+
+
+async def import_donations(db: AsyncSession,
+                           rows: AsyncIterator[Tuple[int, Union[DonationImportRow, str]]],
+                           default_user_id: int) -> dict:
+    """
+    Load a stream of parsed donation rows in one transaction:
+    1. Every IMPORT_CHUNK_SIZE rows, check projects/users exist and bulk-load the chunk
+    2. At the end, claim the donor keys (sorted, once), then apply the
+       per-project amount/counter deltas and the rollups
+    Claims lock their keys until the commit, so they are left to the end: live
+    donations of the same donors wait for the last step only, not the whole import.
+    Invalid rows are skipped and reported; returns {imported, failed, errors}.
+    """
+    report = {"imported": 0, "failed": 0, "errors": []}
+    known_projects, missing_projects, known_users, missing_users = set(), set(), set(), set()
+    donors: Dict[Tuple[int, int], list] = {}  # (project_id, user_id) -> [amount, donations]
+    deltas: Dict[int, list] = {}
+    # created_at of every imported row, naive like the stored column (PostgreSQL returns it aware)
+    imported_at = (await db.scalar(select(func.now()))).replace(tzinfo=None)
+
+    def fail(row_number: int, error: str):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_IMPORT_ERRORS:
+            report["errors"].append({"row": row_number, "error": error})
+
+    async def load(chunk: List[Tuple[int, DonationImportRow]]):
+        project_ids = {r.project_id for _, r in chunk} - known_projects - missing_projects
+        if project_ids:
+            result = await db.execute(select(ProjectDB.id).filter(ProjectDB.id.in_(project_ids)))
+            known_projects.update(result.scalars())
+            missing_projects.update(project_ids - known_projects)
+        user_ids = {r.user_id or default_user_id for _, r in chunk} - known_users - missing_users
+        if user_ids:
+            result = await db.execute(select(UserDB.id).filter(UserDB.id.in_(user_ids)))
+            known_users.update(result.scalars())
+            missing_users.update(user_ids - known_users)
+
+        accepted = []
+        for row_number, r in chunk:
+            user_id = r.user_id or default_user_id
+            if r.project_id not in known_projects:
+                fail(row_number, f"project_id: project {r.project_id} not found")
+            elif user_id not in known_users:
+                fail(row_number, f"user_id: user {user_id} not found")
+            else:
+                accepted.append((user_id, r.project_id, r.amount, r.is_anonymous))
+        if not accepted:
+            return
+
+        await _copy_donations(db, accepted)
+        for user_id, project_id, amount, _ in accepted:
+            for delta in (deltas.setdefault(project_id, [0.0, 0, 0]),
+                          donors.setdefault((project_id, user_id), [0.0, 0])):
+                delta[0] += amount
+                delta[1] += 1
+        report["imported"] += len(accepted)
+
+    try:
+        chunk = []
+        async for row_number, row in rows:
+            if isinstance(row, str):
+                fail(row_number, row)
+                continue
+            chunk.append((row_number, row))
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                await load(chunk)
+                chunk = []
+        if chunk:
+            await load(chunk)
+        if deltas:
+            # Donors who gave before this import are not new
+            for project_id, _ in await _claim_new_donors(db, set(donors)):
+                deltas[project_id][2] += 1
+            await _apply_import_deltas(db, deltas)
+            await _add_to_rollups(db, [
+                (project_id, user_id, amount, count, imported_at)
+                for (project_id, user_id), (amount, count) in donors.items()
+            ])
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    _invalidate_user_stats(*{user_id for _, user_id in donors})
+    _projects_changed(*deltas)
+    for project_id, (amount, _, _) in deltas.items():
+        cluster_amounts.add(project_id, amount)
+    report["errors"].sort(key=lambda error: error["row"])
+    return report
+
+
+# ============ DONATION ROLLUPS ============
+
+async def _upsert_rollups(db: AsyncSession, rows: List[dict]):
+    """Add rows of deltas to donation_rollups, creating missing buckets"""
+    table = DonationRollupDB.__table__
+    stmt = dialect_insert(db, table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.project_id, table.c.granularity, table.c.bucket_start],
+        set_={
+            name: table.c[name] + stmt.excluded[name]
+            for name in ("total_amount", "donation_count", "distinct_donors")
+        }
+    )
+    await db.execute(stmt)
+
+
+async def _claim_bucket_donors(db: AsyncSession, keys: Set[tuple]) -> Set[tuple]:
+    """
+    Record (project_id, granularity, bucket_start, user_id) bucket donors;
+    returns those that were not counted in their bucket yet (see _claim_new_donors).
+    """
+    if not keys:
+        return set()
+    table = DonationRollupDonorDB.__table__
+    result = await db.execute(
+        dialect_insert(db, table)
+        .on_conflict_do_nothing(index_elements=list(table.primary_key.columns))
+        .returning(table.c.project_id, table.c.granularity, table.c.bucket_start, table.c.user_id),
+        [{"project_id": p, "granularity": g, "bucket_start": b, "user_id": u}
+         for p, g, b, u in sorted(keys)]
+    )
+    return {tuple(row) for row in result}
+
+
+async def _add_to_rollups(db: AsyncSession, donations: List[tuple]):
+    """
+    Count new donations, given as (project_id, user_id, amount, count,
+    created_at) groups, in their bucket of every granularity: claim the
+    bucket donors, then one upsert.
+    """
+    deltas, keys = {}, set()
+    for project_id, user_id, amount, count, created_at in donations:
+        for granularity in GRANULARITIES:
+            start = bucket_start(created_at, granularity)
+            delta = deltas.setdefault((project_id, granularity, start), [0.0, 0, 0])
+            delta[0] += amount
+            delta[1] += count
+            keys.add((project_id, granularity, start, user_id))
+    for project_id, granularity, start, _ in await _claim_bucket_donors(db, keys):
+        deltas[(project_id, granularity, start)][2] += 1
+    if deltas:
+        await _upsert_rollups(db, [
+            {"project_id": project_id, "granularity": granularity, "bucket_start": start,
+             "total_amount": amount, "donation_count": count, "distinct_donors": donors}
+            for (project_id, granularity, start), (amount, count, donors) in sorted(deltas.items())
+        ])
+
+
+async def rebuild_donation_rollups(db: AsyncSession, project_id: Optional[int] = None) -> int:
+    """
+    Recompute the rollups and their bucket donors from the donations table
+    (all projects, or one), one project at a time. Returns the number of buckets written.
+    """
+    if project_id is None:
+        project_ids = (await db.execute(select(ProjectDB.id).order_by(ProjectDB.id))).scalars().all()
+        await db.execute(delete(DonationRollupDB))
+        await db.execute(delete(DonationRollupDonorDB))
+    else:
+        project_ids = [project_id]
+        await db.execute(delete(DonationRollupDB).where(DonationRollupDB.project_id == project_id))
+        await db.execute(
+            delete(DonationRollupDonorDB).where(DonationRollupDonorDB.project_id == project_id)
+        )
+
+    written = 0
+    for pid in project_ids:
+        buckets = {}
+        result = await db.stream(
+            select(DonationDB.user_id, DonationDB.amount, DonationDB.created_at)
+            .filter(DonationDB.project_id == pid)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        async for user_id, amount, created_at in result:
+            for granularity in GRANULARITIES:
+                bucket = buckets.setdefault((granularity, bucket_start(created_at, granularity)),
+                                            [0.0, 0, set()])
+                bucket[0] += amount
+                bucket[1] += 1
+                bucket[2].add(user_id)
+        if buckets:
+            await db.execute(DonationRollupDB.__table__.insert(), [
+                {"project_id": pid, "granularity": granularity, "bucket_start": start,
+                 "total_amount": amount, "donation_count": count, "distinct_donors": len(donors)}
+                for (granularity, start), (amount, count, donors) in buckets.items()
+            ])
+            await db.execute(DonationRollupDonorDB.__table__.insert(), [
+                {"project_id": pid, "granularity": granularity, "bucket_start": start,
+                 "user_id": user_id}
+                for (granularity, start), (_, _, donors) in buckets.items()
+                for user_id in donors
+            ])
+            written += len(buckets)
+    await db.commit()
+    return written
+
+
+async def get_donation_timeseries(db: AsyncSession, project_id: int, granularity: str,
+                                  since: Optional[datetime] = None,
+                                  until: Optional[datetime] = None,
+                                  limit: int = 366) -> List[DonationRollupDB]:
+    """Get a project's donation buckets in time order, read from the rollup table only"""
+    query = select(DonationRollupDB).filter(
+        DonationRollupDB.project_id == project_id,
+        DonationRollupDB.granularity == granularity
+    )
+    if since is not None:
+        query = query.filter(DonationRollupDB.bucket_start >= bucket_start(since, granularity))
+    if until is not None:
+        query = query.filter(DonationRollupDB.bucket_start <= until)
+    result = await db.execute(query.order_by(DonationRollupDB.bucket_start).limit(limit))
+    return result.scalars().all()
+
+
+async def get_donations_by_project(db: AsyncSession, project_id: int, skip: int = 0,
+                                   limit: int = 100,
+                                   cursor: Optional[str] = None) -> List[DonationDB]:
     """Get all donations for a project"""
-    return db.query(DonationDB).filter(
-        DonationDB.project_id == project_id
-    ).offset(skip).limit(limit).all()
+    result = await db.execute(
+        paginate(
+            select(DonationDB)
+            .options(selectinload(DonationDB.user))
+            .filter(DonationDB.project_id == project_id),
+            [DonationDB.id], cursor, skip, limit
+        )
+    )
+    return result.scalars().all()
 
 
-def get_public_donations(db: Session, project_id: int) -> List[dict]:
+async def get_public_donations(db: AsyncSession, project_id: int, skip: int = 0,
+                               limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
     """Get public donation list (hides anonymous donor names)"""
-    donations = get_donations_by_project(db, project_id)
+    donations = await get_donations_by_project(db, project_id, skip, limit, cursor)
     result = []
     for donation in donations:
         donor_name = None if donation.is_anonymous else donation.user.name
@@ -236,11 +1223,34 @@ def get_public_donations(db: Session, project_id: int) -> List[dict]:
     return result
 
 
+async def stream_public_donations(db: AsyncSession, project_id: int) -> AsyncIterator[dict]:
+    """
+    Yield a project's whole public ledger (oldest first, anonymous donors
+    masked) from a server-side cursor, EXPORT_BATCH_SIZE rows at a time
+    """
+    stmt = (
+        select(
+            DonationDB.id,
+            DonationDB.amount,
+            case((DonationDB.is_anonymous == True, None), else_=UserDB.name).label("donor_name"),
+            DonationDB.project_id,
+            DonationDB.created_at
+        )
+        .join(UserDB, UserDB.id == DonationDB.user_id)
+        .filter(DonationDB.project_id == project_id)
+        .order_by(DonationDB.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    result = await db.stream(stmt)
+    async for row in result.mappings():
+        yield dict(row)
+
+
 # ============ ISSUE CRUD ============
 
-def create_issue(db: Session, project_id: int, reporter_id: int, title: str,
-                description: str, category: IssueCategory = IssueCategory.HANDS,
-                priority: str = "medium", due_date: Optional[str] = None) -> IssueDB:
+async def create_issue(db: AsyncSession, project_id: int, reporter_id: int, title: str,
+                       description: str, category: IssueCategory = IssueCategory.HANDS,
+                       priority: str = "medium", due_date: Optional[str] = None) -> IssueDB:
     """Create a new volunteer task/issue"""
     db_issue = IssueDB(
         project_id=project_id,
@@ -254,64 +1264,148 @@ def create_issue(db: Session, project_id: int, reporter_id: int, title: str,
         assignee_id=None
     )
     db.add(db_issue)
-    db.commit()
-    db.refresh(db_issue)
+    await db.execute(
+        update(ProjectDB)
+        .where(ProjectDB.id == project_id)
+        .values(issues_count=ProjectDB.issues_count + 1)
+    )
+    await db.commit()
+    await db.refresh(db_issue)
+    _index_issue(db_issue)
+    _invalidate_user_stats(reporter_id)
+    _projects_changed(project_id)
+    _issues_changed()
     return db_issue
 
 
-def get_issue_by_id(db: Session, issue_id: int) -> Optional[IssueDB]:
-    """Get issue by ID"""
-    return db.query(IssueDB).filter(IssueDB.id == issue_id).first()
+async def get_issue_by_id(db: AsyncSession, issue_id: int) -> Optional[IssueDB]:
+    """Get issue by ID (with its project, used for ownership checks)"""
+    result = await db.execute(
+        select(IssueDB).options(joinedload(IssueDB.project)).filter(IssueDB.id == issue_id)
+    )
+    return result.scalars().first()
+
+
+async def get_issues_by_ids(db: AsyncSession, issue_ids: List[int]) -> List[IssueDB]:
+    """Get several issues by ID (with their projects, used for ownership checks)"""
+    result = await db.execute(
+        select(IssueDB).options(joinedload(IssueDB.project)).filter(IssueDB.id.in_(issue_ids))
+    )
+    return result.scalars().all()
 
 
-def get_issues_by_project(db: Session, project_id: int, skip: int = 0,
-                          limit: int = 100) -> List[IssueDB]:
+async def get_issue_detail(db: AsyncSession, issue_id: int) -> Optional[IssueDB]:
+    """Get issue with reporter, assignee and project loaded"""
+    result = await db.execute(
+        select(IssueDB)
+        .options(
+            joinedload(IssueDB.reporter),
+            joinedload(IssueDB.assignee),
+            joinedload(IssueDB.project)
+        )
+        .filter(IssueDB.id == issue_id)
+    )
+    return result.scalars().first()
+
+
+async def get_all_issues(db: AsyncSession, skip: int = 0, limit: int = 100,
+                         cursor: Optional[str] = None) -> List[IssueDB]:
+    """Get all issues with pagination"""
+    result = await db.execute(
+        paginate(select(IssueDB), [IssueDB.id], cursor, skip, limit)
+    )
+    return result.scalars().all()
+
+
+async def get_issues_by_project(db: AsyncSession, project_id: int, skip: int = 0,
+                                limit: int = 100, cursor: Optional[str] = None) -> List[IssueDB]:
     """Get all issues for a project"""
-    return db.query(IssueDB).filter(
-        IssueDB.project_id == project_id
-    ).offset(skip).limit(limit).all()
+    result = await db.execute(
+        paginate(
+            select(IssueDB).filter(IssueDB.project_id == project_id),
+            [IssueDB.id], cursor, skip, limit
+        )
+    )
+    return result.scalars().all()
 
 
-def assign_volunteer(db: Session, issue_id: int, volunteer_id: int) -> Optional[IssueDB]:
+async def assign_volunteer(db: AsyncSession, issue_id: int, volunteer_id: int) -> Optional[IssueDB]:
     """Assign a volunteer to an issue"""
-    db_issue = get_issue_by_id(db, issue_id)
+    db_issue = await get_issue_by_id(db, issue_id)
     if db_issue:
+        previous_assignee_id = db_issue.assignee_id
         db_issue.assignee_id = volunteer_id
         db_issue.status = "in-progress"
-        db.commit()
-        db.refresh(db_issue)
+        await db.commit()
+        await db.refresh(db_issue)
+        _invalidate_user_stats(previous_assignee_id, volunteer_id)
+        _issues_changed()
     return db_issue
 
 
-def close_issue(db: Session, issue_id: int) -> Optional[IssueDB]:
-    """
-    Close an issue and award XP to assignee:
-    1. Update issue status
-    2. Award XP to volunteer
-    """
-    db_issue = get_issue_by_id(db, issue_id)
-    if db_issue and db_issue.assignee_id:
-        db_issue.status = "closed"
-        
-        # Award XP based on priority
-        xp_reward = {
-            "low": 10,
-            "medium": 25,
-            "high": 50
-        }.get(db_issue.priority, 25)
-        
-        add_xp_to_user(db, db_issue.assignee_id, xp_reward)
-        db.commit()
-        db.refresh(db_issue)
-    return db_issue
+async def close_issues(db: AsyncSession, issue_ids: List[int]) -> List[IssueDB]:
+    """
+    Close assigned, still-open issues and award XP to their assignees in one
+    transaction (two statements). Issues that are unassigned, already closed
+    or missing are left alone; returns the issues that were closed.
+    """
+    if not issue_ids:
+        return []
+    close = (
+        update(IssueDB)
+        .where(
+            IssueDB.id.in_(issue_ids),
+            IssueDB.assignee_id.isnot(None),
+            IssueDB.status != "closed"
+        )
+        .values(status="closed")
+        .returning(IssueDB)
+    )
+    # from_statement so issues already in the session are refreshed from RETURNING
+    result = await db.execute(
+        select(IssueDB).from_statement(close).execution_options(populate_existing=True)
+    )
+    closed = result.scalars().all()
+
+    # Award XP based on priority
+    awards: Dict[int, int] = {}
+    for issue in closed:
+        awards[issue.assignee_id] = (
+            awards.get(issue.assignee_id, 0) + XP_REWARDS.get(issue.priority, DEFAULT_XP_REWARD)
+        )
+    new_xp = await _award_xp(db, awards)
+    await db.commit()
+    _sync_xp(new_xp)
+    if closed:
+        _issues_changed()
+    closed.sort(key=lambda issue: issue.id)
+    for issue in closed:
+        activity_broker.publish("issue_closed", {
+            "issue_id": issue.id, "issue_title": issue.title, "project_id": issue.project_id,
+            "volunteer_id": issue.assignee_id,
+            "volunteer_xp_gained": XP_REWARDS.get(issue.priority, DEFAULT_XP_REWARD),
+            "completed_at": issue.updated_at
+        })
+    return closed
 
 
-def update_issue(db: Session, issue_id: int, title: Optional[str] = None,
-                 description: Optional[str] = None, status: Optional[str] = None,
-                 category: Optional[IssueCategory] = None,
-                 priority: Optional[str] = None) -> Optional[IssueDB]:
+async def close_issue(db: AsyncSession, issue_id: int) -> Optional[IssueDB]:
+    """
+    Close an issue and award XP to assignee; an issue that is unassigned or
+    already closed is returned unchanged
+    """
+    closed = await close_issues(db, [issue_id])
+    if closed:
+        return closed[0]
+    return await get_issue_by_id(db, issue_id)
+
+
+async def update_issue(db: AsyncSession, issue_id: int, title: Optional[str] = None,
+                       description: Optional[str] = None, status: Optional[str] = None,
+                       category: Optional[IssueCategory] = None,
+                       priority: Optional[str] = None) -> Optional[IssueDB]:
     """Update issue information"""
-    db_issue = get_issue_by_id(db, issue_id)
+    db_issue = await get_issue_by_id(db, issue_id)
     if db_issue:
         if title:
             db_issue.title = title
@@ -323,14 +1417,37 @@ def update_issue(db: Session, issue_id: int, title: Optional[str] = None,
             db_issue.category = category
         if priority:
             db_issue.priority = priority
-        db.commit()
-        db.refresh(db_issue)
+        await db.commit()
+        await db.refresh(db_issue)
+        _index_issue(db_issue)
+        if status:
+            _invalidate_user_stats(db_issue.assignee_id)
+        _issues_changed()
     return db_issue
 
 
+async def delete_issue(db: AsyncSession, issue_id: int) -> bool:
+    """Delete an issue"""
+    db_issue = await db.get(IssueDB, issue_id)
+    if db_issue:
+        await db.delete(db_issue)
+        await db.execute(
+            update(ProjectDB)
+            .where(ProjectDB.id == db_issue.project_id)
+            .values(issues_count=ProjectDB.issues_count - 1)
+        )
+        await db.commit()
+        search_index.remove(("issue", issue_id))
+        _invalidate_user_stats(db_issue.reporter_id, db_issue.assignee_id)
+        _projects_changed(db_issue.project_id)
+        _issues_changed()
+        return True
+    return False
+
+
 # ============ COMMENT CRUD ============
 
-def create_comment(db: Session, user_id: int, project_id: int, content: str) -> CommentDB:
+async def create_comment(db: AsyncSession, user_id: int, project_id: int, content: str) -> CommentDB:
     """Create a project comment"""
     db_comment = CommentDB(
         user_id=user_id,
@@ -338,73 +1455,366 @@ def create_comment(db: Session, user_id: int, project_id: int, content: str) ->
         content=content
     )
     db.add(db_comment)
-    db.commit()
-    db.refresh(db_comment)
+    await db.commit()
+    await db.refresh(db_comment)
     return db_comment
 
 
-def get_comments_by_project(db: Session, project_id: int, skip: int = 0,
-                            limit: int = 100) -> List[CommentDB]:
+async def get_comment_by_id(db: AsyncSession, comment_id: int) -> Optional[CommentDB]:
+    """Get comment by ID"""
+    return await db.get(CommentDB, comment_id)
+
+
+async def get_comments_by_project(db: AsyncSession, project_id: int, skip: int = 0,
+                                  limit: int = 100,
+                                  cursor: Optional[str] = None) -> List[CommentDB]:
     """Get all comments for a project"""
-    return db.query(CommentDB).filter(
-        CommentDB.project_id == project_id
-    ).offset(skip).limit(limit).all()
+    result = await db.execute(
+        paginate(
+            select(CommentDB)
+            .options(selectinload(CommentDB.user))
+            .filter(CommentDB.project_id == project_id),
+            [CommentDB.id], cursor, skip, limit
+        )
+    )
+    return result.scalars().all()
 
 
-def delete_comment(db: Session, comment_id: int) -> bool:
+async def delete_comment(db: AsyncSession, comment_id: int) -> bool:
     """Delete a comment"""
-    db_comment = db.query(CommentDB).filter(CommentDB.id == comment_id).first()
+    db_comment = await get_comment_by_id(db, comment_id)
     if db_comment:
-        db.delete(db_comment)
-        db.commit()
+        await db.delete(db_comment)
+        await db.commit()
         return True
     return False
 
 
 # ============ SUBSCRIPTION CRUD ============
 
-def subscribe_to_project(db: Session, user_id: int, project_id: int) -> Optional[SubscriptionDB]:
-    """Subscribe user to project notifications"""
-    # Check if already subscribed
-    existing = db.query(SubscriptionDB).filter(
-        and_(
-            SubscriptionDB.user_id == user_id,
-            SubscriptionDB.project_id == project_id
-        )
-    ).first()
-    
-    if existing:
-        return existing
-    
-    db_subscription = SubscriptionDB(
-        user_id=user_id,
-        project_id=project_id
+async def subscribe_to_project(db: AsyncSession, user_id: int,
+                               project_id: int) -> Optional[SubscriptionDB]:
+    """Subscribe user to project notifications (idempotent)"""
+    result = await db.execute(
+        dialect_insert(db, SubscriptionDB)
+        .values(user_id=user_id, project_id=project_id)
+        .on_conflict_do_nothing(index_elements=["user_id", "project_id"])
+        .returning(SubscriptionDB)
     )
-    db.add(db_subscription)
-    db.commit()
-    db.refresh(db_subscription)
+    db_subscription = result.scalars().first()
+    await db.commit()
+    if db_subscription is None:
+        # Already subscribed: the unique index turned the insert into a no-op
+        result = await db.execute(
+            select(SubscriptionDB).filter(
+                SubscriptionDB.user_id == user_id,
+                SubscriptionDB.project_id == project_id
+            )
+        )
+        db_subscription = result.scalars().first()
     return db_subscription
 
 
-def unsubscribe_from_project(db: Session, user_id: int, project_id: int) -> bool:
+async def unsubscribe_from_project(db: AsyncSession, user_id: int, project_id: int) -> bool:
     """Unsubscribe user from project notifications"""
-    db_subscription = db.query(SubscriptionDB).filter(
-        and_(
-            SubscriptionDB.user_id == user_id,
-            SubscriptionDB.project_id == project_id
-        )
-    ).first()
-    
-    if db_subscription:
-        db.delete(db_subscription)
-        db.commit()
-        return True
-    return False
+    result = await db.execute(
+        delete(SubscriptionDB)
+        .where(SubscriptionDB.user_id == user_id, SubscriptionDB.project_id == project_id)
+        .returning(SubscriptionDB.id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = result.first() is not None
+    await db.commit()
+    return deleted
+
+
+async def update_subscriptions(db: AsyncSession, user_id: int, subscribe: List[int],
+                               unsubscribe: List[int]) -> Dict[str, List[int]]:
+    """
+    Subscribe to and unsubscribe from many projects in one transaction (one
+    statement each). Unknown projects and subscriptions that are already in
+    the requested state are skipped; returns the project ids that changed.
+    """
+    subscribed, unsubscribed = [], []
+    if subscribe:
+        table = SubscriptionDB.__table__
+        result = await db.execute(
+            dialect_insert(db, table)
+            .from_select(
+                ["user_id", "project_id"],
+                select(literal(user_id, Integer), ProjectDB.id).where(ProjectDB.id.in_(subscribe))
+            )
+            .on_conflict_do_nothing(index_elements=["user_id", "project_id"])
+            .returning(table.c.project_id)
+        )
+        subscribed = sorted(result.scalars())
+    if unsubscribe:
+        result = await db.execute(
+            delete(SubscriptionDB)
+            .where(SubscriptionDB.user_id == user_id, SubscriptionDB.project_id.in_(unsubscribe))
+            .returning(SubscriptionDB.project_id)
+            .execution_options(synchronize_session=False)
+        )
+        unsubscribed = sorted(result.scalars())
+    await db.commit()
+    return {"subscribed": subscribed, "unsubscribed": unsubscribed}
+
+
+async def get_user_subscriptions(db: AsyncSession, user_id: int) -> List[SubscriptionDB]:
+    """Get all project subscriptions of a user"""
+    result = await db.execute(
+        select(SubscriptionDB).filter(SubscriptionDB.user_id == user_id)
+    )
+    return result.scalars().all()
 
 
-def get_project_subscribers(db: Session, project_id: int) -> List[UserDB]:
+async def get_project_subscribers(db: AsyncSession, project_id: int) -> List[UserDB]:
     """Get all users subscribed to a project"""
-    subscriptions = db.query(SubscriptionDB).filter(
-        SubscriptionDB.project_id == project_id
-    ).all()
-    return [sub.user for sub in subscriptions]
+    result = await db.execute(
+        select(UserDB)
+        .join(SubscriptionDB, SubscriptionDB.user_id == UserDB.id)
+        .filter(SubscriptionDB.project_id == project_id)
+    )
+    return result.scalars().all()
+
+
+# ============ NOTIFICATION CRUD ============
+
+async def fan_out_notifications(db: AsyncSession, events: List[dict]) -> int:
+    """
+    Write one inbox row per subscriber for each event, as a single
+    INSERT ... SELECT over the subscriptions of the event's project (run as
+    one executemany for all events). The actor is not notified of their own
+    action and the project name becomes the title. Returns rows written.
+    """
+    if not events:
+        return 0
+    table = NotificationDB.__table__
+    stmt = insert(table).from_select(
+        ["user_id", "type", "title", "message", "project_id", "read"],
+        select(
+            SubscriptionDB.user_id,
+            bindparam("n_type", type_=String),
+            ProjectDB.name,
+            bindparam("n_message", type_=String),
+            SubscriptionDB.project_id,
+            literal(False)
+        )
+        .join(ProjectDB, ProjectDB.id == SubscriptionDB.project_id)
+        .where(
+            SubscriptionDB.project_id == bindparam("n_project_id", type_=Integer),
+            SubscriptionDB.user_id != bindparam("n_actor_id", type_=Integer)
+        )
+    )
+    result = await db.execute(stmt, [
+        {"n_type": e["type"], "n_message": e["message"], "n_project_id": e["project_id"],
+         "n_actor_id": e["actor_id"]}
+        for e in events
+    ])
+    await db.commit()
+    return max(result.rowcount, 0)
+
+
+async def create_notification(db: AsyncSession, user_id: int, title: str, message: str = "",
+                              type: str = "info") -> NotificationDB:
+    """Add a notification to a user's own inbox"""
+    db_notification = NotificationDB(user_id=user_id, title=title, message=message, type=type)
+    db.add(db_notification)
+    await db.commit()
+    await db.refresh(db_notification)
+    return db_notification
+
+
+async def get_notifications(db: AsyncSession, user_id: int, unread_only: bool = False,
+                            skip: int = 0, limit: int = 20,
+                            cursor: Optional[str] = None) -> List[NotificationDB]:
+    """Get a user's inbox, newest first (walks ix_notifications_user_id_id)"""
+    stmt = select(NotificationDB).filter(NotificationDB.user_id == user_id)
+    if unread_only:
+        stmt = stmt.filter(NotificationDB.read == False)
+    result = await db.execute(
+        paginate(stmt, [NotificationDB.id], cursor, skip, limit, descending=True)
+    )
+    return result.scalars().all()
+
+
+async def mark_notification_read(db: AsyncSession, user_id: int,
+                                 notification_id: int) -> Optional[NotificationDB]:
+    """Mark one of the user's notifications as read"""
+    result = await db.execute(
+        select(NotificationDB)
+        .from_statement(
+            update(NotificationDB)
+            .where(NotificationDB.id == notification_id, NotificationDB.user_id == user_id)
+            .values(read=True)
+            .returning(NotificationDB)
+        )
+        .execution_options(populate_existing=True)
+    )
+    db_notification = result.scalars().first()
+    await db.commit()
+    return db_notification
+
+
+async def mark_notifications_read(db: AsyncSession, user_id: int,
+                                  notification_ids: Optional[List[int]] = None) -> int:
+    """Mark the given notifications (or all of them) read in one statement"""
+    stmt = (
+        update(NotificationDB)
+        .where(NotificationDB.user_id == user_id, NotificationDB.read == False)
+        .values(read=True)
+        .execution_options(synchronize_session=False)
+    )
+    if notification_ids is not None:
+        stmt = stmt.where(NotificationDB.id.in_(notification_ids))
+    result = await db.execute(stmt)
+    await db.commit()
+    return result.rowcount
+
+
+async def delete_notification(db: AsyncSession, user_id: int, notification_id: int) -> bool:
+    """Delete one of the user's notifications"""
+    result = await db.execute(
+        delete(NotificationDB)
+        .where(NotificationDB.id == notification_id, NotificationDB.user_id == user_id)
+        .returning(NotificationDB.id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = result.first() is not None
+    await db.commit()
+    return deleted
+
+
+# ============ SEARCH ============
+
+def _index_project(project: ProjectDB):
+    """Keep the in-process index current (only once it has been built)"""
+    if search_index.ready:
+        search_index.add(
+            ("project", project.id),
+            [(project.name, TITLE_WEIGHT), (project.description, DESCRIPTION_WEIGHT)],
+            {"type": "project", "id": project.id, "title": project.name,
+             "description": project.description, "project_id": project.id}
+        )
+
+
+def _index_issue(issue: IssueDB):
+    if search_index.ready:
+        search_index.add(
+            ("issue", issue.id),
+            [(issue.title, TITLE_WEIGHT), (issue.description, DESCRIPTION_WEIGHT)],
+            {"type": "issue", "id": issue.id, "title": issue.title,
+             "description": issue.description, "project_id": issue.project_id}
+        )
+
+
+async def rebuild_search_index(db: AsyncSession) -> int:
+    """Load every project and issue into the in-process index"""
+    search_index.clear()
+    search_index.ready = True
+    projects = await db.execute(select(ProjectDB))
+    for project in projects.scalars():
+        _index_project(project)
+    issues = await db.execute(select(IssueDB))
+    for issue in issues.scalars():
+        _index_issue(issue)
+    return len(search_index)
+
+
+def _ranked_matches(kind: str, model, title, project_id, query):
+    vector = column("search_vector", TSVECTOR)
+    return (
+        select(
+            cast(literal(kind), String).label("type"),
+            model.id.label("id"),
+            title.label("title"),
+            model.description.label("description"),
+            project_id.label("project_id"),
+            func.ts_rank(vector, query).label("rank")
+        )
+        .filter(vector.bool_op("@@")(query))
+    )
+
+
+async def search(db: AsyncSession, q: str, limit: int = 20) -> List[dict]:
+    """Projects and issues matching every word of q, best match first"""
+    if db.get_bind().dialect.name != "postgresql":
+        if not search_index.ready:
+            await rebuild_search_index(db)
+        return [{**payload, "rank": score} for score, payload in search_index.search(q, limit)]
+
+    query = func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), q)
+    stmt = union_all(
+        _ranked_matches("project", ProjectDB, ProjectDB.name, ProjectDB.id, query),
+        _ranked_matches("issue", IssueDB, IssueDB.title, IssueDB.project_id, query)
+    )
+    result = await db.execute(
+        stmt.order_by(literal_column("rank").desc(), literal_column("id")).limit(limit)
+    )
+    return [dict(row) for row in result.mappings()]
+
+
+# ============ NOTIFICATION FEEDS ============
+# Each feed is one joined column projection (one query per page) returning
+# plain dicts, so no ORM rows or relationship loads are involved
+
+async def get_donation_feed(db: AsyncSession, skip: int = 0, limit: int = 20,
+                            cursor: Optional[str] = None) -> List[dict]:
+    """Get recent donations with donor and project names"""
+    stmt = (
+        select(
+            DonationDB.id,
+            case((DonationDB.is_anonymous == True, None), else_=UserDB.name).label("donor_name"),
+            DonationDB.amount,
+            ProjectDB.name.label("project_name"),
+            DonationDB.created_at
+        )
+        .join(UserDB, UserDB.id == DonationDB.user_id)
+        .join(ProjectDB, ProjectDB.id == DonationDB.project_id)
+    )
+    result = await db.execute(paginate(
+        stmt, [DonationDB.created_at, DonationDB.id], cursor, skip, limit, descending=True
+    ))
+    return [dict(row) for row in result.mappings()]
+
+
+async def get_volunteer_completion_feed(db: AsyncSession, skip: int = 0, limit: int = 20,
+                                        cursor: Optional[str] = None) -> List[dict]:
+    """Get recently closed issues with volunteer name and XP gained"""
+    stmt = (
+        select(
+            IssueDB.id.label("issue_id"),
+            IssueDB.title.label("issue_title"),
+            UserDB.name.label("volunteer_name"),
+            case(XP_REWARDS, value=IssueDB.priority, else_=DEFAULT_XP_REWARD).label("volunteer_xp_gained"),
+            ProjectDB.name.label("project_name"),
+            IssueDB.updated_at.label("completed_at")
+        )
+        .join(UserDB, UserDB.id == IssueDB.assignee_id)
+        .join(ProjectDB, ProjectDB.id == IssueDB.project_id)
+        .filter(IssueDB.status == "closed")
+    )
+    result = await db.execute(paginate(
+        stmt, [IssueDB.updated_at, IssueDB.id], cursor, skip, limit, descending=True
+    ))
+    return [dict(row) for row in result.mappings()]
+
+
+async def get_new_project_feed(db: AsyncSession, skip: int = 0, limit: int = 20,
+                               cursor: Optional[str] = None) -> List[dict]:
+    """Get recently created projects with owner name"""
+    stmt = (
+        select(
+            ProjectDB.id.label("project_id"),
+            ProjectDB.name.label("project_name"),
+            UserDB.name.label("owner_name"),
+            ProjectDB.goal_amount,
+            ProjectDB.is_verified,
+            ProjectDB.created_at
+        )
+        .join(UserDB, UserDB.id == ProjectDB.owner_id)
+    )
+    result = await db.execute(paginate(
+        stmt, [ProjectDB.created_at, ProjectDB.id], cursor, skip, limit, descending=True
+    ))
+    return [dict(row) for row in result.mappings()]
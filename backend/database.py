@@ -1,9 +1,11 @@
 """Database configuration and session management for PostgreSQL using SQLAlchemy"""
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker, Session
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.dialects import postgresql, sqlite
 from pydantic_settings import BaseSettings
-from typing import Generator
+from typing import AsyncGenerator
 import os
 
 
@@ -24,9 +26,27 @@ class Settings(BaseSettings):
 
 settings = Settings()
 
-# SQLAlchemy setup
+
+def _driver_url(url: str, use_asyncio: bool = False) -> str:
+    """Pin plain database URLs to the drivers listed in requirements.txt"""
+    if url.startswith("postgresql://"):
+        return "postgresql+psycopg://" + url[len("postgresql://"):]
+    if use_asyncio and url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+
+def _connect_args(url: str) -> dict:
+    """SQLite writers queue on one file lock; let them wait instead of failing after 5s"""
+    if url.startswith("sqlite"):
+        return {"timeout": 30}
+    return {}
+
+
+# SQLAlchemy setup (sync engine is kept for standalone scripts like seed_data.py)
 engine = create_engine(
-    settings.database_url,
+    _driver_url(settings.database_url),
+    connect_args=_connect_args(settings.database_url),
     echo=settings.environment == "development",
     pool_pre_ping=True,
     pool_recycle=3600
@@ -34,22 +54,49 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the API so queries never block the event loop
+async_engine = create_async_engine(
+    _driver_url(settings.database_url, use_asyncio=True),
+    connect_args=_connect_args(settings.database_url),
+    echo=settings.environment == "development",
+    pool_pre_ping=True,
+    pool_recycle=3600
+)
+
+# expire_on_commit=False: attributes stay readable after commit without
+# an implicit (and in asyncio, forbidden) lazy reload
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base class for all models
 Base = declarative_base()
 
 
-def get_db() -> Generator[Session, None, None]:
-    """Dependency for getting database session"""
-    db = SessionLocal()
-    try:
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency for getting an async database session"""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def init_db():
+def dialect_insert(db: AsyncSession, table):
+    """INSERT construct for the session's dialect, so ON CONFLICT clauses are available"""
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(table)
+    return postgresql.insert(table)
+
+
+async def init_db():
     """Initialize database by creating all tables"""
-    Base.metadata.create_all(bind=engine)
+    from search import SEARCH_DDL
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        if async_engine.dialect.name == "postgresql":
+            for statement in SEARCH_DDL:
+                await conn.execute(text(statement))
 
 
 def drop_all_tables():
@@ -0,0 +1,57 @@
+"""
+Streaming serializers for the public donation ledger export (CSV or NDJSON).
+Rows are written out in small batches, so memory stays flat for any ledger size.
+"""
+
+from datetime import datetime
+from typing import AsyncIterator
+import csv
+import io
+import json
+
+from database import AsyncSessionLocal
+import crud
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson"
+}
+EXPORT_COLUMNS = ["id", "amount", "donor_name", "project_id", "created_at"]
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+async def export_donations(project_id: int, fmt: str) -> AsyncIterator[str]:
+    """
+    Serialized ledger chunks for a StreamingResponse. Opens its own session:
+    request-scoped dependencies are closed before a streamed body is sent.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow(EXPORT_COLUMNS)
+
+    async with AsyncSessionLocal() as db:
+        count = 0
+        async for row in crud.stream_public_donations(db, project_id):
+            if fmt == "csv":
+                writer.writerow([
+                    row["created_at"].isoformat() if column == "created_at" and row[column]
+                    else row[column]
+                    for column in EXPORT_COLUMNS
+                ])
+            else:
+                buffer.write(json.dumps(row, default=_json_default))
+                buffer.write("\n")
+            count += 1
+            if count % crud.EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
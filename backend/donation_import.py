@@ -0,0 +1,86 @@
+"""
+Streaming parsers for bulk donation imports (CSV with a header row, or NDJSON).
+The request body is decoded chunk by chunk and yielded row by row, so an
+upload is never held in memory whole. One record per line.
+"""
+
+from typing import AsyncIterator, Optional, Tuple, Union
+import codecs
+import csv
+import json
+
+from pydantic import ValidationError
+from models import DonationImportRow
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+def detect_format(content_type: Optional[str]) -> Optional[str]:
+    """Import format implied by a Content-Type header"""
+    content_type = (content_type or "").lower()
+    if "csv" in content_type:
+        return "csv"
+    if "ndjson" in content_type or "jsonl" in content_type or "json-seq" in content_type:
+        return "ndjson"
+    return None
+
+
+async def _lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+def _validate(data) -> Union[DonationImportRow, str]:
+    try:
+        row = DonationImportRow.model_validate(data)
+    except ValidationError as e:
+        return "; ".join(
+            f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+        )
+    if row.amount <= 0:
+        return "amount: must be positive"
+    return row
+
+
+async def parse_donation_rows(
+    stream: AsyncIterator[bytes], fmt: str
+) -> AsyncIterator[Tuple[int, Union[DonationImportRow, str]]]:
+    """
+    Yield (row number, validated row or error message) for every non-blank
+    record; row numbers are 1-based and do not count the CSV header
+    """
+    header = None
+    number = 0
+    try:
+        async for line in _lines(stream):
+            if not line.strip():
+                continue
+            if fmt == "csv" and header is None:
+                header = [name.strip() for name in next(csv.reader([line]))]
+                continue
+
+            number += 1
+            if fmt == "csv":
+                values = next(csv.reader([line]))
+                if len(values) != len(header):
+                    yield number, f"expected {len(header)} columns, got {len(values)}"
+                    continue
+                # Empty cells fall back to the schema defaults
+                data = {k: v for k, v in zip(header, values) if v != ""}
+            else:
+                try:
+                    data = json.loads(line)
+                except ValueError as e:
+                    yield number, f"invalid JSON: {e}"
+                    continue
+            yield number, _validate(data)
+    except UnicodeDecodeError:
+        yield number + 1, "body is not valid UTF-8"
@@ -0,0 +1,112 @@
+"""
+Notification fan-out off the request path: routes publish an event (donation,
+issue closed, project verified) without waiting, and a single consumer task
+writes each drained group of events with one set-based INSERT ... SELECT over
+the project's subscribers, so the cost no longer grows with the audience.
+"""
+
+from typing import List, Optional
+import asyncio
+import os
+
+from database import AsyncSessionLocal
+import crud
+
+# Configuration
+NOTIFICATION_QUEUE_SIZE = int(os.getenv("NOTIFICATION_QUEUE_SIZE", 10000))
+NOTIFICATION_BATCH_MAX_SIZE = int(os.getenv("NOTIFICATION_BATCH_MAX_SIZE", 100))
+
+
+class NotificationFanout:
+    """
+    Single consumer task over a bounded asyncio queue:
+    - publish() never blocks; when the queue is full (or the consumer is not
+      running) the event is dropped and counted, a lost notification being
+      cheaper than a slow donation
+    - events queued meanwhile are written together, one commit per group
+    """
+
+    def __init__(self, queue_size: int, max_batch: int):
+        self.queue_size = queue_size
+        self.max_batch = max_batch
+        self.events = 0
+        self.notifications = 0
+        self.dropped = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Write out everything already queued, then stop the consumer"""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        self._task = None
+
+    def publish(self, project_id: int, actor_id: int, type: str, message: str):
+        """Queue an event for the subscribers of project_id (except the actor)"""
+        event = {"project_id": project_id, "actor_id": actor_id,
+                 "type": type, "message": message}
+        try:
+            self._queue.put_nowait(event)
+        except (AttributeError, asyncio.QueueFull):
+            self.dropped += 1
+
+    def _collect(self, first: dict) -> List[dict]:
+        batch = [first]
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = self._collect(await self._queue.get())
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, batch: List[dict]):
+        try:
+            async with AsyncSessionLocal() as db:
+                self.notifications += await crud.fan_out_notifications(db, batch)
+            self.events += len(batch)
+        except Exception as e:
+            print(f"Error fanning out {len(batch)} notification events: {e}")
+            self.failed += len(batch)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "events": self.events,
+            "notifications": self.notifications,
+            "dropped": self.dropped,
+            "failed": self.failed
+        }
+
+
+notification_fanout = NotificationFanout(NOTIFICATION_QUEUE_SIZE, NOTIFICATION_BATCH_MAX_SIZE)
+
+
+def donation_received(project_id: int, donor_id: int, donor_name: str, amount: float,
+                      is_anonymous: bool):
+    donor = "An anonymous donor" if is_anonymous else donor_name
+    notification_fanout.publish(project_id, donor_id, "donation",
+                                f"{donor} donated {amount:.2f}")
+
+
+def issue_closed(project_id: int, actor_id: int, issue_title: str):
+    notification_fanout.publish(project_id, actor_id, "issue_closed",
+                                f"Issue closed: {issue_title}")
+
+
+def project_verified(project_id: int, admin_id: int):
+    notification_fanout.publish(project_id, admin_id, "project_verified",
+                                "The project has been verified")
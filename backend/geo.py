@@ -0,0 +1,182 @@
+"""Geospatial helpers: haversine distance and a fixed lat/lon grid used as a spatial index"""
+
+from math import asin, cos, floor, radians, sin, sqrt
+from typing import Dict, List, Optional, Tuple
+import os
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+MAX_NEARBY_RADIUS_KM = 500.0
+
+# Grid index: the globe is cut into GRID_CELL_DEG x GRID_CELL_DEG cells numbered
+# row-major from (-90, -180), so the cells of one row form a contiguous id range
+GRID_CELL_DEG = 0.25
+GRID_ROWS = int(180 / GRID_CELL_DEG)
+GRID_COLS = int(360 / GRID_CELL_DEG)
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    dlat = radians(lat2 - lat1)
+    dlon = radians(lon2 - lon1)
+    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+
+
+def _row(lat: float, cell_deg: float = GRID_CELL_DEG) -> int:
+    return min(int(180 / cell_deg) - 1, max(0, int(floor((lat + 90) / cell_deg))))
+
+
+def _col(lon: float, cell_deg: float = GRID_CELL_DEG) -> int:
+    return min(int(360 / cell_deg) - 1, max(0, int(floor((lon + 180) / cell_deg))))
+
+
+def grid_cell(lat: Optional[float], lon: Optional[float]) -> Optional[int]:
+    """Grid cell id of a point (None when the point has no coordinates)"""
+    if lat is None or lon is None:
+        return None
+    return _row(lat) * GRID_COLS + _col(lon)
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, List[Tuple[float, float]]]:
+    """
+    Bounding box of a circle as (min_lat, max_lat, lon_ranges).
+    lon_ranges has two entries when the box crosses the antimeridian.
+    """
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if min_lat <= -90 or max_lat >= 90:
+        # Circle covers a pole: every longitude is in range
+        return max(min_lat, -90.0), min(max_lat, 90.0), [(-180.0, 180.0)]
+
+    # Widest longitude span is at the latitude farthest from the equator
+    dlon = radius_km / (KM_PER_DEGREE_LAT * cos(radians(max(abs(min_lat), abs(max_lat)))))
+    if dlon >= 180:
+        return min_lat, max_lat, [(-180.0, 180.0)]
+    min_lon, max_lon = lon - dlon, lon + dlon
+    if min_lon < -180:
+        return min_lat, max_lat, [(min_lon + 360, 180.0), (-180.0, max_lon)]
+    if max_lon > 180:
+        return min_lat, max_lat, [(min_lon, 180.0), (-180.0, max_lon - 360)]
+    return min_lat, max_lat, [(min_lon, max_lon)]
+
+
+def grid_cell_ranges(min_lat: float, max_lat: float,
+                     lon_ranges: List[Tuple[float, float]]) -> List[Tuple[int, int]]:
+    """Inclusive (first, last) cell id ranges covering a bounding box, one per grid row"""
+    ranges = []
+    for row in range(_row(min_lat), _row(max_lat) + 1):
+        for min_lon, max_lon in lon_ranges:
+            ranges.append((row * GRID_COLS + _col(min_lon), row * GRID_COLS + _col(max_lon)))
+    return ranges
+
+
+# ============ CLUSTER HIERARCHY ============
+# Level L cuts the globe into 2^L rows x 2^(L+1) columns of (180 / 2^L)-degree
+# cells. Levels nest exactly, so a cell's parent is (row >> 1, col >> 1) and all
+# levels of a point can be derived from its finest cell
+
+CLUSTER_MAX_LEVEL = 16
+MAX_CLUSTER_ROWS = 256  # rows of cells one bbox query may span
+CLUSTER_FLUSH_SECONDS = float(os.getenv("CLUSTER_FLUSH_SECONDS", 5))
+
+
+def cluster_cell_deg(level: int) -> float:
+    return 180.0 / (1 << level)
+
+
+def cluster_level_for_zoom(zoom: int) -> int:
+    """A web-map tile at zoom z is 360/2^z degrees wide; aim for ~4x4 clusters per tile"""
+    return min(CLUSTER_MAX_LEVEL, max(0, zoom + 1))
+
+
+def finest_cluster_cell(lat: float, lon: float) -> Tuple[int, int]:
+    """(row, col) of a point at CLUSTER_MAX_LEVEL"""
+    cell_deg = cluster_cell_deg(CLUSTER_MAX_LEVEL)
+    return _row(lat, cell_deg), _col(lon, cell_deg)
+
+
+def cluster_cells(row: int, col: int) -> List[Tuple[int, int]]:
+    """(level, cell id) of every level above a finest (row, col)"""
+    cells = []
+    for level in range(CLUSTER_MAX_LEVEL, -1, -1):
+        shift = CLUSTER_MAX_LEVEL - level
+        cols = 1 << (level + 1)
+        cells.append((level, (row >> shift) * cols + (col >> shift)))
+    return cells
+
+
+def cluster_cell_ranges(level: int, min_lat: float, max_lat: float,
+                        lon_ranges: List[Tuple[float, float]]) -> List[Tuple[int, int]]:
+    """Inclusive cell id ranges of a level covering a bounding box, one per row"""
+    cell_deg = cluster_cell_deg(level)
+    first_row, last_row = _row(min_lat, cell_deg), _row(max_lat, cell_deg)
+    if last_row - first_row + 1 > MAX_CLUSTER_ROWS:
+        raise ValueError("Bounding box is too large for this zoom level")
+    cols = 1 << (level + 1)
+    ranges = []
+    for row in range(first_row, last_row + 1):
+        for min_lon, max_lon in lon_ranges:
+            ranges.append((row * cols + _col(min_lon, cell_deg), row * cols + _col(max_lon, cell_deg)))
+    return ranges
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, List[Tuple[float, float]]]:
+    """
+    Parse "west,south,east,north" into (min_lat, max_lat, lon_ranges);
+    west > east means the box crosses the antimeridian
+    """
+    try:
+        west, south, east, north = [float(v) for v in bbox.split(",")]
+    except ValueError:
+        raise ValueError("bbox must be west,south,east,north")
+    if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+        raise ValueError("bbox is out of range")
+    if west > east:
+        return south, north, [(west, 180.0), (-180.0, east)]
+    return south, north, [(west, east)]
+
+
+class ClusterAmountBuffer:
+    """
+    Donation amounts waiting to be added to cluster rows. Coarse cluster rows
+    are shared by many projects, so writing them per donation would serialize
+    all donations; instead deltas are summed per project and flushed
+    periodically (see crud.flush_cluster_amounts), into the cells of wherever
+    the project is at flush time.
+    """
+
+    def __init__(self):
+        self._pending: Dict[int, float] = {}
+
+    def add(self, project_id: int, amount: float):
+        self._pending[project_id] = self._pending.get(project_id, 0.0) + amount
+
+    def drain(self) -> Dict[int, float]:
+        """Take all pending deltas, keyed by project id"""
+        pending, self._pending = self._pending, {}
+        return pending
+
+    def restore(self, pending: Dict[int, float]):
+        """Put drained deltas back after a failed flush"""
+        for key, amount in pending.items():
+            self._pending[key] = self._pending.get(key, 0.0) + amount
+
+    @staticmethod
+    def rollup(pending: Dict[int, float],
+               locations: Dict[int, Tuple[float, float]]) -> Dict[Tuple[int, int], float]:
+        """Spread project deltas to every cluster level as {(level, cell): amount}"""
+        deltas: Dict[Tuple[int, int], float] = {}
+        for project_id, amount in pending.items():
+            if project_id not in locations:
+                continue
+            row, col = finest_cluster_cell(*locations[project_id])
+            for key in cluster_cells(row, col):
+                deltas[key] = deltas.get(key, 0.0) + amount
+        return deltas
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+cluster_amounts = ClusterAmountBuffer()
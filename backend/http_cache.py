@@ -0,0 +1,79 @@
+"""
+Conditional GET for public reads: crud bumps a change version per entity
+after each commit, and routes answer If-None-Match / If-Modified-Since from
+those versions before running any query. Listings, which change whenever any
+of their rows does, are validated by a digest of the page instead.
+"""
+
+from email.utils import formatdate, parsedate_to_datetime
+import hashlib
+from typing import Hashable, Optional
+from fastapi import Request, Response
+import os
+
+from cache import change_versions
+
+# Configuration
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", 5))
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def _not_modified_since(if_modified_since: str, last_modified: Optional[float]) -> bool:
+    if last_modified is None:
+        return False
+    try:
+        return parsedate_to_datetime(if_modified_since).timestamp() >= last_modified
+    except (TypeError, ValueError):
+        return False
+
+
+def conditional_get(request: Request, response: Response, *keys: Hashable,
+                    settle: float = 0.0) -> Optional[Response]:
+    """
+    Set Cache-Control and the validators for keys on response; returns a 304
+    to send instead when the client's copy is current. Call it before the
+    query, so a write landing meanwhile can only make the ETag older than
+    the body, never newer.
+    """
+    response.headers["Cache-Control"] = f"public, max-age={HTTP_CACHE_MAX_AGE}"
+    validators = change_versions.validators(*keys, settle=settle)
+    if validators is None:
+        return None
+    return _respond(request, response, *validators)
+
+
+def conditional_body(request: Request, response: Response) -> Optional[Response]:
+    """
+    Set Cache-Control and an ETag that is a digest of an already rendered
+    response (see serialization.json_list);
+    returns a 304 to send instead when the client's copy is current. The same
+    page gets the same ETag on every worker and after restarts, and only a
+    change to one of its own rows (sharded totals: once their cache expires)
+    changes it. No Last-Modified: sharded totals change without updated_at.
+    """
+    response.headers["Cache-Control"] = f"public, max-age={HTTP_CACHE_MAX_AGE}"
+    etag = '"%s"' % hashlib.blake2b(response.body, digest_size=12).hexdigest()
+    return _respond(request, response, etag, None)
+
+
+def _respond(request: Request, response: Response, etag: str,
+             last_modified: Optional[float]) -> Optional[Response]:
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, etag)
+    else:
+        fresh = _not_modified_since(request.headers.get("if-modified-since", ""), last_modified)
+    if fresh:
+        headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+        return Response(status_code=304, headers=headers)
+    return None
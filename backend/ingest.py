@@ -0,0 +1,122 @@
+"""
+Opt-in group-commit ingestion for donations: requests are queued and written
+in micro-batches, so a campaign peak costs one commit per batch instead of
+one per donation. Each request still waits until its own batch has committed.
+"""
+
+from typing import List, Optional, Tuple
+import asyncio
+import os
+
+from database import AsyncSessionLocal
+from models import DonationDB
+import crud
+
+# Configuration
+DONATION_BATCHING = os.getenv("DONATION_BATCHING", "false").lower() in ("1", "true", "yes")
+DONATION_BATCH_MAX_SIZE = int(os.getenv("DONATION_BATCH_MAX_SIZE", 100))
+DONATION_BATCH_MAX_WAIT_MS = float(os.getenv("DONATION_BATCH_MAX_WAIT_MS", 5))
+
+
+class DonationBatcher:
+    """
+    Single consumer task over an asyncio queue:
+    - a batch starts with the first queued donation and closes when it holds
+      max_size donations or max_wait seconds have passed
+    - if a batch fails as a whole, its donations are retried one by one so a
+      single bad row cannot fail the others
+    - if even that fails (e.g. no database connection), the batch's donations
+      resolve to None and the consumer carries on with the next batch
+    """
+
+    def __init__(self, enabled: bool, max_size: int, max_wait: float):
+        self.enabled = enabled
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self.donations = 0
+        self.failed = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.enabled and self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size * 10)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Write out everything already queued, then stop the consumer"""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        self._task = None
+
+    async def submit(self, user_id: int, project_id: int, amount: float,
+                     is_anonymous: bool = False) -> Optional[DonationDB]:
+        """Queue a donation and wait for the commit of its batch"""
+        future = asyncio.get_running_loop().create_future()
+        donation = {"user_id": user_id, "project_id": project_id,
+                    "amount": amount, "is_anonymous": is_anonymous}
+        await self._queue.put((donation, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[dict, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            try:
+                await self._write(batch)
+            except Exception as e:
+                print(f"Error writing donation batch of {len(batch)}: {e}")
+                self.failed += len(batch)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(None)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write(self, batch: List[Tuple[dict, asyncio.Future]]):
+        donations = [donation for donation, _ in batch]
+        try:
+            async with AsyncSessionLocal() as db:
+                results = await crud.process_donation_batch(db, donations)
+        except Exception as e:
+            print(f"Error processing donation batch, retrying one by one: {e}")
+            results = []
+            for donation in donations:
+                async with AsyncSessionLocal() as db:
+                    results.append(await crud.process_donation(db, **donation))
+
+        self.batches += 1
+        self.donations += len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "batches": self.batches,
+            "donations": self.donations,
+            "failed": self.failed
+        }
+
+
+donation_batcher = DonationBatcher(
+    DONATION_BATCHING, DONATION_BATCH_MAX_SIZE, DONATION_BATCH_MAX_WAIT_MS / 1000
+)
@@ -0,0 +1,332 @@
+"""
+Cross-node cache invalidation. crud reports each write as an entity type and
+ids; the change is evicted from this process's caches at once and broadcast
+on a bus, and every other worker evicts the same entries when it hears it.
+On PostgreSQL the bus is LISTEN/NOTIFY on one channel; with any other
+database (a single node) or in tests it is the in-memory stand-in.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional, Set
+import asyncio
+import json
+import os
+import secrets
+
+import psycopg
+from psycopg import sql
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+
+from cache import change_versions, counter_hints, principal_cache, shard_totals, user_stats
+from database import AsyncSessionLocal, async_engine, settings
+from leaderboard import leaderboard
+
+# Configuration
+CACHE_INVALIDATION_CHANNEL = os.getenv("CACHE_INVALIDATION_CHANNEL", "cache_invalidation")
+CACHE_INVALIDATION_BUS = os.getenv(
+    "CACHE_INVALIDATION_BUS",
+    "postgres" if settings.database_url.startswith("postgresql") else "memory"
+)
+CACHE_INVALIDATION_QUEUE_SIZE = int(os.getenv("CACHE_INVALIDATION_QUEUE_SIZE", 10000))
+CACHE_INVALIDATION_RETRY_SECONDS = float(os.getenv("CACHE_INVALIDATION_RETRY_SECONDS", 1))
+CACHE_INVALIDATION_DRAIN_SECONDS = float(os.getenv("CACHE_INVALIDATION_DRAIN_SECONDS", 5))
+
+# NOTIFY payloads must stay below 8000 bytes
+MAX_PAYLOAD_BYTES = 7000
+MAX_IDS_PER_MESSAGE = 500
+
+
+# ============ LOCAL EVICTION ============
+
+def _evict_user(user_ids: List[int]):
+    """Profile or XP change: cached principals, stats and user listings"""
+    for user_id in user_ids:
+        principal_cache.invalidate_user(user_id)
+        user_stats.pop(user_id)
+    change_versions.bump("users")
+
+
+def _evict_user_stats(user_ids: List[int]):
+    """Donation or issue activity of users"""
+    for user_id in user_ids:
+        user_stats.pop(user_id)
+
+
+def _evict_project(project_ids: List[int]):
+    """Project row changed: its detail validators (listings validate by their own rows)"""
+    change_versions.bump(*(("project", project_id) for project_id in project_ids))
+
+
+def _evict_project_counters(project_ids: List[int]):
+    """Counter mode or shard totals changed (no ids: all projects)"""
+    if not project_ids:
+        counter_hints.clear()
+        shard_totals.clear()
+    for project_id in project_ids:
+        counter_hints.pop(project_id)
+        shard_totals.pop(project_id)
+
+
+def _evict_issue(issue_ids: List[int]):
+    change_versions.bump("issues")
+
+
+EVICTIONS: Dict[str, Callable[[List[int]], None]] = {
+    "user": _evict_user,
+    "user_stats": _evict_user_stats,
+    "project": _evict_project,
+    "project_counters": _evict_project_counters,
+    "issue": _evict_issue,
+}
+
+
+def evict_all():
+    """Forget everything that may be stale (after messages may have been missed)"""
+    principal_cache.clear()
+    user_stats.clear()
+    counter_hints.clear()
+    shard_totals.clear()
+    change_versions.reset()
+
+
+# ============ BUSES ============
+
+class InvalidationBus(ABC):
+    """
+    Transport interface: publish() must not block; start() hands over the
+    callbacks for incoming message lists and for resets (the bus may have
+    missed messages, e.g. after a reconnect).
+    """
+    dropped = 0
+
+    @abstractmethod
+    async def start(self, on_messages: Callable[[List[dict]], None],
+                    on_reset: Callable[[], None]):
+        ...
+
+    @abstractmethod
+    async def stop(self):
+        ...
+
+    @abstractmethod
+    def publish(self, message: dict):
+        ...
+
+
+class InMemoryBus(InvalidationBus):
+    """
+    Buses created on the same hub (a plain list) hear each other, like
+    workers on one database. Delivery is deferred to the event loop, as a
+    NOTIFY would be. Without a hub it is the single-node no-op bus.
+    """
+
+    def __init__(self, hub: Optional[list] = None):
+        self.hub = hub if hub is not None else []
+        self._on_messages: Optional[Callable[[List[dict]], None]] = None
+
+    async def start(self, on_messages, on_reset):
+        self._on_messages = on_messages
+        self.hub.append(self)
+
+    async def stop(self):
+        if self in self.hub:
+            self.hub.remove(self)
+
+    def publish(self, message: dict):
+        loop = asyncio.get_running_loop()
+        for bus in self.hub:
+            loop.call_soon(bus._on_messages, [message])
+
+
+class PostgresBus(InvalidationBus):
+    """
+    LISTEN on a dedicated psycopg connection, NOTIFY through the engine pool.
+    Published messages are queued and sent in groups (one pg_notify per
+    payload-sized chunk), off the request path. Every (re)connect of the
+    listener resets, since notifications sent while it was away are lost.
+    stop() first sends what is still queued (for up to drain_seconds).
+    """
+
+    def __init__(self, url: str, channel: str, queue_size: int, retry_seconds: float,
+                 drain_seconds: float):
+        self.url = url
+        self.channel = channel
+        self.queue_size = queue_size
+        self.retry_seconds = retry_seconds
+        self.drain_seconds = drain_seconds
+        self._outbox: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self, on_messages, on_reset):
+        self._outbox = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [
+            asyncio.create_task(self._listen(on_messages, on_reset)),
+            asyncio.create_task(self._send())
+        ]
+
+    async def stop(self):
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self._outbox.join(), self.drain_seconds)
+            except asyncio.TimeoutError:
+                self.dropped += self._outbox.qsize()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def publish(self, message: dict):
+        try:
+            self._outbox.put_nowait(message)
+        except (AttributeError, asyncio.QueueFull):
+            self.dropped += 1
+
+    async def _listen(self, on_messages, on_reset):
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self.url, autocommit=True) as conn:
+                    await conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(self.channel)))
+                    on_reset()
+                    async for notify in conn.notifies():
+                        on_messages(json.loads(notify.payload))
+            except Exception as e:
+                print(f"Cache invalidation listener lost its connection, reconnecting: {e}")
+                await asyncio.sleep(self.retry_seconds)
+
+    def _chunks(self, messages: List[dict]) -> Iterable[str]:
+        chunk: List[str] = []
+        size = 2
+        for message in messages:
+            encoded = json.dumps(message, separators=(",", ":"))
+            if chunk and size + len(encoded) + 1 > MAX_PAYLOAD_BYTES:
+                yield "[" + ",".join(chunk) + "]"
+                chunk, size = [], 2
+            chunk.append(encoded)
+            size += len(encoded) + 1
+        if chunk:
+            yield "[" + ",".join(chunk) + "]"
+
+    async def _send(self):
+        while True:
+            batch = [await self._outbox.get()]
+            while not self._outbox.empty():
+                batch.append(self._outbox.get_nowait())
+            while True:
+                try:
+                    async with async_engine.begin() as conn:
+                        for payload in self._chunks(batch):
+                            await conn.execute(select(func.pg_notify(self.channel, payload)))
+                    break
+                except Exception as e:
+                    print(f"Error sending cache invalidations, retrying: {e}")
+                    await asyncio.sleep(self.retry_seconds)
+            for _ in batch:
+                self._outbox.task_done()
+
+
+# ============ INVALIDATOR ============
+
+class CacheInvalidator:
+    """
+    Evicts locally and broadcasts; applies what other nodes broadcast. Each
+    process tags its messages with a random node id and skips its own
+    (NOTIFY also reaches the sender). The leaderboard is an index rather than
+    a cache, so remote user changes re-read the XP instead of evicting it.
+    """
+
+    def __init__(self, bus: InvalidationBus):
+        self.bus = bus
+        self.node = secrets.token_hex(4)
+        self.sent = 0
+        self.received = 0
+        self.resets = 0
+        self._started = False
+        self._reloads: Set[asyncio.Task] = set()
+
+    async def start(self):
+        if not self._started:
+            await self.bus.start(self._apply, self._reset)
+            self._started = True
+
+    async def stop(self):
+        if self._started:
+            await self.bus.stop()
+            self._started = False
+        if self._reloads:
+            await asyncio.gather(*self._reloads, return_exceptions=True)
+
+    def invalidate(self, entity: str, *ids: Optional[int]):
+        """Report a committed write of entity ids (none: the whole collection)"""
+        ids = sorted({i for i in ids if i is not None})
+        EVICTIONS[entity](ids)
+        if not self._started:
+            return
+        for start in range(0, max(len(ids), 1), MAX_IDS_PER_MESSAGE):
+            self.bus.publish({
+                "node": self.node, "entity": entity,
+                "ids": ids[start:start + MAX_IDS_PER_MESSAGE]
+            })
+            self.sent += 1
+
+    def _apply(self, messages: List[dict]):
+        user_ids = set()
+        for message in messages:
+            if message.get("node") == self.node:
+                continue
+            eviction = EVICTIONS.get(message.get("entity"))
+            if eviction is not None:
+                eviction(message.get("ids") or [])
+                self.received += 1
+            if message.get("entity") == "user":
+                user_ids.update(message.get("ids") or [])
+        if user_ids:
+            self._reload_leaderboard(sorted(user_ids))
+
+    def _reset(self):
+        self.resets += 1
+        evict_all()
+        self._reload_leaderboard(None)
+
+    def _reload_leaderboard(self, user_ids: Optional[List[int]]):
+        if not leaderboard.ready:
+            return  # built at startup, from what is committed by then
+        task = asyncio.create_task(self._run_reload(user_ids))
+        self._reloads.add(task)
+        task.add_done_callback(self._reloads.discard)
+
+    async def _run_reload(self, user_ids: Optional[List[int]]):
+        # Re-reads what is committed, so late or reordered messages cannot leave an older XP
+        import crud  # crud reports its writes through this module
+        try:
+            async with AsyncSessionLocal() as db:
+                if user_ids is None:
+                    await crud.rebuild_leaderboard(db)
+                else:
+                    await crud.refresh_leaderboard(db, user_ids)
+        except Exception as e:
+            print(f"Error reloading the leaderboard: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "bus": type(self.bus).__name__,
+            "node": self.node,
+            "sent": self.sent,
+            "received": self.received,
+            "resets": self.resets,
+            "dropped": self.bus.dropped
+        }
+
+
+def _default_bus() -> InvalidationBus:
+    if CACHE_INVALIDATION_BUS == "postgres":
+        # psycopg takes a libpq URI: drop any SQLAlchemy driver suffix
+        url = make_url(settings.database_url).set(drivername="postgresql")
+        return PostgresBus(
+            url.render_as_string(hide_password=False), CACHE_INVALIDATION_CHANNEL,
+            CACHE_INVALIDATION_QUEUE_SIZE, CACHE_INVALIDATION_RETRY_SECONDS,
+            CACHE_INVALIDATION_DRAIN_SECONDS
+        )
+    return InMemoryBus()
+
+
+cache_invalidator = CacheInvalidator(_default_bus())
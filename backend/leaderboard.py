@@ -0,0 +1,62 @@
+"""In-process XP leaderboard: an order-statistic index over every user's XP"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+
+
+class Leaderboard:
+    """
+    Users sorted by (-xp, user_id) in a SortedList, so rank lookups, updates
+    and the start of the top-N slice are O(log n). Ties share a rank
+    (1, 2, 2, 4). Built from the database at startup and then kept in sync
+    by crud.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._ranking = SortedList()
+        self._xp: Dict[int, int] = {}
+
+    def rebuild(self, rows: Iterable[Tuple[int, Optional[int]]]):
+        """Replace the index with (user_id, xp) rows"""
+        self._xp = {user_id: xp or 0 for user_id, xp in rows}
+        self._ranking = SortedList((-xp, user_id) for user_id, xp in self._xp.items())
+        self.ready = True
+
+    def update(self, user_id: int, xp: Optional[int]):
+        """Insert a user or move them to their new XP"""
+        if not self.ready:
+            return
+        xp = xp or 0
+        old = self._xp.get(user_id)
+        if old == xp:
+            return
+        if old is not None:
+            self._ranking.remove((-old, user_id))
+        self._ranking.add((-xp, user_id))
+        self._xp[user_id] = xp
+
+    def xp(self, user_id: int) -> Optional[int]:
+        return self._xp.get(user_id)
+
+    def rank_of_xp(self, xp: int) -> int:
+        """1 + number of users with strictly more XP"""
+        return self._ranking.bisect_left((-xp,)) + 1
+
+    def rank(self, user_id: int) -> Optional[int]:
+        xp = self._xp.get(user_id)
+        return None if xp is None else self.rank_of_xp(xp)
+
+    def top(self, limit: int, offset: int = 0) -> List[Tuple[int, int, int]]:
+        """(rank, user_id, xp) of a slice of the leaderboard"""
+        return [
+            (self.rank_of_xp(-neg_xp), user_id, -neg_xp)
+            for neg_xp, user_id in self._ranking.islice(offset, offset + limit)
+        ]
+
+    def __len__(self) -> int:
+        return len(self._ranking)
+
+
+leaderboard = Leaderboard()
@@ -1,17 +1,29 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from database import init_db, settings
+from fastapi.responses import JSONResponse, ORJSONResponse
+from database import AsyncSessionLocal, init_db, settings
+from auth import HashingPoolBusy, password_pool
+from cache import counter_hints, principal_cache, shard_totals, user_stats
+from pagination import InvalidCursor, NEXT_CURSOR_HEADER
+from geo import CLUSTER_FLUSH_SECONDS
+from ingest import donation_batcher
+from fanout import notification_fanout
+from activity import activity_broker
+from invalidation import cache_invalidator
+from leaderboard import leaderboard
+import asyncio
+import crud
 import os
 
 # Import routers
-from routes import auth, users, projects, issues, notifications
+from routes import admin, auth, users, projects, issues, notifications, search, stream
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Save Food API",
     description="Food charity distribution management system with transparency",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS for React frontend on port 3000
@@ -25,17 +37,56 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Last-Modified"],
 )
 
 
+background_tasks = []
+
+
+async def flush_cluster_amounts_periodically():
+    """Apply buffered donation amounts to map clusters every few seconds"""
+    while True:
+        await asyncio.sleep(CLUSTER_FLUSH_SECONDS)
+        try:
+            async with AsyncSessionLocal() as db:
+                await crud.flush_cluster_amounts(db)
+        except Exception as e:
+            print(f"Error flushing cluster amounts: {e}")
+
+
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on app startup"""
-    init_db()
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        await crud.rebuild_leaderboard(db)
+    await cache_invalidator.start()
+    donation_batcher.start()
+    notification_fanout.start()
+    background_tasks.append(asyncio.create_task(flush_cluster_amounts_periodically()))
     print(f"PostgreSQL database initialized (Environment: {settings.environment})")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background workers on app shutdown"""
+    await donation_batcher.stop()
+    await notification_fanout.stop()
+    activity_broker.close()
+    await cache_invalidator.stop()
+    for task in background_tasks:
+        task.cancel()
+    background_tasks.clear()
+    try:
+        async with AsyncSessionLocal() as db:
+            await crud.flush_cluster_amounts(db)
+    except Exception as e:
+        print(f"Error flushing cluster amounts: {e}")
+    password_pool.shutdown()
+
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -44,7 +95,18 @@ async def health_check():
         "status": "ok",
         "message": "Save Food API v2.0.0 is running",
         "database": "PostgreSQL",
-        "features": ["Transparent Charity", "Gamification", "Volunteer Matching"]
+        "features": ["Transparent Charity", "Gamification", "Volunteer Matching"],
+        "caches": {
+            "principals": principal_cache.stats(),
+            "shard_totals": shard_totals.stats(),
+            "counter_hints": counter_hints.stats(),
+            "user_stats": user_stats.stats()
+        },
+        "donation_batching": donation_batcher.stats(),
+        "notification_fanout": notification_fanout.stats(),
+        "activity_stream": activity_broker.stats(),
+        "cache_invalidation": cache_invalidator.stats(),
+        "leaderboard_users": len(leaderboard)
     }
 
 
@@ -66,7 +128,9 @@ async def root():
             "projects": "/api/projects",
             "issues": "/api/issues",
             "donations": "/api/donations",
-            "notifications": "/api/notifications"
+            "notifications": "/api/notifications",
+            "search": "/api/search",
+            "admin": "/api/admin"
         }
     }
 
@@ -77,6 +141,28 @@ app.include_router(users.router)
 app.include_router(projects.router)
 app.include_router(issues.router)
 app.include_router(notifications.router)
+app.include_router(search.router)
+app.include_router(stream.router)
+app.include_router(admin.router)
+
+
+@app.exception_handler(HashingPoolBusy)
+async def hashing_pool_busy_handler(request, exc):
+    """Shed password work instead of queueing it behind a login storm"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"}
+    )
+
+
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request, exc):
+    """Reject malformed pagination cursors"""
+    return JSONResponse(
+        status_code=400,
+        content={"detail": "Invalid pagination cursor"}
+    )
 
 
 # Global exception handler
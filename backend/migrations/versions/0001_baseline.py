@@ -0,0 +1,152 @@
+"""baseline: schema as created by init_db before migrations
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+Exactly the schema of the last release without migrations. Creates only the
+tables that do not exist yet, so databases built by Base.metadata.create_all
+adopt this revision without changes; everything added since comes in later
+revisions.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ["users", "projects", "issues", "donations", "comments", "subscriptions"]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # Offline (--sql) there is no database to inspect: emit every table
+    existing = set() if op.get_context().as_sql else set(sa.inspect(bind).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("email", sa.String(), nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("password_hash", sa.String(), nullable=False),
+            sa.Column("avatar", sa.String(), nullable=True),
+            sa.Column("xp", sa.Integer(), nullable=True),
+            sa.Column("rating_level", sa.String(), nullable=True),
+            sa.Column("is_admin", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "projects" not in existing:
+        op.create_table(
+            "projects",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("icon", sa.String(), nullable=True),
+            sa.Column("color", sa.String(), nullable=True),
+            sa.Column("goal_amount", sa.Float(), nullable=False),
+            sa.Column("current_amount", sa.Float(), nullable=False),
+            sa.Column("report_url", sa.String(), nullable=True),
+            sa.Column(
+                "status",
+                sa.Enum("ACTIVE", "IN_PROGRESS", "COMPLETED", "ARCHIVED", name="projectstatus"),
+                nullable=True,
+            ),
+            sa.Column("is_verified", sa.Boolean(), nullable=True),
+            sa.Column("latitude", sa.Float(), nullable=True),
+            sa.Column("longitude", sa.Float(), nullable=True),
+            sa.Column("owner_id", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(["owner_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_projects_id", "projects", ["id"])
+
+    if "issues" not in existing:
+        op.create_table(
+            "issues",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(), nullable=False),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column(
+                "category",
+                sa.Enum("HANDS", "TRANSPORT", "ITEMS", name="issuecategory"),
+                nullable=True,
+            ),
+            sa.Column("status", sa.String(), nullable=True),
+            sa.Column("priority", sa.String(), nullable=True),
+            sa.Column("project_id", sa.Integer(), nullable=False),
+            sa.Column("reporter_id", sa.Integer(), nullable=False),
+            sa.Column("assignee_id", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.Column("due_date", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["assignee_id"], ["users.id"]),
+            sa.ForeignKeyConstraint(["project_id"], ["projects.id"]),
+            sa.ForeignKeyConstraint(["reporter_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_issues_id", "issues", ["id"])
+
+    if "donations" not in existing:
+        op.create_table(
+            "donations",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("amount", sa.Float(), nullable=False),
+            sa.Column("is_anonymous", sa.Boolean(), nullable=True),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("project_id", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(["project_id"], ["projects.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_donations_id", "donations", ["id"])
+
+    if "comments" not in existing:
+        op.create_table(
+            "comments",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("content", sa.Text(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("project_id", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(["project_id"], ["projects.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_comments_id", "comments", ["id"])
+
+    if "subscriptions" not in existing:
+        op.create_table(
+            "subscriptions",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("project_id", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(["project_id"], ["projects.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_subscriptions_id", "subscriptions", ["id"])
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_table(table)
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TYPE IF EXISTS issuecategory")
+        op.execute("DROP TYPE IF EXISTS projectstatus")
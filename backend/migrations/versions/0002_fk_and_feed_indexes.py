@@ -0,0 +1,49 @@
+"""index foreign keys and feed orderings
+
+Revision ID: 0002_fk_and_feed_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-17 09:10:00.000000
+
+Built with CREATE INDEX CONCURRENTLY on PostgreSQL (outside a transaction),
+so tables stay writable while the indexes build.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_fk_and_feed_indexes"
+down_revision: Union[str, None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    # Foreign keys the hot queries filter or join on
+    ("ix_issues_project_id", "issues", ["project_id"]),
+    ("ix_issues_assignee_id", "issues", ["assignee_id"]),
+    ("ix_issues_reporter_id", "issues", ["reporter_id"]),
+    ("ix_donations_project_id", "donations", ["project_id"]),
+    ("ix_donations_user_id", "donations", ["user_id"]),
+    ("ix_comments_project_id", "comments", ["project_id"]),
+    ("ix_subscriptions_user_id", "subscriptions", ["user_id"]),
+    ("ix_subscriptions_project_id", "subscriptions", ["project_id"]),
+    # Feed orderings (keyset pagination sorts on the timestamp, then id)
+    ("ix_issues_status_updated_at", "issues", ["status", "updated_at", "id"]),
+    ("ix_donations_created_at", "donations", ["created_at", "id"]),
+    ("ix_projects_created_at", "projects", ["created_at", "id"]),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, if_not_exists=True,
+                            postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True,
+                          postgresql_concurrently=True)
@@ -0,0 +1,41 @@
+"""unique subscriptions per user and project
+
+Revision ID: 0003_unique_subscriptions
+Revises: 0002_fk_and_feed_indexes
+Create Date: 2026-10-17 10:00:00.000000
+
+Removes duplicate subscriptions (keeping the oldest row), then builds the
+unique index concurrently. It covers lookups by user_id, so the plain
+user_id index is dropped.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_unique_subscriptions"
+down_revision: Union[str, None] = "0002_fk_and_feed_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "DELETE FROM subscriptions WHERE id NOT IN ("
+        "SELECT min(id) FROM subscriptions GROUP BY user_id, project_id)"
+    )
+    with op.get_context().autocommit_block():
+        op.create_index("uq_subscriptions_user_project", "subscriptions",
+                        ["user_id", "project_id"], unique=True, if_not_exists=True,
+                        postgresql_concurrently=True)
+        op.drop_index("ix_subscriptions_user_id", table_name="subscriptions", if_exists=True,
+                      postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index("ix_subscriptions_user_id", "subscriptions", ["user_id"],
+                        if_not_exists=True, postgresql_concurrently=True)
+        op.drop_index("uq_subscriptions_user_project", table_name="subscriptions",
+                      if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,45 @@
+"""notifications inbox
+
+Revision ID: 0004_notifications
+Revises: 0003_unique_subscriptions
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_notifications"
+down_revision: Union[str, None] = "0003_unique_subscriptions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # init_db (create_all) may already have built the table
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table("notifications"):
+        return
+    # A new, empty table: a plain (non-concurrent) index build is instant
+    op.create_table(
+        "notifications",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("type", sa.String(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("project_id", sa.Integer(), nullable=True),
+        sa.Column("read", sa.Boolean(), server_default=sa.false(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["project_id"], ["projects.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_notifications_user_id_id", "notifications", ["user_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_notifications_user_id_id", table_name="notifications")
+    op.drop_table("notifications")
@@ -0,0 +1,69 @@
+"""map clusters, donation rollups and full-text search columns
+
+Revision ID: 0005_series_tables
+Revises: 0004_notifications
+Create Date: 2026-10-17 12:00:00.000000
+
+Schema that used to be folded into 0001_baseline although the release before
+migrations never had it. Creates only what is missing. The new tables start
+empty: fill them with rebuild_geo_index.py and backfill_rollups.py.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_series_tables"
+down_revision: Union[str, None] = "0004_notifications"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ["project_clusters", "donation_rollups"]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    existing = set() if op.get_context().as_sql else set(sa.inspect(bind).get_table_names())
+
+    if "project_clusters" not in existing:
+        op.create_table(
+            "project_clusters",
+            sa.Column("level", sa.Integer(), nullable=False),
+            sa.Column("cell", sa.BigInteger(), nullable=False),
+            sa.Column("project_count", sa.Integer(), nullable=False),
+            sa.Column("lat_sum", sa.Float(), nullable=False),
+            sa.Column("lon_sum", sa.Float(), nullable=False),
+            sa.Column("goal_amount", sa.Float(), nullable=False),
+            sa.Column("current_amount", sa.Float(), nullable=False),
+            sa.PrimaryKeyConstraint("level", "cell"),
+        )
+
+    if "donation_rollups" not in existing:
+        op.create_table(
+            "donation_rollups",
+            sa.Column("project_id", sa.Integer(), nullable=False),
+            sa.Column("granularity", sa.String(), nullable=False),
+            sa.Column("bucket_start", sa.DateTime(), nullable=False),
+            sa.Column("total_amount", sa.Float(), nullable=False),
+            sa.Column("donation_count", sa.Integer(), nullable=False),
+            sa.Column("distinct_donors", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["project_id"], ["projects.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("project_id", "granularity", "bucket_start"),
+        )
+
+    if bind.dialect.name == "postgresql":
+        # Generated tsvector columns and GIN indexes (idempotent, as in init_db)
+        from search import SEARCH_DDL
+        for statement in SEARCH_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # Dropping the generated column drops its GIN index too
+        op.execute("ALTER TABLE issues DROP COLUMN IF EXISTS search_vector")
+        op.execute("ALTER TABLE projects DROP COLUMN IF EXISTS search_vector")
+    for table in reversed(TABLES):
+        op.drop_table(table)
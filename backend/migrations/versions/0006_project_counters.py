@@ -0,0 +1,54 @@
+"""denormalized issue, donation and donor counters on projects
+
+Revision ID: 0006_project_counters
+Revises: 0005_series_tables
+Create Date: 2026-10-17 12:10:00.000000
+
+The columns are added with a server default of 0, then filled from the
+child tables with the same single UPDATE that reconcile_counters.py runs.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_project_counters"
+down_revision: Union[str, None] = "0005_series_tables"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ["issues_count", "donations_count", "donors_count"]
+
+
+def upgrade() -> None:
+    existing = set() if op.get_context().as_sql else {
+        column["name"] for column in sa.inspect(op.get_bind()).get_columns("projects")
+    }
+    for name in COLUMNS:
+        if name not in existing:
+            op.add_column("projects", sa.Column(name, sa.Integer(), nullable=False,
+                                                server_default="0"))
+
+    projects = sa.table("projects", sa.column("id"), *(sa.column(name) for name in COLUMNS))
+    issues = sa.table("issues", sa.column("id"), sa.column("project_id"))
+    donations = sa.table("donations", sa.column("id"), sa.column("project_id"),
+                         sa.column("user_id"))
+    op.execute(projects.update().values(
+        issues_count=sa.select(sa.func.count(issues.c.id)).where(
+            issues.c.project_id == projects.c.id
+        ).scalar_subquery(),
+        donations_count=sa.select(sa.func.count(donations.c.id)).where(
+            donations.c.project_id == projects.c.id
+        ).scalar_subquery(),
+        donors_count=sa.select(sa.func.count(sa.distinct(donations.c.user_id))).where(
+            donations.c.project_id == projects.c.id
+        ).scalar_subquery(),
+    ))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("projects") as batch:
+        for name in reversed(COLUMNS):
+            batch.drop_column(name)
@@ -0,0 +1,41 @@
+"""grid cell spatial index on projects
+
+Revision ID: 0007_project_geo_cells
+Revises: 0006_project_counters
+Create Date: 2026-10-17 12:20:00.000000
+
+Adds the nullable geo_cell column and builds its index with CREATE INDEX
+CONCURRENTLY. The cells depend on GRID_CELL_DEG, so they are computed by
+rebuild_geo_index.py (which also fills the map clusters), not here.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_project_geo_cells"
+down_revision: Union[str, None] = "0006_project_counters"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    existing = set() if op.get_context().as_sql else {
+        column["name"] for column in sa.inspect(op.get_bind()).get_columns("projects")
+    }
+    if "geo_cell" not in existing:
+        op.add_column("projects", sa.Column("geo_cell", sa.Integer(), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index("ix_projects_geo_cell", "projects", ["geo_cell"], if_not_exists=True,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_projects_geo_cell", table_name="projects", if_exists=True,
+                      postgresql_concurrently=True)
+    with op.batch_alter_table("projects") as batch:
+        batch.drop_column("geo_cell")
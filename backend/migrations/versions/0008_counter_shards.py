@@ -0,0 +1,46 @@
+"""sharded project counters
+
+Revision ID: 0008_counter_shards
+Revises: 0007_project_geo_cells
+Create Date: 2026-10-17 12:30:00.000000
+
+counter_shards defaults to 0 (unsharded), so existing projects keep
+counting on their own row until an admin shards them.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_counter_shards"
+down_revision: Union[str, None] = "0007_project_geo_cells"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = None if op.get_context().as_sql else sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("projects")} if inspector else set()
+    if "counter_shards" not in columns:
+        op.add_column("projects", sa.Column("counter_shards", sa.Integer(), nullable=False,
+                                            server_default="0"))
+
+    if inspector is None or not inspector.has_table("project_counter_shards"):
+        op.create_table(
+            "project_counter_shards",
+            sa.Column("project_id", sa.Integer(), nullable=False),
+            sa.Column("shard", sa.Integer(), nullable=False),
+            sa.Column("current_amount", sa.Float(), nullable=False),
+            sa.Column("donations_count", sa.Integer(), nullable=False),
+            sa.Column("donors_count", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["project_id"], ["projects.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("project_id", "shard"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("project_counter_shards")
+    with op.batch_alter_table("projects") as batch:
+        batch.drop_column("counter_shards")
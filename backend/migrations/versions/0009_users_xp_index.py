@@ -0,0 +1,30 @@
+"""index users.xp for the leaderboard rebuild
+
+Revision ID: 0009_users_xp_index
+Revises: 0008_counter_shards
+Create Date: 2026-10-17 12:40:00.000000
+
+Built with CREATE INDEX CONCURRENTLY on PostgreSQL, as in 0002.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009_users_xp_index"
+down_revision: Union[str, None] = "0008_counter_shards"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index("ix_users_xp", "users", ["xp"], if_not_exists=True,
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_users_xp", table_name="users", if_exists=True,
+                      postgresql_concurrently=True)
@@ -0,0 +1,42 @@
+"""donor table deciding new donors
+
+Revision ID: 0010_project_donors
+Revises: 0009_users_xp_index
+Create Date: 2026-10-17 12:50:00.000000
+
+One row per (project, user) that has donated, filled from the existing
+donations. Inserting into it is how a donation learns it is a first one.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010_project_donors"
+down_revision: Union[str, None] = "0009_users_xp_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_context().as_sql or not sa.inspect(op.get_bind()).has_table("project_donors"):
+        op.create_table(
+            "project_donors",
+            sa.Column("project_id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["project_id"], ["projects.id"], ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("project_id", "user_id"),
+        )
+
+    op.execute(
+        "INSERT INTO project_donors (project_id, user_id) "
+        "SELECT DISTINCT project_id, user_id FROM donations WHERE true "
+        "ON CONFLICT DO NOTHING"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("project_donors")
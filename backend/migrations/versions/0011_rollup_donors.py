@@ -0,0 +1,80 @@
+"""donor table deciding distinct donors per rollup bucket
+
+Revision ID: 0011_rollup_donors
+Revises: 0010_project_donors
+Create Date: 2026-10-17 13:00:00.000000
+
+One row per (project, granularity, bucket, user) that has donated. Bucket
+bounds are computed in Python (rollups.py), so the table is filled here
+from the donations when running online; with --sql, run
+backfill_rollups.py afterwards.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql, sqlite
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0011_rollup_donors"
+down_revision: Union[str, None] = "0010_project_donors"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    as_sql = op.get_context().as_sql
+    if as_sql or not sa.inspect(op.get_bind()).has_table("donation_rollup_donors"):
+        op.create_table(
+            "donation_rollup_donors",
+            sa.Column("project_id", sa.Integer(), nullable=False),
+            sa.Column("granularity", sa.String(), nullable=False),
+            sa.Column("bucket_start", sa.DateTime(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(["project_id"], ["projects.id"], ondelete="CASCADE"),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("project_id", "granularity", "bucket_start", "user_id"),
+        )
+    if as_sql:
+        return
+
+    from rollups import GRANULARITIES, bucket_start
+    bind = op.get_bind()
+    donors = sa.table("donation_rollup_donors", sa.column("project_id"), sa.column("granularity"),
+                      sa.column("bucket_start"), sa.column("user_id"))
+    donations = sa.table("donations", sa.column("project_id"), sa.column("user_id"),
+                         sa.column("created_at", sa.DateTime()))
+    if bind.execute(sa.select(sa.func.count()).select_from(donors)).scalar():
+        return
+    # One project at a time, in insert batches
+    keys, current = set(), None
+    result = bind.execute(
+        sa.select(donations.c.project_id, donations.c.user_id, donations.c.created_at)
+        .where(donations.c.created_at.is_not(None))
+        .order_by(donations.c.project_id)
+        .execution_options(yield_per=BACKFILL_BATCH_SIZE)
+    )
+    for project_id, user_id, created_at in result:
+        if project_id != current or len(keys) >= BACKFILL_BATCH_SIZE:
+            _insert(bind, donors, keys)
+            keys, current = set(), project_id
+        for granularity in GRANULARITIES:
+            keys.add((project_id, granularity, bucket_start(created_at, granularity), user_id))
+    _insert(bind, donors, keys)
+
+
+def _insert(bind, donors, keys):
+    if keys:
+        insert = postgresql.insert if bind.dialect.name == "postgresql" else sqlite.insert
+        bind.execute(
+            insert(donors).on_conflict_do_nothing(),
+            [{"project_id": p, "granularity": g, "bucket_start": b, "user_id": u}
+             for p, g, b, u in sorted(keys)]
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("donation_rollup_donors")
@@ -0,0 +1,40 @@
+"""amount of each project already in its map clusters
+
+Revision ID: 0012_cluster_amounts
+Revises: 0011_rollup_donors
+Create Date: 2026-10-17 13:10:00.000000
+
+Buffered cluster amounts are flushed into the cells of wherever a project is
+at flush time, so a move must shift only what the cluster rows already hold.
+Filled with the full raised amount: workers flush their buffers on shutdown.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0012_cluster_amounts"
+down_revision: Union[str, None] = "0011_rollup_donors"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = None if op.get_context().as_sql else sa.inspect(op.get_bind())
+    columns = {column["name"] for column in inspector.get_columns("projects")} if inspector else set()
+    if "cluster_amount" not in columns:
+        op.add_column("projects", sa.Column("cluster_amount", sa.Float(), nullable=False,
+                                            server_default="0"))
+
+    op.execute(
+        "UPDATE projects SET cluster_amount = current_amount + COALESCE(("
+        "SELECT SUM(current_amount) FROM project_counter_shards "
+        "WHERE project_counter_shards.project_id = projects.id), 0)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("projects") as batch:
+        batch.drop_column("cluster_amount")
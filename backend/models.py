@@ -1,8 +1,8 @@
 """SQLAlchemy ORM models and Pydantic schemas for the Save Food API"""
 
-from sqlalchemy import Column, Integer, String, Boolean, Float, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, Integer, BigInteger, String, Boolean, Float, DateTime, ForeignKey, Enum, Index, Text
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import false, func
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
 from datetime import datetime
@@ -40,7 +40,7 @@ class UserDB(Base):
     avatar = Column(String, nullable=True)
     
     # Gamification & Admin
-    xp = Column(Integer, default=0)
+    xp = Column(Integer, default=0, index=True)  # indexed for the leaderboard rebuild
     rating_level = Column(String, default="Bronze")
     is_admin = Column(Boolean, default=False)
     
@@ -79,6 +79,19 @@ class ProjectDB(Base):
     # Geolocation
     latitude = Column(Float, nullable=True)
     longitude = Column(Float, nullable=True)
+    geo_cell = Column(Integer, nullable=True, index=True)  # geo.grid_cell() spatial index
+    # Part of the raised amount already added to the project's map cluster rows
+    # (the rest is still buffered in workers, see geo.ClusterAmountBuffer)
+    cluster_amount = Column(Float, nullable=False, default=0.0, server_default="0")
+    
+    # Denormalized counters (kept in sync by crud, rebuilt by reconcile_counters.py)
+    issues_count = Column(Integer, nullable=False, default=0, server_default="0")
+    donations_count = Column(Integer, nullable=False, default=0, server_default="0")
+    donors_count = Column(Integer, nullable=False, default=0, server_default="0")
+    
+    # Sharded counter mode: when > 0, donations add to one of this many
+    # ProjectCounterShardDB rows and the totals above are the base to add them to
+    counter_shards = Column(Integer, nullable=False, default=0, server_default="0")
     
     # Foreign key
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -94,6 +107,45 @@ class ProjectDB(Base):
     comments = relationship("CommentDB", back_populates="project", cascade="all, delete-orphan")
     subscriptions = relationship("SubscriptionDB", back_populates="project", cascade="all, delete-orphan")
 
+    # New project feed ordering
+    __table_args__ = (Index("ix_projects_created_at", "created_at", "id"),)
+
+
+class ProjectCounterShardDB(Base):
+    """One sub-row of a sharded project counter (spreads hot-row lock contention)"""
+    __tablename__ = "project_counter_shards"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    
+    # Deltas on top of the project's own counters
+    current_amount = Column(Float, nullable=False, default=0.0)
+    donations_count = Column(Integer, nullable=False, default=0)
+    donors_count = Column(Integer, nullable=False, default=0)
+
+
+class ProjectDonorDB(Base):
+    """Who has donated to a project; the unique key decides new donors under concurrency"""
+    __tablename__ = "project_donors"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+
+
+class ProjectClusterDB(Base):
+    """Precomputed map cluster: aggregate of the projects in one grid cell of one zoom level"""
+    __tablename__ = "project_clusters"
+
+    level = Column(Integer, primary_key=True)
+    cell = Column(BigInteger, primary_key=True)
+    
+    # Aggregates (centroid = lat_sum / project_count)
+    project_count = Column(Integer, nullable=False, default=0)
+    lat_sum = Column(Float, nullable=False, default=0.0)
+    lon_sum = Column(Float, nullable=False, default=0.0)
+    goal_amount = Column(Float, nullable=False, default=0.0)
+    current_amount = Column(Float, nullable=False, default=0.0)
+
 
 class IssueDB(Base):
     """Volunteer task database model"""
@@ -111,9 +163,9 @@ class IssueDB(Base):
     priority = Column(String, default="medium")
     
     # Foreign keys
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
-    reporter_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    assignee_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
+    reporter_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    assignee_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     
     # Timestamps
     created_at = Column(DateTime, server_default=func.now())
@@ -125,6 +177,9 @@ class IssueDB(Base):
     reporter = relationship("UserDB", back_populates="issues_created", foreign_keys=[reporter_id])
     assignee = relationship("UserDB", back_populates="issues_assigned", foreign_keys=[assignee_id])
 
+    # Volunteer completion feed: closed issues, most recently updated first
+    __table_args__ = (Index("ix_issues_status_updated_at", "status", "updated_at", "id"),)
+
 
 class DonationDB(Base):
     """Donation transaction history for transparency"""
@@ -135,8 +190,8 @@ class DonationDB(Base):
     is_anonymous = Column(Boolean, default=False)
     
     # Foreign keys
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
     
     # Timestamps
     created_at = Column(DateTime, server_default=func.now())
@@ -145,6 +200,32 @@ class DonationDB(Base):
     user = relationship("UserDB", back_populates="donations")
     project = relationship("ProjectDB", back_populates="donations")
 
+    # Donation feed ordering
+    __table_args__ = (Index("ix_donations_created_at", "created_at", "id"),)
+
+
+class DonationRollupDB(Base):
+    """Donation totals of one project per time bucket (see rollups.py)"""
+    __tablename__ = "donation_rollups"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    granularity = Column(String, primary_key=True)  # day, week or month
+    bucket_start = Column(DateTime, primary_key=True)
+    
+    total_amount = Column(Float, nullable=False, default=0.0)
+    donation_count = Column(Integer, nullable=False, default=0)
+    distinct_donors = Column(Integer, nullable=False, default=0)
+
+
+class DonationRollupDonorDB(Base):
+    """Who has donated in a rollup bucket; the unique key decides distinct_donors under concurrency"""
+    __tablename__ = "donation_rollup_donors"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    granularity = Column(String, primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+
 
 class CommentDB(Base):
     """Project discussion comments"""
@@ -155,7 +236,7 @@ class CommentDB(Base):
     
     # Foreign keys
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
     
     # Timestamps
     created_at = Column(DateTime, server_default=func.now())
@@ -174,7 +255,7 @@ class SubscriptionDB(Base):
     
     # Foreign keys
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False, index=True)
     
     # Timestamps
     created_at = Column(DateTime, server_default=func.now())
@@ -183,6 +264,31 @@ class SubscriptionDB(Base):
     user = relationship("UserDB", back_populates="subscriptions")
     project = relationship("ProjectDB", back_populates="subscriptions")
 
+    # One row per user and project (the ON CONFLICT target of subscribe);
+    # also serves lookups by user_id
+    __table_args__ = (
+        Index("uq_subscriptions_user_project", "user_id", "project_id", unique=True),
+    )
+
+
+class NotificationDB(Base):
+    """One inbox entry of a user (written by the fan-out in fanout.py)"""
+    __tablename__ = "notifications"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    type = Column(String, nullable=False, default="info")  # donation, issue_closed, project_verified, info
+    title = Column(String, nullable=False)
+    message = Column(Text, nullable=False, default="")
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=True)
+    read = Column(Boolean, nullable=False, default=False, server_default=false())
+    
+    # Timestamps
+    created_at = Column(DateTime, server_default=func.now())
+
+    # Inbox reads: one user's entries, newest (highest id) first
+    __table_args__ = (Index("ix_notifications_user_id_id", "user_id", "id"),)
+
 
 # ============ PYDANTIC SCHEMAS ============
 
@@ -210,6 +316,22 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+class LeaderboardEntry(BaseModel):
+    rank: int
+    id: int
+    name: str
+    avatar: Optional[str] = None
+    xp: int
+    rating_level: str
+
+
+class UserRankResponse(BaseModel):
+    user_id: int
+    xp: int
+    rank: int
+    total_users: int
+
+
 class UserUpdate(BaseModel):
     name: Optional[str] = None
     avatar: Optional[str] = None
@@ -268,10 +390,29 @@ class ProjectResponse(BaseModel):
         from_attributes = True
 
 
+class ProjectNearbyResponse(ProjectResponse):
+    distance_km: float = 0.0
+
+
+class CounterShardsUpdate(BaseModel):
+    shards: int  # 0 turns sharding off
+
+
+class ProjectClusterResponse(BaseModel):
+    level: int
+    cell: int
+    count: int
+    latitude: float
+    longitude: float
+    goal_amount: float
+    current_amount: float
+
+
 class ProjectDetailResponse(ProjectResponse):
     owner: UserResponse
     issues_count: Optional[int] = 0
     donations_count: Optional[int] = 0
+    donors_count: Optional[int] = 0
 
 
 # Issue Schemas
@@ -299,6 +440,10 @@ class IssueStatusUpdate(BaseModel):
     assignee_id: Optional[int] = None
 
 
+class IssueBatchClose(BaseModel):
+    issue_ids: List[int]
+
+
 class IssueResponse(BaseModel):
     id: int
     title: str
@@ -317,12 +462,27 @@ class IssueResponse(BaseModel):
         from_attributes = True
 
 
+class IssueBatchCloseResponse(BaseModel):
+    closed: List[IssueResponse]
+    skipped: List[int]  # unassigned or already closed
+
+
 class IssueDetailResponse(IssueResponse):
     reporter: UserResponse
     assignee: Optional[UserResponse] = None
     project: ProjectResponse
 
 
+# Search Schemas
+class SearchResult(BaseModel):
+    type: str  # "project" or "issue"
+    id: int
+    title: str
+    description: Optional[str] = None
+    project_id: int
+    rank: float
+
+
 # Donation Schemas
 class DonationCreate(BaseModel):
     amount: float
@@ -330,6 +490,31 @@ class DonationCreate(BaseModel):
     is_anonymous: bool = False
 
 
+class DonationBucketResponse(BaseModel):
+    bucket_start: datetime
+    total_amount: float
+    donation_count: int
+    distinct_donors: int
+
+    class Config:
+        from_attributes = True
+
+
+class DonationImportRow(DonationCreate):
+    user_id: Optional[int] = None  # defaults to the importing admin
+
+
+class DonationImportError(BaseModel):
+    row: int
+    error: str
+
+
+class DonationImportReport(BaseModel):
+    imported: int
+    failed: int
+    errors: List[DonationImportError]  # capped, see crud.MAX_IMPORT_ERRORS
+
+
 class DonationResponse(BaseModel):
     id: int
     amount: float
@@ -378,6 +563,17 @@ class SubscriptionCreate(BaseModel):
     project_id: int
 
 
+class SubscriptionBulkUpdate(BaseModel):
+    subscribe: List[int] = []
+    unsubscribe: List[int] = []
+
+
+class SubscriptionBulkResult(BaseModel):
+    # Projects whose state changed; already-current or unknown ids are left out
+    subscribed: List[int]
+    unsubscribed: List[int]
+
+
 class SubscriptionResponse(BaseModel):
     id: int
     user_id: int
@@ -388,6 +584,30 @@ class SubscriptionResponse(BaseModel):
         from_attributes = True
 
 
+# Notification Schemas
+class NotificationCreate(BaseModel):
+    title: str = "Notification"
+    message: str = ""
+    type: str = "info"
+
+
+class NotificationResponse(BaseModel):
+    id: int
+    type: str
+    title: str
+    message: str
+    project_id: Optional[int] = None
+    read: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class NotificationMarkRead(BaseModel):
+    ids: Optional[List[int]] = None  # None marks every unread notification
+
+
 # Error & Message Responses
 class ErrorResponse(BaseModel):
     error: str
@@ -0,0 +1,91 @@
+"""Keyset (cursor) pagination helpers shared by list queries"""
+
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Sequence
+from fastapi import Response
+from sqlalchemy import DateTime, String, bindparam, tuple_
+from sqlalchemy.types import TypeDecorator
+import base64
+import json
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(Exception):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(*values) -> str:
+    """Pack the sort key of the last row into an opaque URL-safe token"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> tuple:
+    """Unpack a cursor, converting each value to its column's Python type"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(columns):
+            raise ValueError("cursor does not match sort key")
+        values = []
+        for value, column in zip(payload, columns):
+            if column.type.python_type is datetime:
+                values.append(datetime.fromisoformat(value))
+            else:
+                values.append(column.type.python_type(value))
+        return tuple(values)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(str(e))
+
+
+class _KeysetDateTime(TypeDecorator):
+    """
+    DateTime bound for cursor comparisons. SQLite keeps datetimes as text and
+    CURRENT_TIMESTAMP defaults carry no microseconds, so the bound must use
+    the same text form or equal timestamps would compare as smaller.
+    """
+    impl = DateTime
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(String())
+        return dialect.type_descriptor(DateTime())
+
+    def process_bind_param(self, value, dialect):
+        if dialect.name == "sqlite" and value is not None:
+            fmt = "%Y-%m-%d %H:%M:%S.%f" if value.microsecond else "%Y-%m-%d %H:%M:%S"
+            return value.strftime(fmt)
+        return value
+
+
+def _bound(column, value):
+    type_ = _KeysetDateTime() if isinstance(value, datetime) else column.type
+    return bindparam(None, value, type_=type_)
+
+
+def paginate(stmt, columns: Sequence, cursor: Optional[str] = None, skip: int = 0,
+             limit: int = 100, descending: bool = False):
+    """
+    Order a select by columns (last one must be unique, e.g. id) and page it.
+    With a cursor the page starts right after that key (keyset, same cost at any
+    depth); without one the legacy skip/offset is used.
+    """
+    stmt = stmt.order_by(*[c.desc() if descending else c.asc() for c in columns])
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        key = tuple_(*columns)
+        bound = tuple_(*[_bound(c, v) for c, v in zip(columns, values)])
+        stmt = stmt.filter(key < bound if descending else key > bound)
+    elif skip:
+        stmt = stmt.offset(skip)
+    return stmt.limit(limit)
+
+
+def set_next_cursor(response: Response, items: List[Any], limit: int,
+                    key: Callable[[Any], tuple]):
+    """Expose the cursor of the next page when this page came back full"""
+    if items and len(items) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(items[-1]))
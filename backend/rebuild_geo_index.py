@@ -0,0 +1,26 @@
+"""
+Rebuild the project grid-cell spatial index and the map cluster hierarchy
+Run: python rebuild_geo_index.py
+"""
+import asyncio
+import sys
+from database import AsyncSessionLocal, async_engine
+import crud
+
+
+async def rebuild():
+    async with AsyncSessionLocal() as db:
+        updated = await crud.rebuild_geo_cells(db)
+        clusters = await crud.rebuild_project_clusters(db)
+    await async_engine.dispose()
+    return updated, clusters
+
+
+if __name__ == "__main__":
+    try:
+        updated, clusters = asyncio.run(rebuild())
+        print(f"✓ Re-indexed {updated} project location(s)")
+        print(f"✓ Rebuilt {clusters} map cluster cell(s)")
+    except Exception as e:
+        print(f"❌ Error rebuilding geo index: {e}")
+        sys.exit(1)
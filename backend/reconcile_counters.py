@@ -0,0 +1,31 @@
+"""
+Rebuild denormalized project counters (issues, donations, distinct donors)
+Run: python reconcile_counters.py [project_id]
+"""
+import asyncio
+import sys
+from database import AsyncSessionLocal, async_engine
+from invalidation import cache_invalidator
+import crud
+
+
+async def reconcile(project_id=None):
+    # Broadcast the invalidations, so running API nodes drop their cached counters
+    await cache_invalidator.start()
+    try:
+        async with AsyncSessionLocal() as db:
+            updated = await crud.reconcile_project_counters(db, project_id)
+    finally:
+        await cache_invalidator.stop()
+        await async_engine.dispose()
+    return updated
+
+
+if __name__ == "__main__":
+    project_id = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    try:
+        updated = asyncio.run(reconcile(project_id))
+        print(f"✓ Reconciled counters for {updated} project(s)")
+    except Exception as e:
+        print(f"❌ Error reconciling counters: {e}")
+        sys.exit(1)
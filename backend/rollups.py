@@ -0,0 +1,25 @@
+"""Time buckets for the donation rollup table"""
+
+from datetime import datetime, timedelta
+from typing import Tuple
+
+GRANULARITIES = ("day", "week", "month")
+
+
+def bucket_bounds(ts: datetime, granularity: str) -> Tuple[datetime, datetime]:
+    """[start, end) of the bucket containing ts; weeks start on Monday"""
+    day = ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return day, day + timedelta(days=1)
+    if granularity == "week":
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=7)
+    if granularity == "month":
+        start = day.replace(day=1)
+        end = (start + timedelta(days=32)).replace(day=1)
+        return start, end
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def bucket_start(ts: datetime, granularity: str) -> datetime:
+    return bucket_bounds(ts, granularity)[0]
@@ -0,0 +1,40 @@
+"""Admin-only bulk operations"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import crud
+from models import DonationImportReport
+from database import get_db
+from routes.auth import get_current_user
+from donation_import import IMPORT_FORMATS, detect_format, parse_donation_rows
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+@router.post("/donations/import", response_model=DonationImportReport)
+async def import_donations(
+    request: Request,
+    format: Optional[str] = Query(None, description="csv or ndjson (default: from Content-Type)"),
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Bulk-import donations from a streamed CSV (header: amount,project_id[,is_anonymous,user_id])
+    or NDJSON body. Rows without user_id are attributed to the importing admin.
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can import donations"
+        )
+    
+    fmt = format or detect_format(request.headers.get("content-type"))
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson"
+        )
+    
+    rows = parse_donation_rows(request.stream(), fmt)
+    return await crud.import_donations(db, rows, default_user_id=current_user.id)
@@ -2,20 +2,21 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status, Header
 from typing import Optional
-from sqlalchemy.orm import Session
-from auth import create_access_token, verify_token, verify_password
+from sqlalchemy.ext.asyncio import AsyncSession
+from auth import create_access_token, verify_token, verify_password_async
 import crud
+from cache import principal_cache, UserSnapshot
 from models import UserCreate, UserResponse, LoginRequest, AuthResponse
 from database import get_db
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
-def get_current_user(
+async def get_current_user(
     authorization: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    """Dependency to get current authenticated user"""
+    """Dependency to get current authenticated user (cached per token)"""
     if not authorization:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -32,6 +33,10 @@ def get_current_user(
     
     token = parts[1]
     
+    cached_user = principal_cache.get(token)
+    if cached_user:
+        return cached_user
+    
     payload = verify_token(token)
     if not payload:
         raise HTTPException(
@@ -46,21 +51,24 @@ def get_current_user(
             detail="Invalid token payload"
         )
     
-    user = crud.get_user_by_id(db, int(user_id))
+    generation = principal_cache.generation(int(user_id))
+    user = await crud.get_user_by_id(db, int(user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    return user
+    snapshot = UserSnapshot.from_orm(user)
+    principal_cache.set(token, snapshot, generation, expires_at=payload.get("exp"))
+    return snapshot
 
 
 @router.post("/register", response_model=AuthResponse)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user"""
     # Check if email already exists
-    existing_user = crud.get_user_by_email(db, user_data.email)
+    existing_user = await crud.get_user_by_email(db, user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -68,7 +76,7 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    db_user = crud.create_user(
+    db_user = await crud.create_user(
         db,
         email=user_data.email,
         name=user_data.name,
@@ -85,11 +93,11 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=AuthResponse)
-async def login(credentials: LoginRequest, db: Session = Depends(get_db)):
+async def login(credentials: LoginRequest, db: AsyncSession = Depends(get_db)):
     """Login with email and password"""
-    user = crud.get_user_by_email(db, credentials.email)
+    user = await crud.get_user_by_email(db, credentials.email)
     
-    if not user or not verify_password(credentials.password, user.password_hash):
+    if not user or not await verify_password_async(credentials.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -107,7 +115,7 @@ async def login(credentials: LoginRequest, db: Session = Depends(get_db)):
 @router.get("/verify")
 async def verify_token_endpoint(
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Verify if current user token is valid"""
     return {
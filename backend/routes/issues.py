@@ -1,15 +1,19 @@
 """Volunteer task and issue management routes"""
 
-from fastapi import APIRouter, Depends, HTTPException, Header, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Header, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import crud
 from models import (
     IssueCreate, IssueUpdate, IssueResponse, IssueDetailResponse,
-    IssueCategory, IssueStatusUpdate
+    IssueCategory, IssueStatusUpdate, IssueBatchClose, IssueBatchCloseResponse
 )
 from database import get_db
 from routes.auth import get_current_user
+from pagination import set_next_cursor
+from http_cache import conditional_get
+from serialization import json_list
+import fanout
 
 router = APIRouter(prefix="/api/issues", tags=["issues"])
 
@@ -18,37 +22,45 @@ router = APIRouter(prefix="/api/issues", tags=["issues"])
 
 @router.get("", response_model=List[IssueResponse])
 async def get_issues(
+    request: Request,
+    response: Response,
     project_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
     """Get issues, optionally filtered by project"""
+    not_modified = conditional_get(request, response, "issues")
+    if not_modified:
+        return not_modified
     if project_id:
-        issues = crud.get_issues_by_project(db, project_id, skip=skip, limit=limit)
+        issues = await crud.get_issues_by_project(
+            db, project_id, skip=skip, limit=limit, cursor=cursor
+        )
     else:
-        from models import IssueDB
-        issues = db.query(IssueDB).offset(skip).limit(limit).all()
+        issues = await crud.get_all_issues(db, skip=skip, limit=limit, cursor=cursor)
     
-    return [IssueResponse.from_orm(issue) for issue in issues]
+    set_next_cursor(response, issues, limit, lambda i: (i.id,))
+    return json_list(IssueResponse, issues, response)
 
 
 @router.post("", response_model=IssueResponse)
 async def create_issue(
     issue_data: IssueCreate,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new volunteer task/issue"""
     # Check if project exists
-    project = crud.get_project_by_id(db, issue_data.project_id)
+    project = await crud.get_project_by_id(db, issue_data.project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Project not found"
         )
     
-    db_issue = crud.create_issue(
+    db_issue = await crud.create_issue(
         db,
         project_id=issue_data.project_id,
         reporter_id=current_user.id,
@@ -59,13 +71,13 @@ async def create_issue(
         due_date=issue_data.due_date
     )
     
-    return IssueResponse.from_orm(db_issue)
+    return db_issue
 
 
 @router.get("/{issue_id}", response_model=IssueDetailResponse)
-async def get_issue_detail(issue_id: int, db: Session = Depends(get_db)):
+async def get_issue_detail(issue_id: int, db: AsyncSession = Depends(get_db)):
     """Get issue details with all relationships"""
-    issue = crud.get_issue_by_id(db, issue_id)
+    issue = await crud.get_issue_detail(db, issue_id)
     
     if not issue:
         raise HTTPException(
@@ -73,7 +85,7 @@ async def get_issue_detail(issue_id: int, db: Session = Depends(get_db)):
             detail="Issue not found"
         )
     
-    return IssueDetailResponse.from_orm(issue)
+    return issue
 
 
 @router.put("/{issue_id}", response_model=IssueResponse)
@@ -81,10 +93,10 @@ async def update_issue(
     issue_id: int,
     issue_update: IssueUpdate,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update issue information"""
-    issue = crud.get_issue_by_id(db, issue_id)
+    issue = await crud.get_issue_by_id(db, issue_id)
     
     if not issue:
         raise HTTPException(
@@ -100,7 +112,7 @@ async def update_issue(
                 detail="Only issue reporter or project owner can update"
             )
     
-    updated_issue = crud.update_issue(
+    updated_issue = await crud.update_issue(
         db,
         issue_id,
         title=issue_update.title,
@@ -110,7 +122,7 @@ async def update_issue(
         priority=issue_update.priority
     )
     
-    return IssueResponse.from_orm(updated_issue)
+    return updated_issue
 
 
 # ============ VOLUNTEER ASSIGNMENT (GAMIFICATION) ============
@@ -119,10 +131,10 @@ async def update_issue(
 async def assign_volunteer(
     issue_id: int,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Assign current user as volunteer to the issue"""
-    issue = crud.get_issue_by_id(db, issue_id)
+    issue = await crud.get_issue_by_id(db, issue_id)
     
     if not issue:
         raise HTTPException(
@@ -136,19 +148,19 @@ async def assign_volunteer(
             detail="Cannot assign to closed issue"
         )
     
-    assigned_issue = crud.assign_volunteer(db, issue_id, current_user.id)
+    assigned_issue = await crud.assign_volunteer(db, issue_id, current_user.id)
     
-    return IssueResponse.from_orm(assigned_issue)
+    return assigned_issue
 
 
 @router.post("/{issue_id}/close", response_model=IssueResponse)
 async def close_issue(
     issue_id: int,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Close an issue and award XP to assignee"""
-    issue = crud.get_issue_by_id(db, issue_id)
+    issue = await crud.get_issue_by_id(db, issue_id)
     
     if not issue:
         raise HTTPException(
@@ -164,7 +176,8 @@ async def close_issue(
                 detail="Only issue reporter or project owner can close"
             )
     
-    closed_issue = crud.close_issue(db, issue_id)
+    already_closed = issue.status == "closed"
+    closed_issue = await crud.close_issue(db, issue_id)
     
     if not closed_issue or not closed_issue.assignee_id:
         raise HTTPException(
@@ -172,13 +185,59 @@ async def close_issue(
             detail="Issue must be assigned to a volunteer before closing"
         )
     
-    return IssueResponse.from_orm(closed_issue)
+    if not already_closed:
+        fanout.issue_closed(closed_issue.project_id, current_user.id, closed_issue.title)
+    return closed_issue
+
+
+@router.post("/close", response_model=IssueBatchCloseResponse)
+async def close_issues(
+    payload: IssueBatchClose,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Close many issues in one transaction and award XP to their assignees"""
+    issue_ids = sorted(set(payload.issue_ids))
+    if not 1 <= len(issue_ids) <= crud.MAX_BATCH_CLOSE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"issue_ids must list between 1 and {crud.MAX_BATCH_CLOSE} issues"
+        )
+    issues = await crud.get_issues_by_ids(db, issue_ids)
+
+    missing = set(issue_ids) - {issue.id for issue in issues}
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Issues not found: {sorted(missing)}"
+        )
+
+    # Only reporter or project owner can close
+    if not current_user.is_admin:
+        forbidden = [
+            issue.id for issue in issues
+            if issue.reporter_id != current_user.id and issue.project.owner_id != current_user.id
+        ]
+        if forbidden:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Only issue reporter or project owner can close: {forbidden}"
+            )
+
+    closed = await crud.close_issues(db, issue_ids)
+    for issue in closed:
+        fanout.issue_closed(issue.project_id, current_user.id, issue.title)
+    closed_ids = {issue.id for issue in closed}
+    return {
+        "closed": closed,
+        "skipped": [issue_id for issue_id in issue_ids if issue_id not in closed_ids]
+    }
 
 
 @router.get("/{issue_id}/assignee-stats")
-async def get_assignee_stats(issue_id: int, db: Session = Depends(get_db)):
+async def get_assignee_stats(issue_id: int, db: AsyncSession = Depends(get_db)):
     """Get stats about the volunteer assigned to this issue"""
-    issue = crud.get_issue_by_id(db, issue_id)
+    issue = await crud.get_issue_by_id(db, issue_id)
     
     if not issue:
         raise HTTPException(
@@ -186,15 +245,19 @@ async def get_assignee_stats(issue_id: int, db: Session = Depends(get_db)):
             detail="Issue not found"
         )
     
-    if not issue.assignee:
+    stats = None
+    if issue.assignee_id:
+        stats = await crud.get_user_stats(db, issue.assignee_id)
+    
+    if not stats:
         return {"message": "No volunteer assigned to this issue"}
     
     return {
-        "assignee_id": issue.assignee.id,
-        "assignee_name": issue.assignee.name,
-        "xp": issue.assignee.xp,
-        "rating_level": issue.assignee.rating_level,
-        "issues_completed": len([i for i in issue.assignee.issues_assigned if i.status == "closed"])
+        "assignee_id": stats["user_id"],
+        "assignee_name": stats["name"],
+        "xp": stats["xp"],
+        "rating_level": stats["rating_level"],
+        "issues_completed": stats["total_closed_issues"]
     }
 
 
@@ -202,10 +265,10 @@ async def get_assignee_stats(issue_id: int, db: Session = Depends(get_db)):
 async def delete_issue(
     issue_id: int,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete an issue (only reporter or admin can delete)"""
-    issue = crud.get_issue_by_id(db, issue_id)
+    issue = await crud.get_issue_by_id(db, issue_id)
     
     if not issue:
         raise HTTPException(
@@ -219,9 +282,7 @@ async def delete_issue(
             detail="Only issue reporter or admin can delete"
         )
     
-    from models import IssueDB
-    db.delete(issue)
-    db.commit()
+    await crud.delete_issue(db, issue_id)
     
     return {"message": "Issue deleted"}
 
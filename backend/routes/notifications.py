@@ -1,56 +1,145 @@
 """Notification management routes"""
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 import crud
-from models import SubscriptionResponse
+from models import (
+    NotificationCreate, NotificationMarkRead, NotificationResponse,
+    SubscriptionBulkResult, SubscriptionBulkUpdate, SubscriptionResponse
+)
 from database import get_db
 from routes.auth import get_current_user
+from pagination import set_next_cursor
+from serialization import json_list
 
 router = APIRouter(prefix="/api/notifications", tags=["notifications"])
 
 
-@router.post("/")
+@router.get("", response_model=List[NotificationResponse])
+async def get_my_notifications(
+    response: Response,
+    unread_only: bool = False,
+    skip: int = 0,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the current user's notifications, newest first"""
+    notifications = await crud.get_notifications(
+        db, current_user.id, unread_only=unread_only, skip=skip, limit=limit, cursor=cursor
+    )
+    set_next_cursor(response, notifications, limit, lambda n: (n.id,))
+    return json_list(NotificationResponse, notifications, response)
+
+
+@router.post("", response_model=NotificationResponse)
 async def create_notification(
-    data: dict,
+    notification: NotificationCreate,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new notification for current user"""
-    # This endpoint creates a simple notification response
-    return {
-        "id": 1,
-        "title": data.get("title", "Notification"),
-        "message": data.get("message", ""),
-        "type": data.get("type", "info"),
-        "read": False,
-        "created_at": "2024-01-08T00:00:00"
-    }
+    return await crud.create_notification(
+        db, current_user.id, notification.title, notification.message, notification.type
+    )
+
+
+@router.post("/read")
+async def mark_notifications_read(
+    payload: NotificationMarkRead,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Mark many (or, without ids, all) of the current user's notifications as read"""
+    if payload.ids is not None and len(payload.ids) > crud.MAX_MARK_READ:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {crud.MAX_MARK_READ} notifications per request"
+        )
+    
+    updated = await crud.mark_notifications_read(db, current_user.id, payload.ids)
+    return {"updated": updated}
+
+
+@router.patch("/{notification_id}/read", response_model=NotificationResponse)
+async def mark_notification_read(
+    notification_id: int,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Mark one notification as read"""
+    notification = await crud.mark_notification_read(db, current_user.id, notification_id)
+    
+    if not notification:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Notification not found"
+        )
+    
+    return notification
+
+
+@router.delete("/{notification_id}")
+async def delete_notification(
+    notification_id: int,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete one notification"""
+    if not await crud.delete_notification(db, current_user.id, notification_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Notification not found"
+        )
+    
+    return {"message": "Notification deleted"}
 
 
 @router.get("/subscriptions", response_model=List[SubscriptionResponse])
 async def get_my_subscriptions(
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all project subscriptions for current user"""
-    from models import SubscriptionDB
-    subscriptions = db.query(SubscriptionDB).filter(
-        SubscriptionDB.user_id == current_user.id
-    ).all()
+    subscriptions = await crud.get_user_subscriptions(db, current_user.id)
+    
+    return json_list(SubscriptionResponse, subscriptions)
+
+
+@router.post("/subscriptions/bulk", response_model=SubscriptionBulkResult)
+async def update_my_subscriptions(
+    payload: SubscriptionBulkUpdate,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Subscribe to and unsubscribe from many projects at once"""
+    subscribe, unsubscribe = set(payload.subscribe), set(payload.unsubscribe)
+    if len(subscribe) + len(unsubscribe) > crud.MAX_BULK_SUBSCRIPTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {crud.MAX_BULK_SUBSCRIPTIONS} projects per request"
+        )
+    if subscribe & unsubscribe:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Projects both subscribed and unsubscribed: {sorted(subscribe & unsubscribe)}"
+        )
     
-    return [SubscriptionResponse.from_orm(s) for s in subscriptions]
+    return await crud.update_subscriptions(
+        db, current_user.id, sorted(subscribe), sorted(unsubscribe)
+    )
 
 
 @router.get("/subscriptions/{project_id}")
 async def get_project_subscribers(
     project_id: int,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all subscribers to a project (admin only)"""
-    project = crud.get_project_by_id(db, project_id)
+    project = await crud.get_project_by_id(db, project_id)
     
     if not project:
         raise HTTPException(
@@ -64,7 +153,7 @@ async def get_project_subscribers(
             detail="Only project owner or admin can view subscribers"
         )
     
-    subscribers = crud.get_project_subscribers(db, project_id)
+    subscribers = await crud.get_project_subscribers(db, project_id)
     
     return {
         "project_id": project_id,
@@ -81,85 +170,41 @@ async def get_project_subscribers(
 
 @router.get("/donations/new")
 async def get_donation_notifications(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
     """Get recent donations for notification display"""
-    from models import DonationDB
-    donations = db.query(DonationDB).order_by(
-        DonationDB.created_at.desc()
-    ).offset(skip).limit(limit).all()
-    
-    result = []
-    for donation in donations:
-        donor_name = None if donation.is_anonymous else donation.user.name
-        result.append({
-            "id": donation.id,
-            "donor_name": donor_name,
-            "amount": donation.amount,
-            "project_name": donation.project.name,
-            "created_at": donation.created_at
-        })
-    
-    return result
+    feed = await crud.get_donation_feed(db, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, feed, limit, lambda d: (d["created_at"], d["id"]))
+    return feed
 
 
 @router.get("/volunteers/completed")
 async def get_volunteer_completions(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
     """Get recently completed volunteer tasks for notifications"""
-    from models import IssueDB
-    completed_issues = db.query(IssueDB).filter(
-        IssueDB.status == "closed"
-    ).order_by(
-        IssueDB.updated_at.desc()
-    ).offset(skip).limit(limit).all()
-    
-    result = []
-    for issue in completed_issues:
-        if issue.assignee:
-            result.append({
-                "issue_id": issue.id,
-                "issue_title": issue.title,
-                "volunteer_name": issue.assignee.name,
-                "volunteer_xp_gained": {
-                    "low": 10,
-                    "medium": 25,
-                    "high": 50
-                }.get(issue.priority, 25),
-                "project_name": issue.project.name,
-                "completed_at": issue.updated_at
-            })
-    
-    return result
+    feed = await crud.get_volunteer_completion_feed(db, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, feed, limit, lambda i: (i["completed_at"], i["issue_id"]))
+    return feed
 
 
 @router.get("/projects/new")
 async def get_new_projects(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
 ):
     """Get recently created projects for notifications"""
-    from models import ProjectDB
-    projects = db.query(ProjectDB).order_by(
-        ProjectDB.created_at.desc()
-    ).offset(skip).limit(limit).all()
-    
-    result = []
-    for project in projects:
-        result.append({
-            "project_id": project.id,
-            "project_name": project.name,
-            "owner_name": project.owner.name,
-            "goal_amount": project.goal_amount,
-            "is_verified": project.is_verified,
-            "created_at": project.created_at
-        })
-    
-    return result
-
+    feed = await crud.get_new_project_feed(db, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, feed, limit, lambda p: (p["created_at"], p["project_id"]))
+    return feed
@@ -1,17 +1,28 @@
 """Charity project management routes with transparent donation tracking"""
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+from datetime import datetime
 import crud
 from models import (
-    ProjectCreate, ProjectUpdate, ProjectResponse, ProjectDetailResponse,
-    DonationCreate, DonationResponse, DonationPublicResponse,
+    ProjectCreate, ProjectUpdate, ProjectResponse, ProjectDetailResponse, ProjectNearbyResponse,
+    ProjectClusterResponse, CounterShardsUpdate,
+    DonationCreate, DonationResponse, DonationPublicResponse, DonationBucketResponse,
     CommentCreate, CommentResponse, CommentDetailResponse,
     SubscriptionCreate, SubscriptionResponse
 )
 from database import get_db
 from routes.auth import get_current_user
+from pagination import set_next_cursor
+from cache import SHARD_TOTALS_TTL
+from http_cache import conditional_body, conditional_get
+from serialization import json_list, render_list, validate_list
+from geo import MAX_NEARBY_RADIUS_KM, parse_bbox
+from ingest import donation_batcher
+import fanout
+from donation_export import EXPORT_FORMATS, export_donations
 
 router = APIRouter(prefix="/api/projects", tags=["projects"])
 
@@ -19,27 +30,80 @@ router = APIRouter(prefix="/api/projects", tags=["projects"])
 # ============ PROJECT ENDPOINTS ============
 
 @router.get("", response_model=List[ProjectResponse])
-async def get_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all projects (public listing)"""
-    projects = crud.get_all_projects(db, skip=skip, limit=limit)
-    return [ProjectResponse.from_orm(p) for p in projects]
+async def get_projects(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get all projects (public listing, next page cursor in X-Next-Cursor)"""
+    projects = await crud.get_all_projects(db, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, projects, limit, lambda p: (p.id,))
+    # Validated by the page itself: a donation elsewhere leaves this page's ETag alone
+    rendered = json_list(ProjectResponse, projects, response)
+    return conditional_body(request, rendered) or rendered
 
 
 @router.get("/verified", response_model=List[ProjectResponse])
-async def get_verified_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_verified_projects(
+    request: Request,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
     """Get verified projects only"""
-    projects = crud.get_verified_projects(db, skip=skip, limit=limit)
-    return [ProjectResponse.from_orm(p) for p in projects]
+    projects = await crud.get_verified_projects(db, skip=skip, limit=limit, cursor=cursor)
+    set_next_cursor(response, projects, limit, lambda p: (p.id,))
+    rendered = json_list(ProjectResponse, projects, response)
+    return conditional_body(request, rendered) or rendered
+
+
+@router.get("/nearby", response_model=List[ProjectNearbyResponse])
+async def get_nearby_projects(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(10.0, gt=0, le=MAX_NEARBY_RADIUS_KM),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get projects within radius_km of a point, nearest first (for the map)"""
+    nearby = await crud.get_projects_nearby(db, lat, lon, radius_km, limit)
+    
+    result = validate_list(ProjectNearbyResponse, [project for project, _ in nearby])
+    for item, (_, distance) in zip(result, nearby):
+        item.distance_km = round(distance, 3)
+    return render_list(ProjectNearbyResponse, result)
+
+
+@router.get("/clusters", response_model=List[ProjectClusterResponse])
+async def get_project_clusters(
+    bbox: str = Query(..., description="west,south,east,north"),
+    zoom: int = Query(..., ge=0, le=22),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get aggregated project clusters inside the visible map area"""
+    try:
+        min_lat, max_lat, lon_ranges = parse_bbox(bbox)
+        return await crud.get_project_clusters(db, min_lat, max_lat, lon_ranges, zoom)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
 
 @router.post("", response_model=ProjectResponse)
 async def create_project(
     project_data: ProjectCreate,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new charity project"""
-    db_project = crud.create_project(
+    db_project = await crud.create_project(
         db,
         owner_id=current_user.id,
         name=project_data.name,
@@ -50,13 +114,24 @@ async def create_project(
         latitude=project_data.latitude,
         longitude=project_data.longitude
     )
-    return ProjectResponse.from_orm(db_project)
+    return db_project
 
 
 @router.get("/{project_id}", response_model=ProjectDetailResponse)
-async def get_project_detail(project_id: int, db: Session = Depends(get_db)):
+async def get_project_detail(
+    project_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db)
+):
     """Get project details with all information"""
-    project = crud.get_project_by_id(db, project_id)
+    # The owner is embedded, so any user change also changes the detail
+    not_modified = conditional_get(
+        request, response, ("project", project_id), "users", settle=SHARD_TOTALS_TTL
+    )
+    if not_modified:
+        return not_modified
+    project = await crud.get_project_detail(db, project_id)
     
     if not project:
         raise HTTPException(
@@ -64,10 +139,7 @@ async def get_project_detail(project_id: int, db: Session = Depends(get_db)):
             detail="Project not found"
         )
     
-    response = ProjectDetailResponse.from_orm(project)
-    response.issues_count = len(project.issues)
-    response.donations_count = len(project.donations)
-    return response
+    return project
 
 
 @router.put("/{project_id}", response_model=ProjectResponse)
@@ -75,10 +147,10 @@ async def update_project(
     project_id: int,
     project_update: ProjectUpdate,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update project information"""
-    project = crud.get_project_by_id(db, project_id)
+    project = await crud.get_project_by_id(db, project_id)
     
     if not project:
         raise HTTPException(
@@ -92,7 +164,7 @@ async def update_project(
             detail="Only project owner can update"
         )
     
-    updated_project = crud.update_project(
+    updated_project = await crud.update_project(
         db,
         project_id,
         name=project_update.name,
@@ -105,14 +177,14 @@ async def update_project(
         longitude=project_update.longitude
     )
     
-    return ProjectResponse.from_orm(updated_project)
+    return updated_project
 
 
 @router.post("/{project_id}/verify")
 async def verify_project(
     project_id: int,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Verify project as admin (only admins can verify)"""
     if not current_user.is_admin:
@@ -121,7 +193,9 @@ async def verify_project(
             detail="Only admins can verify projects"
         )
     
-    verified_project = crud.verify_project(db, project_id, current_user.id)
+    project = await crud.get_project_by_id(db, project_id)
+    was_verified = project is not None and project.is_verified
+    verified_project = await crud.verify_project(db, project_id, current_user.id)
     
     if not verified_project:
         raise HTTPException(
@@ -129,6 +203,8 @@ async def verify_project(
             detail="Project not found"
         )
     
+    if not was_verified:
+        fanout.project_verified(project_id, current_user.id)
     return {
         "message": "Project verified",
         "project_id": project_id,
@@ -136,15 +212,46 @@ async def verify_project(
     }
 
 
+@router.put("/{project_id}/counter-shards", response_model=ProjectResponse)
+async def set_counter_shards(
+    project_id: int,
+    shards_data: CounterShardsUpdate,
+    current_user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Spread a viral project's donation counter over N rows (admin only, 0 turns it off)"""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can change counter sharding"
+        )
+    
+    if not 0 <= shards_data.shards <= crud.MAX_COUNTER_SHARDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"shards must be between 0 and {crud.MAX_COUNTER_SHARDS}"
+        )
+    
+    project = await crud.set_project_counter_shards(db, project_id, shards_data.shards)
+    
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
+        )
+    
+    return project
+
+
 @router.post("/{project_id}/upload-report")
 async def upload_report_url(
     project_id: int,
     report_url: str,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Upload PDF report URL for donation transparency"""
-    project = crud.get_project_by_id(db, project_id)
+    project = await crud.get_project_by_id(db, project_id)
     
     if not project:
         raise HTTPException(
@@ -158,7 +265,7 @@ async def upload_report_url(
             detail="Only project owner or admin can upload reports"
         )
     
-    updated_project = crud.update_project(db, project_id, report_url=report_url)
+    updated_project = await crud.update_project(db, project_id, report_url=report_url)
     
     return {
         "message": "Report URL uploaded",
@@ -174,10 +281,54 @@ async def donate_to_project(
     project_id: int,
     donation_data: DonationCreate,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Process donation in a transaction"""
-    project = crud.get_project_by_id(db, project_id)
+    if donation_batcher.enabled:
+        donation = await donation_batcher.submit(
+            user_id=current_user.id,
+            project_id=project_id,
+            amount=donation_data.amount,
+            is_anonymous=donation_data.is_anonymous
+        )
+    else:
+        donation = await crud.process_donation(
+            db,
+            user_id=current_user.id,
+            project_id=project_id,
+            amount=donation_data.amount,
+            is_anonymous=donation_data.is_anonymous
+        )
+    
+    if not donation:
+        # The project is only looked up on this failure path, not before every donation
+        if not await crud.get_project_by_id(db, project_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project not found"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Failed to process donation"
+        )
+    
+    fanout.donation_received(
+        project_id, current_user.id, current_user.name, donation.amount, donation.is_anonymous
+    )
+    return donation
+
+
+@router.get("/{project_id}/donations", response_model=List[DonationPublicResponse])
+async def get_public_donations(
+    project_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get public donation list (respects anonymity settings)"""
+    project = await crud.get_project_by_id(db, project_id)
     
     if not project:
         raise HTTPException(
@@ -185,27 +336,43 @@ async def donate_to_project(
             detail="Project not found"
         )
     
-    donation = crud.process_donation(
-        db,
-        user_id=current_user.id,
-        project_id=project_id,
-        amount=donation_data.amount,
-        is_anonymous=donation_data.is_anonymous
+    public_donations = await crud.get_public_donations(
+        db, project_id, skip=skip, limit=limit, cursor=cursor
     )
+    set_next_cursor(response, public_donations, limit, lambda d: (d["id"],))
+    return public_donations
+
+
+@router.get("/{project_id}/donations/timeseries", response_model=List[DonationBucketResponse])
+async def get_donation_timeseries(
+    project_id: int,
+    granularity: str = Query("day", pattern="^(day|week|month)$"),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(366, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get donation totals per day/week/month for dashboards (empty buckets are omitted)"""
+    project = await crud.get_project_by_id(db, project_id)
     
-    if not donation:
+    if not project:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Failed to process donation"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project not found"
         )
     
-    return DonationResponse.from_orm(donation)
+    buckets = await crud.get_donation_timeseries(db, project_id, granularity, since, until, limit)
+    return json_list(DonationBucketResponse, buckets)
 
 
-@router.get("/{project_id}/donations", response_model=List[DonationPublicResponse])
-async def get_public_donations(project_id: int, db: Session = Depends(get_db)):
-    """Get public donation list (respects anonymity settings)"""
-    project = crud.get_project_by_id(db, project_id)
+@router.get("/{project_id}/donations/export")
+async def export_public_donations(
+    project_id: int,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Download the full public donation ledger (respects anonymity settings)"""
+    project = await crud.get_project_by_id(db, project_id)
     
     if not project:
         raise HTTPException(
@@ -213,14 +380,19 @@ async def get_public_donations(project_id: int, db: Session = Depends(get_db)):
             detail="Project not found"
         )
     
-    public_donations = crud.get_public_donations(db, project_id)
-    return public_donations
+    return StreamingResponse(
+        export_donations(project_id, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="project-{project_id}-donations.{format}"'
+        }
+    )
 
 
 @router.get("/{project_id}/donation-summary")
-async def get_donation_summary(project_id: int, db: Session = Depends(get_db)):
+async def get_donation_summary(project_id: int, db: AsyncSession = Depends(get_db)):
     """Get donation summary with progress"""
-    project = crud.get_project_by_id(db, project_id)
+    project = await crud.get_project_with_totals(db, project_id)
     
     if not project:
         raise HTTPException(
@@ -238,7 +410,7 @@ async def get_donation_summary(project_id: int, db: Session = Depends(get_db)):
         "current_amount": project.current_amount,
         "progress_percent": round(progress_percent, 2),
         "is_completed": project.current_amount >= project.goal_amount,
-        "total_donors": len(project.donations)
+        "total_donors": project.donors_count
     }
 
 
@@ -249,10 +421,10 @@ async def create_comment(
     project_id: int,
     comment_data: CommentCreate,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a comment on a project"""
-    project = crud.get_project_by_id(db, project_id)
+    project = await crud.get_project_by_id(db, project_id)
     
     if not project:
         raise HTTPException(
@@ -260,20 +432,27 @@ async def create_comment(
             detail="Project not found"
         )
     
-    comment = crud.create_comment(
+    comment = await crud.create_comment(
         db,
         user_id=current_user.id,
         project_id=project_id,
         content=comment_data.content
     )
     
-    return CommentResponse.from_orm(comment)
+    return comment
 
 
 @router.get("/{project_id}/comments", response_model=List[CommentDetailResponse])
-async def get_project_comments(project_id: int, skip: int = 0, limit: int = 50, db: Session = Depends(get_db)):
+async def get_project_comments(
+    project_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db)
+):
     """Get all comments for a project"""
-    project = crud.get_project_by_id(db, project_id)
+    project = await crud.get_project_by_id(db, project_id)
     
     if not project:
         raise HTTPException(
@@ -281,19 +460,21 @@ async def get_project_comments(project_id: int, skip: int = 0, limit: int = 50,
             detail="Project not found"
         )
     
-    comments = crud.get_comments_by_project(db, project_id, skip=skip, limit=limit)
-    return [CommentDetailResponse.from_orm(c) for c in comments]
+    comments = await crud.get_comments_by_project(
+        db, project_id, skip=skip, limit=limit, cursor=cursor
+    )
+    set_next_cursor(response, comments, limit, lambda c: (c.id,))
+    return json_list(CommentDetailResponse, comments, response)
 
 
 @router.delete("/comments/{comment_id}")
 async def delete_comment(
     comment_id: int,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a comment (only author or admin can delete)"""
-    from models import CommentDB
-    comment = db.query(CommentDB).filter(CommentDB.id == comment_id).first()
+    comment = await crud.get_comment_by_id(db, comment_id)
     
     if not comment:
         raise HTTPException(
@@ -307,7 +488,7 @@ async def delete_comment(
             detail="Only comment author or admin can delete"
         )
     
-    crud.delete_comment(db, comment_id)
+    await crud.delete_comment(db, comment_id)
     
     return {"message": "Comment deleted"}
 
@@ -318,10 +499,10 @@ async def delete_comment(
 async def subscribe_to_project(
     project_id: int,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Subscribe to project notifications"""
-    project = crud.get_project_by_id(db, project_id)
+    project = await crud.get_project_by_id(db, project_id)
     
     if not project:
         raise HTTPException(
@@ -329,19 +510,19 @@ async def subscribe_to_project(
             detail="Project not found"
         )
     
-    subscription = crud.subscribe_to_project(db, current_user.id, project_id)
+    subscription = await crud.subscribe_to_project(db, current_user.id, project_id)
     
-    return SubscriptionResponse.from_orm(subscription)
+    return subscription
 
 
 @router.delete("/{project_id}/unsubscribe")
 async def unsubscribe_from_project(
     project_id: int,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Unsubscribe from project notifications"""
-    success = crud.unsubscribe_from_project(db, current_user.id, project_id)
+    success = await crud.unsubscribe_from_project(db, current_user.id, project_id)
     
     if not success:
         raise HTTPException(
@@ -0,0 +1,20 @@
+"""Full-text search over projects and volunteer tasks"""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+import crud
+from models import SearchResult
+from database import get_db
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+
+@router.get("", response_model=List[SearchResult])
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db)
+):
+    """Search project names/descriptions and task titles/descriptions, best match first"""
+    return await crud.search(db, q, limit)
@@ -0,0 +1,29 @@
+"""Server-Sent Events: live donations, task completions and new projects"""
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from activity import StreamFull, activity_broker
+
+router = APIRouter(prefix="/api/stream", tags=["stream"])
+
+
+@router.get("/activity")
+async def stream_activity(last_event_id: Optional[str] = Header(None)):
+    """
+    Live activity as text/event-stream: `donation`, `issue_closed` and
+    `project_created` events, served from memory (no database access)
+    """
+    try:
+        frames = activity_broker.subscribe(last_event_id)
+    except StreamFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many activity stream clients, retry later"
+        )
+    
+    return StreamingResponse(
+        frames,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
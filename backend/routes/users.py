@@ -1,12 +1,13 @@
 """User profile and management routes"""
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 import crud
-from models import UserResponse, UserUpdate
+from typing import List
+from models import UserResponse, UserUpdate, LeaderboardEntry, UserRankResponse
 from database import get_db
 from routes.auth import get_current_user
-from auth import verify_password
+from auth import verify_password_async
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 
@@ -14,13 +15,37 @@ router = APIRouter(prefix="/api/users", tags=["users"])
 @router.get("/me", response_model=UserResponse)
 async def get_my_profile(current_user = Depends(get_current_user)):
     """Get current user's profile"""
-    return UserResponse.from_orm(current_user)
+    return current_user
+
+
+@router.get("/leaderboard", response_model=List[LeaderboardEntry])
+async def get_leaderboard(
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get top volunteers by XP"""
+    return await crud.get_leaderboard(db, limit=limit, offset=offset)
+
+
+@router.get("/{user_id}/rank", response_model=UserRankResponse)
+async def get_user_rank(user_id: int, db: AsyncSession = Depends(get_db)):
+    """Get a user's position on the XP leaderboard"""
+    rank = await crud.get_user_rank(db, user_id)
+    
+    if not rank:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    return rank
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-async def get_user(user_id: int, db: Session = Depends(get_db)):
+async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
     """Get user by ID"""
-    user = crud.get_user_by_id(db, user_id)
+    user = await crud.get_user_by_id(db, user_id)
     
     if not user:
         raise HTTPException(
@@ -28,14 +53,14 @@ async def get_user(user_id: int, db: Session = Depends(get_db)):
             detail="User not found"
         )
     
-    return UserResponse.from_orm(user)
+    return user
 
 
 @router.put("/me", response_model=UserResponse)
 async def update_profile(
     user_update: UserUpdate,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update current user's profile"""
     # If password is being changed, require old password verification
@@ -45,13 +70,13 @@ async def update_profile(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Old password required to change password"
             )
-        if not verify_password(user_update.old_password, current_user.password_hash):
+        if not await verify_password_async(user_update.old_password, current_user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect current password"
             )
     
-    updated_user = crud.update_user(
+    updated_user = await crud.update_user(
         db,
         current_user.id,
         name=user_update.name,
@@ -65,7 +90,7 @@ async def update_profile(
             detail="Failed to update profile"
         )
     
-    return UserResponse.from_orm(updated_user)
+    return updated_user
 
 
 @router.put("/{user_id}", response_model=UserResponse)
@@ -73,7 +98,7 @@ async def update_user_profile(
     user_id: int,
     user_update: UserUpdate,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update user profile by ID (user or admin only)"""
     # Check if the user is updating their own profile or is admin
@@ -83,7 +108,7 @@ async def update_user_profile(
             detail="You can only update your own profile"
         )
     
-    updated_user = crud.update_user(
+    updated_user = await crud.update_user(
         db,
         user_id,
         name=user_update.name,
@@ -97,29 +122,19 @@ async def update_user_profile(
             detail="Failed to update profile"
         )
     
-    return UserResponse.from_orm(updated_user)
+    return updated_user
 
 
 @router.get("/{user_id}/stats")
-async def get_user_stats(user_id: int, db: Session = Depends(get_db)):
+async def get_user_stats(user_id: int, db: AsyncSession = Depends(get_db)):
     """Get user statistics and gamification info"""
-    user = crud.get_user_by_id(db, user_id)
+    stats = await crud.get_user_stats(db, user_id)
     
-    if not user:
+    if not stats:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    return {
-        "user_id": user.id,
-        "name": user.name,
-        "xp": user.xp,
-        "rating_level": user.rating_level,
-        "is_admin": user.is_admin,
-        "total_donations": len(user.donations),
-        "total_issues_created": len(user.issues_created),
-        "total_issues_assigned": len(user.issues_assigned),
-        "total_closed_issues": len([i for i in user.issues_assigned if i.status == "closed"])
-    }
+    return stats
 
@@ -0,0 +1,110 @@
+"""
+Full-text search over projects and volunteer tasks.
+PostgreSQL keeps a generated tsvector column with a GIN index on each table;
+other databases (SQLite in dev/test) use the in-process inverted index below.
+"""
+
+from math import log
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+import heapq
+import os
+import re
+
+SEARCH_CONFIG = os.getenv("SEARCH_CONFIG", "simple")
+
+# Field weights, matching the default ts_rank weights of labels A and B
+TITLE_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+
+def _vector_ddl(table: str, title: str) -> List[str]:
+    return [
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ("
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({title}, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
+        f") STORED",
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_search_vector ON {table} USING GIN (search_vector)"
+    ]
+
+
+# Idempotent, run by init_db on PostgreSQL. The column is generated, so the
+# database keeps it in sync on every insert/update
+SEARCH_DDL = _vector_ddl("projects", "name") + _vector_ddl("issues", "title")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+class InvertedIndex:
+    """
+    Token -> {document key: weighted term frequency}. A query intersects the
+    posting lists of its tokens starting from the rarest one, so its cost
+    follows the number of matches rather than the catalog size.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self._postings: Dict[str, Dict[Hashable, float]] = {}
+        self._docs: Dict[Hashable, Tuple[dict, Dict[str, float]]] = {}
+
+    def add(self, key: Hashable, fields: Sequence[Tuple[Optional[str], float]], payload: dict):
+        """Index (or re-index) a document from (text, weight) fields"""
+        self.remove(key)
+        weights: Dict[str, float] = {}
+        for text, weight in fields:
+            for token in tokenize(text):
+                weights[token] = weights.get(token, 0.0) + weight
+        for token, weight in weights.items():
+            self._postings.setdefault(token, {})[key] = weight
+        self._docs[key] = (payload, weights)
+
+    def remove(self, key: Hashable):
+        entry = self._docs.pop(key, None)
+        if entry is None:
+            return
+        for token in entry[1]:
+            postings = self._postings[token]
+            del postings[key]
+            if not postings:
+                del self._postings[token]
+
+    def clear(self):
+        self._postings.clear()
+        self._docs.clear()
+        self.ready = False
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[float, dict]]:
+        """Documents containing every query token as (score, payload), best first"""
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+        postings = [self._postings.get(token) for token in tokens]
+        if not all(postings):
+            return []
+        postings.sort(key=len)
+        total = len(self._docs)
+        idf = [log(1 + total / len(p)) for p in postings]
+
+        scores = {}
+        for key, weight in postings[0].items():
+            score = weight * idf[0]
+            for p, token_idf in zip(postings[1:], idf[1:]):
+                other = p.get(key)
+                if other is None:
+                    break
+                score += other * token_idf
+            else:
+                scores[key] = score
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(score, self._docs[key][0]) for key, score in best]
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+
+search_index = InvertedIndex()
@@ -3,7 +3,6 @@
 from database import SessionLocal, engine, Base
 from models import UserDB, ProjectDB
 from auth import hash_password
-import crud
 
 
 def seed_database():
@@ -15,7 +14,7 @@ def seed_database():
     
     try:
         # Check if test user already exists
-        existing_user = crud.get_user_by_email(db, "donor@example.com")
+        existing_user = db.query(UserDB).filter(UserDB.email == "donor@example.com").first()
         if existing_user:
             print("✓ Test user already exists")
             user_id = existing_user.id
@@ -0,0 +1,40 @@
+"""
+Single-pass JSON for list endpoints. Returning `[Model.from_orm(x) ...]`
+through response_model= validates and serializes every item twice; here ORM
+rows are validated once by a precompiled TypeAdapter and written straight to
+JSON bytes. Other responses render through ORJSONResponse (the app default).
+"""
+
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Type
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter for List[model], built once per model"""
+    return TypeAdapter(List[model])
+
+
+def validate_list(model: Type[BaseModel], objects: Iterable[Any]) -> List[BaseModel]:
+    """Validate ORM rows (or dicts) into response models in one pass"""
+    return list_adapter(model).validate_python(objects, from_attributes=True)
+
+
+def render_list(model: Type[BaseModel], items: List[BaseModel],
+                response: Optional[Response] = None) -> Response:
+    """
+    Serialize already validated items to a JSON response, carrying over the
+    headers set on the route's injected response (cursor, cache validators)
+    """
+    return Response(
+        list_adapter(model).dump_json(items),
+        media_type="application/json",
+        headers=dict(response.headers) if response is not None else None
+    )
+
+
+def json_list(model: Type[BaseModel], objects: Iterable[Any],
+              response: Optional[Response] = None) -> Response:
+    return render_list(model, validate_list(model, objects), response)
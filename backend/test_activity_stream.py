@@ -0,0 +1,56 @@
+"""
+Checks for the activity stream broker: fan-out, replay, heartbeat and
+slow-consumer eviction. No database needed: python test_activity_stream.py (or pytest)
+"""
+
+import asyncio
+from activity import ActivityBroker, HEARTBEAT_FRAME, StreamFull
+
+
+async def check_broker():
+    broker = ActivityBroker(buffer_size=3, heartbeat=0.05, max_clients=2, replay_size=10)
+    fast = broker.subscribe()
+    slow = broker.subscribe()
+    try:
+        broker.subscribe()
+        assert False, "third client should be refused"
+    except StreamFull:
+        pass
+    assert await fast.__anext__() == b"retry: 3000\n\n"
+
+    # Nothing published: the fast client gets a heartbeat comment
+    assert await fast.__anext__() == HEARTBEAT_FRAME
+    print("✓ Heartbeat after silence")
+
+    broker.publish("donation", {"id": 1, "amount": 5.0})
+    frame = await fast.__anext__()
+    assert frame == b'id: 1\nevent: donation\ndata: {"id":1,"amount":5.0}\n\n', frame
+
+    # slow never reads: its buffer of 3 overflows on the 4th event
+    for i in range(2, 5):
+        broker.publish("donation", {"id": i})
+        await fast.__anext__()
+    assert broker.stats() == {"clients": 1, "published": 4, "evicted": 1}
+    frames = [frame async for frame in slow]
+    assert frames == [b"retry: 3000\n\n"], frames
+    print("✓ Slow consumer evicted without blocking the others")
+
+    # A reconnecting client replays what it missed after Last-Event-ID
+    again = broker.subscribe(last_event_id="2")
+    await again.__anext__()
+    assert [await again.__anext__() for _ in range(2)] == [f for _, f in list(broker._replay)[2:]]
+    print("✓ Replay from Last-Event-ID")
+
+    broker.close()
+    assert [frame async for frame in fast] == [] and [frame async for frame in again] == []
+    assert broker.stats()["clients"] == 0
+    print("✓ close() ends every stream")
+
+
+def test_activity_broker():
+    asyncio.run(check_broker())
+
+
+if __name__ == "__main__":
+    test_activity_broker()
+    print("\n✅ Activity stream checks passed")
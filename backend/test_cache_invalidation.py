@@ -0,0 +1,133 @@
+"""
+Cross-node cache invalidation over the in-memory bus: two invalidators on one
+hub stand in for two workers. Runs against a throwaway SQLite database:
+python test_cache_invalidation.py (or pytest)
+"""
+
+import os
+import tempfile
+
+# invalidation imports the shared engine: never let it default to PostgreSQL
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "invalidation.db")
+os.environ["ENVIRONMENT"] = "test"
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import asyncio
+import json
+from sqlalchemy import update
+from cache import change_versions, counter_hints, shard_totals, user_stats
+from database import AsyncSessionLocal, Base, async_engine
+from invalidation import CacheInvalidator, InMemoryBus, MAX_PAYLOAD_BYTES, PostgresBus
+from leaderboard import leaderboard
+from models import UserDB
+import crud
+
+
+def fill_caches():
+    """What the other worker still holds for user 7 and project 3"""
+    user_stats.set(7, {"user_id": 7})
+    counter_hints.set(3, (0, None, None))
+    shard_totals.set(3, (1.0, 1, 1))
+
+
+async def check_invalidation():
+    hub = []
+    node_a, node_b = CacheInvalidator(InMemoryBus(hub)), CacheInvalidator(InMemoryBus(hub))
+    await node_a.start()
+    await node_b.start()
+
+    fill_caches()
+    node_a.invalidate("user_stats", 7, None)
+    assert user_stats.get(7) is None  # evicted locally at once
+    fill_caches()
+    await asyncio.sleep(0)  # deliver
+    assert user_stats.get(7) is None and counter_hints.get(3) is not None
+    assert node_b.received == 1 and node_a.received == 0  # a skips its own message
+    print("✓ Remote user stats evicted")
+
+    version = change_versions.get(("project", 3))[0]
+    node_a.invalidate("project_counters", 3)
+    node_a.invalidate("project", 3)
+    fill_caches()
+    await asyncio.sleep(0)
+    assert counter_hints.get(3) is None and shard_totals.get(3) is None
+    assert change_versions.get(("project", 3))[0] == version + 2  # bumped by a, then by b
+    print("✓ Remote project counters and validators evicted")
+
+    epoch = change_versions.epoch
+    node_b._reset()
+    assert change_versions.epoch != epoch and change_versions.get(("project", 3))[0] == 0
+    print("✓ Reset retires every validator")
+
+    node_a.invalidate("user_stats", *range(1200))
+    assert node_a.stats()["sent"] == 3 + 3  # 1200 ids split into messages of 500
+    await node_b.stop()
+    node_a.invalidate("issue")
+    await asyncio.sleep(0)
+    assert node_b.received == 6  # the chunks were published before b left, the issue after
+    await node_a.stop()
+
+
+async def set_xp(user_id: int, xp: int):
+    """XP written by another worker: this process's leaderboard does not see it"""
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(UserDB).where(UserDB.id == user_id).values(xp=xp))
+        await db.commit()
+
+
+async def check_leaderboard_sync():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as db:
+        db.add_all([UserDB(id=i, email=f"player{i}@example.com", name=f"Player {i}",
+                           password_hash="x", xp=10 * i) for i in (1, 2, 3)])
+        await db.commit()
+        await crud.rebuild_leaderboard(db)
+    assert leaderboard.rank(1) == 3
+
+    hub = []
+    node_a, node_b = CacheInvalidator(InMemoryBus(hub)), CacheInvalidator(InMemoryBus(hub))
+    await node_a.start()
+    await node_b.start()
+
+    await set_xp(1, 50)
+    node_a.invalidate("user", 1)
+    assert leaderboard.xp(1) == 10  # eviction alone leaves the index stale
+    await asyncio.sleep(0)  # deliver
+    await node_b.stop()  # waits for the reload it started
+    assert leaderboard.xp(1) == 50 and leaderboard.rank(1) == 1
+    print("✓ Remote XP change re-read into the leaderboard")
+
+    await set_xp(3, 70)
+    node_b._reset()  # messages may have been missed: reload everyone
+    await node_b.stop()
+    assert leaderboard.rank(3) == 1 and leaderboard.rank(1) == 2
+    print("✓ Reset reloads the whole leaderboard")
+
+    await node_a.stop()
+    await async_engine.dispose()
+
+
+def test_leaderboard_follows_remote_xp():
+    asyncio.run(check_leaderboard_sync())
+
+
+def test_cache_invalidation_between_nodes():
+    asyncio.run(check_invalidation())
+
+
+def test_notify_payloads_fit():
+    bus = PostgresBus("postgresql://", "cache_invalidation", 10, 1, 1)
+    messages = [{"node": "ab12cd34", "entity": "user_stats", "ids": list(range(i, i + 500))}
+                for i in range(0, 5000, 500)]
+    payloads = list(bus._chunks(messages))
+    assert all(len(p.encode()) < MAX_PAYLOAD_BYTES for p in payloads)
+    assert [m for p in payloads for m in json.loads(p)] == messages
+
+
+if __name__ == "__main__":
+    test_cache_invalidation_between_nodes()
+    test_leaderboard_follows_remote_xp()
+    test_notify_payloads_fit()
+    print("\n✅ Cache invalidation checks passed")
@@ -0,0 +1,315 @@
+"""
+Concurrency stress test for the donation ledger: many donors give to the same
+project at once (directly, sharded or through the group-commit batcher) and
+the project totals must add up exactly.
+Runs against a throwaway SQLite database: python test_donation_concurrency.py (or pytest).
+Set TEST_DATABASE_URL to run it against a scratch PostgreSQL database instead.
+"""
+
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = (os.getenv("TEST_DATABASE_URL")
+                              or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "ledger.db"))
+os.environ["ENVIRONMENT"] = "test"
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import asyncio
+from datetime import datetime
+from sqlalchemy import func, select
+from database import AsyncSessionLocal, Base, async_engine
+import crud
+from cache import counter_hints, shard_totals
+from geo import cluster_amounts
+import ingest
+from ingest import DonationBatcher
+from models import (
+    UserDB, ProjectDB, ProjectClusterDB, DonationDB, DonationImportRow, DonationRollupDB
+)
+
+DONORS = 40
+DONATIONS_PER_DONOR = 3
+
+
+async def seed():
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSessionLocal() as db:
+        users = [UserDB(email=f"donor{i}@example.com", name=f"Donor {i}", password_hash="x")
+                 for i in range(DONORS)]
+        db.add_all(users)
+        await db.flush()
+        project = ProjectDB(name="Hot meals", owner_id=users[0].id, goal_amount=10000.0)
+        db.add(project)
+        await db.commit()
+        return [u.id for u in users], project.id
+
+
+async def donate(user_id: int, project_id: int, amount: float):
+    async with AsyncSessionLocal() as db:
+        return await crud.process_donation(db, user_id, project_id, amount)
+
+
+async def check_parallel_donations(shards: int = 0):
+    user_ids, project_id = await seed()
+    if shards:
+        async with AsyncSessionLocal() as db:
+            await crud.set_project_counter_shards(db, project_id, shards)
+    amounts = {user_id: [float(i + 1) + 0.25 * k for k in range(DONATIONS_PER_DONOR)]
+               for i, user_id in enumerate(user_ids)}
+
+    donations = await asyncio.gather(*[
+        donate(user_id, project_id, amount)
+        for k in range(DONATIONS_PER_DONOR)
+        for user_id in user_ids
+        for amount in [amounts[user_id][k]]
+    ])
+    assert all(d is not None for d in donations), "some donations failed"
+
+    expected_total = sum(sum(a) for a in amounts.values())
+    shard_totals.clear()
+    async with AsyncSessionLocal() as db:
+        project = await crud.get_project_with_totals(db, project_id)
+        ledger_total = await db.scalar(
+            select(func.sum(DonationDB.amount)).filter(DonationDB.project_id == project_id)
+        )
+        rollup = (await db.execute(
+            select(func.sum(DonationRollupDB.total_amount), func.sum(DonationRollupDB.donation_count),
+                   func.max(DonationRollupDB.distinct_donors))
+            .filter(DonationRollupDB.project_id == project_id, DonationRollupDB.granularity == "month")
+        )).first()
+
+    assert abs(project.current_amount - expected_total) < 1e-6, \
+        f"current_amount {project.current_amount} != {expected_total}"
+    assert abs(ledger_total - expected_total) < 1e-6
+    assert abs(rollup[0] - expected_total) < 1e-6 and rollup[1] == DONORS * DONATIONS_PER_DONOR, rollup
+    assert rollup[2] <= DONORS, rollup
+    assert project.donations_count == DONORS * DONATIONS_PER_DONOR, project.donations_count
+    assert project.donors_count == DONORS, project.donors_count
+    mode = f"{shards} shards" if shards else "single row"
+    print(f"✓ {len(donations)} parallel donations ({mode}) summed exactly to {project.current_amount}")
+
+    async with AsyncSessionLocal() as db:
+        assert await crud.process_donation(db, user_ids[0], project_id + 1000, 5.0) is None
+    print("✓ Donation to a missing project is rejected")
+
+    counter_hints.clear()
+    await async_engine.dispose()
+
+
+async def check_same_donor_sharded(donations: int = 30):
+    """An earlier donor giving many times at once: still one donor, in the project and in every bucket"""
+    user_ids, project_id = await seed()
+    async with AsyncSessionLocal() as db:
+        await crud.set_project_counter_shards(db, project_id, 8)
+        # Already a donor of the project, but from buckets long past
+        db.add(DonationDB(user_id=user_ids[1], project_id=project_id, amount=1.0,
+                          created_at=datetime(2000, 1, 1)))
+        await db.commit()
+        await crud.rebuild_donation_rollups(db, project_id)
+        await crud.reconcile_project_counters(db, project_id)
+    results = await asyncio.gather(*[donate(user_ids[1], project_id, 1.0) for _ in range(donations)])
+    assert all(d is not None for d in results), "some donations failed"
+
+    shard_totals.clear()
+    async with AsyncSessionLocal() as db:
+        project = await crud.get_project_with_totals(db, project_id)
+        buckets = (await db.execute(
+            select(DonationRollupDB.granularity, DonationRollupDB.donation_count,
+                   DonationRollupDB.distinct_donors)
+            .filter(DonationRollupDB.project_id == project_id,
+                    DonationRollupDB.bucket_start > datetime(2001, 1, 1))
+        )).all()
+    assert project.donors_count == 1, project.donors_count
+    # Donations made around midnight may span two day/week/month buckets
+    for granularity in ("day", "week", "month"):
+        rows = [b for b in buckets if b.granularity == granularity]
+        assert sum(b.donation_count for b in rows) == donations, rows
+        assert all(b.distinct_donors == 1 for b in rows), rows
+    print(f"✓ {donations} parallel donations of one donor (sharded) counted one donor per bucket")
+
+    counter_hints.clear()
+    await async_engine.dispose()
+
+
+async def cluster_snapshot():
+    async with AsyncSessionLocal() as db:
+        rows = (await db.scalars(select(ProjectClusterDB))).all()
+    return {(c.level, c.cell): (c.project_count, round(c.current_amount, 6))
+            for c in rows if c.project_count or abs(c.current_amount) > 1e-9}
+
+
+async def check_move_with_buffered_amounts(shards: int = 0):
+    """Amounts another worker still buffers when a project moves must follow it"""
+    user_ids, project_id = await seed()
+    cluster_amounts.drain()
+    async with AsyncSessionLocal() as db:
+        await crud.update_project(db, project_id, latitude=50.0, longitude=30.0)
+        if shards:
+            await crud.set_project_counter_shards(db, project_id, shards)
+    await donate(user_ids[0], project_id, 7.0)
+    async with AsyncSessionLocal() as db:
+        await crud.flush_cluster_amounts(db)
+    await donate(user_ids[1], project_id, 5.0)
+    other_worker = cluster_amounts.drain()
+    async with AsyncSessionLocal() as db:
+        await crud.update_project(db, project_id, latitude=-20.0, longitude=100.0)
+    await donate(user_ids[2], project_id, 3.0)  # sharded: routed by a hint cached before the move
+    cluster_amounts.restore(other_worker)
+    async with AsyncSessionLocal() as db:
+        await crud.flush_cluster_amounts(db)
+    flushed = await cluster_snapshot()
+
+    async with AsyncSessionLocal() as db:
+        await crud.rebuild_project_clusters(db)
+    rebuilt = await cluster_snapshot()
+    assert flushed == rebuilt, (flushed, rebuilt)
+    assert {amount for _, amount in rebuilt.values()} == {15.0}, rebuilt
+    mode = f"{shards} shards" if shards else "single row"
+    print(f"✓ Buffered amounts followed a moved project into its new clusters ({mode})")
+
+    counter_hints.clear()
+    await async_engine.dispose()
+
+
+async def check_batched_donations():
+    user_ids, project_id = await seed()
+    batcher = DonationBatcher(enabled=True, max_size=16, max_wait=0.01)
+    batcher.start()
+
+    donations = await asyncio.gather(*[
+        batcher.submit(user_id, project_id, 2.5)
+        for _ in range(DONATIONS_PER_DONOR)
+        for user_id in user_ids
+    ], batcher.submit(user_ids[0], project_id + 1000, 5.0))
+    await batcher.stop()
+
+    assert donations[-1] is None, "donation to a missing project was accepted"
+    assert all(d is not None for d in donations[:-1]), "some donations failed"
+    assert len({d.id for d in donations[:-1]}) == DONORS * DONATIONS_PER_DONOR
+    assert batcher.batches < len(donations), f"{batcher.batches} batches, nothing was grouped"
+
+    async with AsyncSessionLocal() as db:
+        project = await db.get(ProjectDB, project_id)
+    assert project.current_amount == 2.5 * DONORS * DONATIONS_PER_DONOR, project.current_amount
+    assert project.donations_count == DONORS * DONATIONS_PER_DONOR, project.donations_count
+    assert project.donors_count == DONORS, project.donors_count
+    print(f"✓ {len(donations)} batched donations written in {batcher.batches} commits")
+
+    counter_hints.clear()
+    await async_engine.dispose()
+
+
+async def check_batcher_survives_failures():
+    def broken_session():
+        raise RuntimeError("database unavailable")
+
+    batcher = DonationBatcher(enabled=True, max_size=4, max_wait=0.01)
+    batcher.start()
+    real_session, ingest.AsyncSessionLocal = ingest.AsyncSessionLocal, broken_session
+    try:
+        failed = await asyncio.wait_for(asyncio.gather(*[
+            batcher.submit(user_id, 1, 1.0) for user_id in range(6)
+        ]), timeout=5)
+    finally:
+        ingest.AsyncSessionLocal = real_session
+    assert failed == [None] * 6 and batcher.failed == 6, (failed, batcher.failed)
+
+    # The consumer is still running: the next batch is written normally
+    user_ids, project_id = await seed()
+    donation = await asyncio.wait_for(batcher.submit(user_ids[0], project_id, 4.0), timeout=5)
+    await batcher.stop()
+    assert donation is not None and donation.amount == 4.0
+    print("✓ Batcher resolves a failed batch and keeps consuming")
+
+    counter_hints.clear()
+    await async_engine.dispose()
+
+
+async def check_import_does_not_block_donations():
+    """A donor's live first donation goes through while an import of the same donor is running"""
+    user_ids, project_id = await seed()
+    if async_engine.dialect.name != "postgresql":
+        print("- Import concurrency needs PostgreSQL (SQLite has one writer), skipped")
+        await async_engine.dispose()
+        return
+    donor = user_ids[2]
+    live_done = asyncio.Event()
+
+    async def rows():
+        yield 1, DonationImportRow(project_id=project_id, user_id=donor, amount=2.0)
+        yield 2, DonationImportRow(project_id=project_id, user_id=user_ids[3], amount=3.0)
+        await asyncio.wait_for(live_done.wait(), timeout=5)  # the import is still open meanwhile
+        yield 3, DonationImportRow(project_id=project_id, user_id=donor, amount=4.0)
+
+    async def run_import():
+        chunk_size, crud.IMPORT_CHUNK_SIZE = crud.IMPORT_CHUNK_SIZE, 1  # load row by row
+        try:
+            async with AsyncSessionLocal() as db:
+                return await crud.import_donations(db, rows(), user_ids[0])
+        finally:
+            crud.IMPORT_CHUNK_SIZE = chunk_size
+
+    async def live():
+        await asyncio.sleep(0.1)  # after the import has loaded its first chunk
+        donation = await asyncio.wait_for(donate(donor, project_id, 1.0), timeout=3)
+        live_done.set()
+        return donation
+
+    report, donation = await asyncio.gather(run_import(), live())
+    assert donation is not None and report["imported"] == 3, report
+
+    async with AsyncSessionLocal() as db:
+        project = await db.get(ProjectDB, project_id)
+    assert project.current_amount == 10.0 and project.donations_count == 4, project.current_amount
+    assert project.donors_count == 2, project.donors_count
+    print("✓ Live donation not blocked by a running import, donors counted once")
+
+    counter_hints.clear()
+    await async_engine.dispose()
+
+
+def test_parallel_donations_sum_exactly():
+    asyncio.run(check_parallel_donations())
+
+
+def test_parallel_sharded_donations_sum_exactly():
+    asyncio.run(check_parallel_donations(shards=8))
+
+
+def test_same_donor_sharded_counts_one_donor():
+    asyncio.run(check_same_donor_sharded())
+
+
+def test_move_with_buffered_amounts():
+    asyncio.run(check_move_with_buffered_amounts())
+
+
+def test_sharded_move_with_buffered_amounts():
+    asyncio.run(check_move_with_buffered_amounts(shards=8))
+
+
+def test_batched_donations_sum_exactly():
+    asyncio.run(check_batched_donations())
+
+
+def test_import_does_not_block_donations():
+    asyncio.run(check_import_does_not_block_donations())
+
+
+def test_batcher_survives_failures():
+    asyncio.run(check_batcher_survives_failures())
+
+
+if __name__ == "__main__":
+    test_parallel_donations_sum_exactly()
+    test_parallel_sharded_donations_sum_exactly()
+    test_same_donor_sharded_counts_one_donor()
+    test_move_with_buffered_amounts()
+    test_sharded_move_with_buffered_amounts()
+    test_batched_donations_sum_exactly()
+    test_batcher_survives_failures()
+    test_import_does_not_block_donations()
+    print("\n✅ Donation concurrency checks passed")
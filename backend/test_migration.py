@@ -6,8 +6,9 @@ Run this after setting up PostgreSQL to validate the implementation.
 import asyncio
 import json
 from datetime import datetime
-from sqlalchemy.orm import Session
-from database import SessionLocal, Base, engine, init_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import AsyncSessionLocal, Base, async_engine, init_db
 import crud
 from models import (
     UserDB, ProjectDB, IssueDB, DonationDB,
@@ -22,15 +23,16 @@ async def setup_test_data():
     print("\n🔧 Setting up test database and data...\n")
     
     # Create tables
-    Base.metadata.drop_all(bind=engine)
-    init_db()
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await init_db()
     print("✓ Database tables created")
     
-    db = SessionLocal()
+    db = AsyncSessionLocal()
     
     try:
         # Create test users
-        user1 = crud.create_user(
+        user1 = await crud.create_user(
             db,
             email="donor@example.com",
             name="Alice Donor",
@@ -38,7 +40,7 @@ async def setup_test_data():
         )
         print(f"✓ Created user: {user1.name} (ID: {user1.id})")
         
-        user2 = crud.create_user(
+        user2 = await crud.create_user(
             db,
             email="volunteer@example.com",
             name="Bob Volunteer",
@@ -48,11 +50,11 @@ async def setup_test_data():
         
         # Make user2 an admin for testing
         user2.is_admin = True
-        db.commit()
+        await db.commit()
         print(f"✓ Made {user2.name} admin")
         
         # Create a charity project
-        project = crud.create_project(
+        project = await crud.create_project(
             db,
             owner_id=user1.id,
             name="Emergency Food Relief",
@@ -68,7 +70,7 @@ async def setup_test_data():
         print(f"  - Location: ({project.latitude}, {project.longitude})")
         
         # Create volunteer issues/tasks
-        issue1 = crud.create_issue(
+        issue1 = await crud.create_issue(
             db,
             project_id=project.id,
             reporter_id=user1.id,
@@ -79,7 +81,7 @@ async def setup_test_data():
         )
         print(f"✓ Created issue: {issue1.title} (Category: {issue1.category})")
         
-        issue2 = crud.create_issue(
+        issue2 = await crud.create_issue(
             db,
             project_id=project.id,
             reporter_id=user1.id,
@@ -94,11 +96,11 @@ async def setup_test_data():
         
     except Exception as e:
         print(f"❌ Error setting up test data: {e}")
-        db.rollback()
+        await db.rollback()
         raise
 
 
-async def test_gamification(db: Session, user: UserDB, issue: IssueDB):
+async def test_gamification(db: AsyncSession, user: UserDB, issue: IssueDB):
     """Test gamification: XP awards and rating levels"""
     print("\n🎮 Testing Gamification System...\n")
     
@@ -106,16 +108,16 @@ async def test_gamification(db: Session, user: UserDB, issue: IssueDB):
     print(f"Initial XP: {initial_xp}, Rating: {user.rating_level}")
     
     # Assign volunteer
-    assigned_issue = crud.assign_volunteer(db, issue.id, user.id)
+    assigned_issue = await crud.assign_volunteer(db, issue.id, user.id)
     print(f"✓ Assigned {user.name} to issue: {assigned_issue.title}")
     print(f"  - Status changed to: {assigned_issue.status}")
     
     # Close issue to award XP
-    closed_issue = crud.close_issue(db, issue.id)
+    closed_issue = await crud.close_issue(db, issue.id)
     print(f"✓ Closed issue: {closed_issue.title}")
     
     # Check XP increase
-    db.refresh(user)
+    await db.refresh(user)
     xp_gained = user.xp - initial_xp
     print(f"✓ XP awarded: +{xp_gained}")
     print(f"✓ New rating: {user.rating_level}")
@@ -124,7 +126,7 @@ async def test_gamification(db: Session, user: UserDB, issue: IssueDB):
     return True
 
 
-async def test_donation_transactions(db: Session, user: UserDB, project: ProjectDB):
+async def test_donation_transactions(db: AsyncSession, user: UserDB, project: ProjectDB):
     """Test donation processing and transparency"""
     print("\n💰 Testing Transparent Donation System...\n")
     
@@ -132,7 +134,7 @@ async def test_donation_transactions(db: Session, user: UserDB, project: Project
     print(f"Initial project amount: ${initial_amount}")
     
     # Process donations
-    donation1 = crud.process_donation(
+    donation1 = await crud.process_donation(
         db,
         user_id=user.id,
         project_id=project.id,
@@ -141,7 +143,7 @@ async def test_donation_transactions(db: Session, user: UserDB, project: Project
     )
     print(f"✓ Processed donation: ${donation1.amount} (Public)")
     
-    donation2 = crud.process_donation(
+    donation2 = await crud.process_donation(
         db,
         user_id=user.id,
         project_id=project.id,
@@ -151,13 +153,13 @@ async def test_donation_transactions(db: Session, user: UserDB, project: Project
     print(f"✓ Processed donation: ${donation2.amount} (Anonymous)")
     
     # Check project amount updated
-    db.refresh(project)
+    await db.refresh(project)
     total_donated = project.current_amount - initial_amount
     print(f"✓ Project amount updated: ${project.current_amount}")
     print(f"✓ Total donated: ${total_donated}")
     
     # Test public donation view (anonymity)
-    public_donations = crud.get_public_donations(db, project.id)
+    public_donations = await crud.get_public_donations(db, project.id)
     print(f"\n📋 Public Donation List ({len(public_donations)} donations):")
     for d in public_donations:
         donor = d['donor_name'] if d['donor_name'] else "[Anonymous]"
@@ -166,19 +168,19 @@ async def test_donation_transactions(db: Session, user: UserDB, project: Project
     return True
 
 
-async def test_project_verification(db: Session, admin: UserDB, project: ProjectDB):
+async def test_project_verification(db: AsyncSession, admin: UserDB, project: ProjectDB):
     """Test admin verification of projects"""
     print("\n✅ Testing Project Verification (Admin Only)...\n")
     
     print(f"Initial verification status: is_verified={project.is_verified}")
     
     # Verify project
-    verified_project = crud.verify_project(db, project.id, admin.id)
+    verified_project = await crud.verify_project(db, project.id, admin.id)
     print(f"✓ {admin.name} (admin) verified the project")
     print(f"✓ New verification status: is_verified={verified_project.is_verified}")
     
     # Upload report URL
-    updated_project = crud.update_project(
+    updated_project = await crud.update_project(
         db,
         project.id,
         report_url="https://example.com/reports/project_2024.pdf"
@@ -188,7 +190,7 @@ async def test_project_verification(db: Session, admin: UserDB, project: Project
     return True
 
 
-async def test_geolocation(db: Session, project: ProjectDB):
+async def test_geolocation(db: AsyncSession, project: ProjectDB):
     """Test geolocation fields"""
     print("\n🗺️ Testing Geolocation...\n")
     
@@ -207,10 +209,10 @@ async def test_schema_serialization():
     """Test Pydantic schema serialization"""
     print("\n📊 Testing Schema Serialization...\n")
     
-    db = SessionLocal()
+    db = AsyncSessionLocal()
     
     try:
-        projects = db.query(ProjectDB).all()
+        projects = (await db.execute(select(ProjectDB))).scalars().all()
         
         for project in projects:
             response = ProjectResponse.from_orm(project)
@@ -230,7 +232,7 @@ async def test_schema_serialization():
                 print(f"  - Progress: {progress:.1f}%")
     
     finally:
-        db.close()
+        await db.close()
     
     return True
 
@@ -297,7 +299,7 @@ async def main():
         import traceback
         traceback.print_exc()
     finally:
-        db.close()
+        await db.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+"""
+Query-count checks for the notification feeds and the inbox fan-out.
+Runs against a throwaway SQLite database: python test_notification_feeds.py (or pytest)
+"""
+
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "feeds.db")
+os.environ["ENVIRONMENT"] = "test"
+os.environ.setdefault("JWT_SECRET", "test-secret")
+
+import asyncio
+from sqlalchemy import event
+from database import AsyncSessionLocal, Base, async_engine
+import crud
+from models import UserDB, ProjectDB, IssueDB, DonationDB, SubscriptionDB
+
+
+class QueryCounter:
+    """Counts SQL statements sent through the async engine"""
+
+    def __init__(self):
+        self.count = 0
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(async_engine.sync_engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(async_engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+
+async def seed(db):
+    """Create several users/projects so N+1 loading would be visible"""
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    users = [UserDB(email=f"user{i}@example.com", name=f"User {i}", password_hash="x")
+             for i in range(4)]
+    db.add_all(users)
+    await db.flush()
+
+    projects = [ProjectDB(name=f"Project {i}", owner_id=users[i].id, goal_amount=100.0)
+                for i in range(3)]
+    db.add_all(projects)
+    await db.flush()
+
+    for i in range(6):
+        db.add(DonationDB(user_id=users[i % 4].id, project_id=projects[i % 3].id,
+                          amount=10.0 * (i + 1), is_anonymous=(i == 0)))
+    for i, priority in enumerate(["low", "medium", "high", "urgent"]):
+        db.add(IssueDB(title=f"Task {i}", project_id=projects[i % 3].id,
+                       reporter_id=users[0].id, assignee_id=users[i].id,
+                       priority=priority, status="closed"))
+    db.add(IssueDB(title="Unassigned", project_id=projects[0].id,
+                   reporter_id=users[0].id, status="closed"))
+    await db.commit()
+
+
+async def check_feeds():
+    async with AsyncSessionLocal() as db:
+        await seed(db)
+
+        with QueryCounter() as counter:
+            donations = await crud.get_donation_feed(db, limit=20)
+        assert counter.count == 1, f"donation feed used {counter.count} queries"
+        assert len(donations) == 6
+        assert sum(d["donor_name"] is None for d in donations) == 1
+        assert all(d["project_name"].startswith("Project") for d in donations)
+        print(f"✓ Donation feed: {len(donations)} rows in {counter.count} query")
+
+        with QueryCounter() as counter:
+            completions = await crud.get_volunteer_completion_feed(db, limit=20)
+        assert counter.count == 1, f"volunteer feed used {counter.count} queries"
+        assert len(completions) == 4  # unassigned issue is skipped
+        xp = sorted(c["volunteer_xp_gained"] for c in completions)
+        assert xp == [10, 25, 25, 50], xp
+        print(f"✓ Volunteer feed: {len(completions)} rows in {counter.count} query")
+
+        with QueryCounter() as counter:
+            projects = await crud.get_new_project_feed(db, limit=20)
+        assert counter.count == 1, f"project feed used {counter.count} queries"
+        assert {p["owner_name"] for p in projects} == {"User 0", "User 1", "User 2"}
+        print(f"✓ Project feed: {len(projects)} rows in {counter.count} query")
+
+    await async_engine.dispose()
+
+
+async def check_fan_out():
+    async with AsyncSessionLocal() as db:
+        await seed(db)
+        for user_id in (1, 2, 3, 4):
+            db.add(SubscriptionDB(user_id=user_id, project_id=1))
+        db.add(SubscriptionDB(user_id=2, project_id=2))
+        await db.commit()
+
+        events = [
+            {"project_id": 1, "actor_id": 1, "type": "donation", "message": "User 0 donated 5.00"},
+            {"project_id": 2, "actor_id": 1, "type": "project_verified", "message": "verified"},
+            {"project_id": 3, "actor_id": 1, "type": "issue_closed", "message": "nobody listens"},
+        ]
+        with QueryCounter() as counter:
+            await crud.fan_out_notifications(db, events)
+        assert counter.count == 1, f"fan-out used {counter.count} queries"
+
+        inbox = {user_id: await crud.get_notifications(db, user_id) for user_id in (1, 2, 3, 4)}
+        assert inbox[1] == []  # the actor is not notified
+        assert [n.type for n in inbox[2]] == ["project_verified", "donation"]
+        assert [n.title for n in inbox[3]] == ["Project 0"] and not inbox[3][0].read
+        print(f"✓ Fan-out: {sum(map(len, inbox.values()))} notifications in {counter.count} query")
+
+        assert await crud.mark_notifications_read(db, 2) == 2
+        assert await crud.get_notifications(db, 2, unread_only=True) == []
+
+    await async_engine.dispose()
+
+
+def test_notification_feeds_single_query():
+    asyncio.run(check_feeds())
+
+
+def test_notification_fan_out_single_query():
+    asyncio.run(check_fan_out())
+
+
+if __name__ == "__main__":
+    test_notification_feeds_single_query()
+    test_notification_fan_out_single_query()
+    print("\n✅ Notification feed checks passed")
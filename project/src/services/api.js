@@ -68,13 +68,22 @@ export const usersAPI = {
     apiCall(`/users/${id}`, 'PUT', data),
   getAllUsers: () => apiCall('/users', 'GET'),
   updateMe: (data) =>
-    apiCall('/users/me', 'PUT', data)  // Use /me endpoint for current user
+    apiCall('/users/me', 'PUT', data),  // Use /me endpoint for current user
+  getLeaderboard: (limit = 10) => apiCall(`/users/leaderboard?limit=${limit}`, 'GET'),
+  getRank: (id) => apiCall(`/users/${id}/rank`, 'GET')
 };
 
 // Projects API
 export const projectsAPI = {
   getAll: () => apiCall('/projects', 'GET'),
   getById: (id) => apiCall(`/projects/${id}`, 'GET'),
+  getNearby: (lat, lon, radiusKm = 10) =>
+    apiCall(`/projects/nearby?lat=${lat}&lon=${lon}&radius_km=${radiusKm}`, 'GET'),
+  // bbox: [west, south, east, north]
+  getClusters: (bbox, zoom) =>
+    apiCall(`/projects/clusters?bbox=${bbox.join(',')}&zoom=${zoom}`, 'GET'),
+  getDonationTimeseries: (id, granularity = 'day') =>
+    apiCall(`/projects/${id}/donations/timeseries?granularity=${granularity}`, 'GET'),
   create: (data) => apiCall('/projects', 'POST', data),
   update: (id, data) => apiCall(`/projects/${id}`, 'PUT', data),
   delete: (id) => apiCall(`/projects/${id}`, 'DELETE')
@@ -89,6 +98,7 @@ export const issuesAPI = {
   update: (id, data) => apiCall(`/issues/${id}`, 'PUT', data),
   updateStatus: (id, status) =>
     apiCall(`/issues/${id}/status`, 'PATCH', { status }),
+  closeMany: (issueIds) => apiCall('/issues/close', 'POST', { issue_ids: issueIds }),
   delete: (id) => apiCall(`/issues/${id}`, 'DELETE')
 };
 
@@ -98,7 +108,22 @@ export const notificationsAPI = {
   create: (data) => apiCall('/notifications', 'POST', data),
   markAsRead: (id) =>
     apiCall(`/notifications/${id}/read`, 'PATCH'),
-  delete: (id) => apiCall(`/notifications/${id}`, 'DELETE')
+  markManyAsRead: (ids = null) =>
+    apiCall('/notifications/read', 'POST', { ids }),
+  delete: (id) => apiCall(`/notifications/${id}`, 'DELETE'),
+  updateSubscriptions: (subscribe = [], unsubscribe = []) =>
+    apiCall('/notifications/subscriptions/bulk', 'POST', { subscribe, unsubscribe })
+};
+
+// Search API
+export const searchAPI = {
+  search: (q, limit = 20) =>
+    apiCall(`/search?q=${encodeURIComponent(q)}&limit=${limit}`, 'GET')
+};
+
+// Live activity (Server-Sent Events): donation, issue_closed, project_created
+export const streamAPI = {
+  activity: () => new EventSource(`${API_BASE_URL}/stream/activity`)
 };
 
 // Helper to set auth token after login